@@ -6,20 +6,25 @@ Converts Streamlit functionality to API endpoints
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import uvicorn
 import sys
 import os
 import logging
+import json
 from datetime import datetime
+from dataclasses import asdict, is_dataclass
 
 # Add project root to path
 sys.path.append(os.path.dirname(__file__))
 
-from src.core.rag_engine import RAGEngine
+from src.core.rag_engine import RAGEngine, SearchEventType
+from src.core.deadline import Deadline
 from src.core.query_parser import QueryParser
+from src.core.saved_search_percolator import SavedSearchPercolator, SavedSearch
+from src.core.snippet_generator import SnippetGenerator
 from config import Config
 
 # Set up logging
@@ -29,7 +34,8 @@ logger = logging.getLogger(__name__)
 def convert_job_to_dict(job) -> Dict[str, Any]:
     """Convert JobData object to dictionary for JSON serialization"""
     if hasattr(job, '__dict__'):
-        job_dict = job.__dict__.copy()
+        # asdict reads fields through attributes, so compressed descriptions are expanded
+        job_dict = asdict(job) if is_dataclass(job) else job.__dict__.copy()
         # Convert datetime objects to strings
         if 'posted_date' in job_dict and job_dict['posted_date']:
             job_dict['posted_date'] = str(job_dict['posted_date'])
@@ -66,7 +72,10 @@ app.add_middleware(
 # Initialize core components
 try:
     rag_engine = RAGEngine()
-    query_parser = QueryParser()
+    # The API answers from the database first; web search and LLM components are built
+    # by the first query that falls back to the web
+    rag_engine.warm_up(["query_parser", "job_database"])
+    query_parser = rag_engine.query_parser
     config = Config()
     logger.info("✅ Core components initialized successfully")
 except Exception as e:
@@ -75,6 +84,14 @@ except Exception as e:
     query_parser = None
     config = None
 
+# Saved searches are percolated against every batch of jobs upserted into the database
+SAVED_SEARCHES_FILE = os.path.join(os.path.dirname(__file__), "saved_searches.json")
+snippet_generator = SnippetGenerator()
+job_alerts = SavedSearchPercolator()
+job_alerts.load(SAVED_SEARCHES_FILE)
+if rag_engine and rag_engine.job_database:
+    rag_engine.job_database.percolator = job_alerts
+
 # Pydantic models for API requests/responses
 class JobSearchRequest(BaseModel):
     query: str
@@ -87,7 +104,9 @@ class JobSearchRequest(BaseModel):
         "Web Search": True
     }
     max_results: Optional[int] = 20
-    timeout: Optional[int] = 30
+    timeout: Optional[int] = 30  # Seconds budget for the whole search, web fallback included
+    full_description: Optional[bool] = False  # Return full descriptions instead of highlighted snippets
+    debug: Optional[bool] = False  # Include the per-stage timing tree of the search
 
 class JobSearchResponse(BaseModel):
     success: bool
@@ -101,6 +120,15 @@ class JobSearchResponse(BaseModel):
     suggestions: Optional[List[str]] = []
     database_jobs: int = 0
     web_search_jobs: int = 0
+    spans: Optional[Dict[str, Any]] = None
+
+class SavedSearchRequest(BaseModel):
+    user_id: str
+    query: str = ""
+    location: Optional[str] = None
+    experience_level: Optional[str] = None
+    remote: bool = False
+    has_salary: bool = False
 
 class HealthResponse(BaseModel):
     status: str
@@ -157,7 +185,7 @@ async def search_jobs(request: JobSearchRequest):
         
         # Search using enhanced RAG engine
         start_time = datetime.now()
-        results = rag_engine.search(request.query)
+        results = rag_engine.search(request.query, timeout=request.timeout, debug=request.debug)
         search_time = (datetime.now() - start_time).total_seconds()
         
         # Check if query was relevant
@@ -174,7 +202,8 @@ async def search_jobs(request: JobSearchRequest):
                 is_inappropriate=results.get("is_inappropriate", False),
                 suggestions=results.get("suggestions", []),
                 database_jobs=0,
-                web_search_jobs=0
+                web_search_jobs=0,
+                spans=results.get("spans")
             )
         
         # Process jobs
@@ -186,6 +215,11 @@ async def search_jobs(request: JobSearchRequest):
                 job_dict = convert_job_to_dict(job)
                 processed_jobs.append(job_dict)
             
+            # Send a highlighted window around the matched terms instead of the full description
+            if not request.full_description:
+                search_terms = results.get("search_params", {}).get("query") or request.query
+                snippet_generator.annotate(processed_jobs, search_terms)
+            
             total_found = len(processed_jobs)
             sources_used = list(set(job.get('source', 'Unknown') for job in processed_jobs))
             
@@ -202,7 +236,8 @@ async def search_jobs(request: JobSearchRequest):
                 is_inappropriate=False,
                 suggestions=[],
                 database_jobs=results.get("database_jobs", 0),
-                web_search_jobs=results.get("web_search_jobs", 0)
+                web_search_jobs=results.get("web_search_jobs", 0),
+                spans=results.get("spans")
             )
         else:
             logger.warning("❌ No jobs found")
@@ -217,13 +252,106 @@ async def search_jobs(request: JobSearchRequest):
                 is_inappropriate=False,
                 suggestions=[],
                 database_jobs=results.get("database_jobs", 0),
-                web_search_jobs=results.get("web_search_jobs", 0)
+                web_search_jobs=results.get("web_search_jobs", 0),
+                spans=results.get("spans")
             )
             
     except Exception as e:
         logger.error(f"❌ Error during job search: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/search/stream")
+async def search_jobs_stream(request: JobSearchRequest):
+    """
+    Stream search results as newline-delimited JSON events
+    
+    Each line is {"type", "elapsed", "data"}: parsed_query, database_results,
+    one web_results per web page as it is extracted, then summary (or error),
+    so clients can render database hits before the web fallback finishes.
+    """
+    if not rag_engine:
+        raise HTTPException(status_code=500, detail="RAG engine not initialized")
+    
+    logger.info(f"🔍 Streaming job search: {request.query}")
+    
+    deadline = Deadline(request.timeout)
+    
+    def events():
+        search_terms = request.query
+        try:
+            for event in rag_engine.search_stream(request.query, limit=request.max_results or 20, deadline=deadline,
+                                                  debug=request.debug):
+                data = dict(event.data)
+                if event.type is SearchEventType.PARSED_QUERY:
+                    search_terms = (data.get("search_params") or {}).get("query") or request.query
+                if "jobs" in data:
+                    data["jobs"] = [convert_job_to_dict(job) for job in data["jobs"]]
+                    if not request.full_description:
+                        snippet_generator.annotate(data["jobs"], search_terms)
+                yield json.dumps({"type": event.type.value, "elapsed": event.elapsed, "data": data}, default=str) + "\n"
+        finally:
+            # Client went away (or the stream ended): stop any outstanding web work
+            deadline.cancel()
+    
+    # Starlette iterates the sync generator in its threadpool
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.get("/api/jobs/{job_id}/similar")
+async def get_similar_jobs(job_id: str, k: int = 10):
+    """Get jobs similar to a given job (served from precomputed job vectors)"""
+    try:
+        if not rag_engine or not rag_engine.job_database:
+            raise HTTPException(status_code=500, detail="Job database not available")
+        
+        if not rag_engine.job_database.get_job_by_id(job_id):
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        
+        start_time = datetime.now()
+        similar = rag_engine.job_database.similar_jobs(job_id, k=k)
+        search_time = (datetime.now() - start_time).total_seconds()
+        
+        return {
+            "job_id": job_id,
+            "jobs": [convert_job_to_dict(job) for job in similar],
+            "total_found": len(similar),
+            "search_time": search_time
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error finding similar jobs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/saved-searches")
+async def create_saved_search(request: SavedSearchRequest):
+    """Register a saved search; matching jobs ingested later become alerts"""
+    search = job_alerts.register(SavedSearch(**request.dict()))
+    job_alerts.save(SAVED_SEARCHES_FILE)
+    return search.__dict__
+
+@app.get("/api/saved-searches")
+async def list_saved_searches(user_id: str):
+    """List a user's saved searches"""
+    return {"searches": [search.__dict__ for search in job_alerts.get_user_searches(user_id)]}
+
+@app.delete("/api/saved-searches/{search_id}")
+async def delete_saved_search(search_id: str):
+    """Delete a saved search"""
+    if not job_alerts.unregister(search_id):
+        raise HTTPException(status_code=404, detail=f"Saved search {search_id} not found")
+    job_alerts.save(SAVED_SEARCHES_FILE)
+    return {"deleted": search_id}
+
+@app.get("/api/alerts")
+async def get_alerts(user_id: str):
+    """Return and clear the user's pending job alerts, grouped by saved search"""
+    alerts = job_alerts.pop_alerts(user_id)
+    return {
+        "alerts": {search_id: [convert_job_to_dict(job) for job in jobs] for search_id, jobs in alerts.items()},
+        "total_found": sum(len(jobs) for jobs in alerts.values())
+    }
+
 @app.get("/api/filters")
 async def get_filters():
     """Get available filters and options"""
@@ -260,8 +388,11 @@ async def get_stats():
                     "unique_companies": db_stats.get('unique_companies', 0),
                     "unique_locations": db_stats.get('unique_locations', 0),
                     "unique_job_types": db_stats.get('unique_job_types', 0),
-                    "recent_jobs": db_stats.get('recent_jobs', 0)
+                    "recent_jobs": db_stats.get('recent_jobs', 0),
+                    "memory": db_stats.get('memory')
                 },
+                "response_cache": rag_engine.response_cache.get_stats(),
+                "stage_timings": rag_engine.stage_timings.get_stats(),
                 "system": {
                     "rag_engine_status": "✅ Active" if rag_engine else "❌ Inactive",
                     "query_parser_status": "✅ Active" if query_parser else "❌ Inactive",
@@ -14,6 +14,7 @@ import sys
 import os
 import logging
 from datetime import datetime
+from dataclasses import asdict, is_dataclass
 
 # Add project root to path
 sys.path.append(os.path.dirname(__file__))
@@ -90,7 +91,8 @@ class HealthResponse(BaseModel):
 def convert_job_to_dict(job) -> Dict[str, Any]:
     """Convert JobData object to dictionary for JSON serialization"""
     if hasattr(job, '__dict__'):
-        job_dict = job.__dict__.copy()
+        # asdict reads fields through attributes, so compressed descriptions are expanded
+        job_dict = asdict(job) if is_dataclass(job) else job.__dict__.copy()
         # Convert datetime objects to strings
         if 'posted_date' in job_dict and job_dict['posted_date']:
             job_dict['posted_date'] = str(job_dict['posted_date'])
@@ -36,6 +36,20 @@ const JobResults = ({ jobs, searchStats, isSearching }) => {
     return date.toLocaleDateString();
   };
 
+  const renderSnippet = (job) => {
+    // Server sends [start, end] offsets of matched query terms within the snippet
+    const text = job.snippet;
+    const parts = [];
+    let cursor = 0;
+    (job.highlights || []).forEach(([start, end], i) => {
+      parts.push(text.slice(cursor, start));
+      parts.push(<mark key={i}>{text.slice(start, end)}</mark>);
+      cursor = end;
+    });
+    parts.push(text.slice(cursor));
+    return parts;
+  };
+
   const getSourceColor = (source) => {
     const colors = {
       'BDJobs': 'primary',
@@ -248,7 +262,7 @@ const JobResults = ({ jobs, searchStats, isSearching }) => {
                   </Box>
 
                   {/* Job Description */}
-                  {job.description && (
+                  {(job.snippet || job.description) && (
                     <Typography
                       variant="body2"
                       color="text.secondary"
@@ -261,7 +275,7 @@ const JobResults = ({ jobs, searchStats, isSearching }) => {
                         lineHeight: 1.5
                       }}
                     >
-                      {job.description}
+                      {job.snippet ? renderSnippet(job) : job.description}
                     </Typography>
                   )}
 
@@ -10,11 +10,16 @@ import logging
 from typing import List, Dict, Optional, Tuple
 from urllib.parse import quote_plus, urljoin
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
 import json
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    from .deadline import Deadline
+except ImportError:
+    from deadline import Deadline
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -349,8 +354,10 @@ class AdvancedWebSearchEngine:
         
         self.max_concurrent_searches = 2
         self.fallback_enabled = True
+        self.search_timeout = 60  # seconds, when the caller's deadline allows it
     
-    def search(self, query: str, num_results: int = 10, engines: List[SearchEngine] = None) -> List[SearchResult]:
+    def search(self, query: str, num_results: int = 10, engines: List[SearchEngine] = None,
+               deadline: Deadline = None) -> List[SearchResult]:
         """
         Advanced search with intelligent fallbacks
         
@@ -358,12 +365,15 @@ class AdvancedWebSearchEngine:
             query: Search query
             num_results: Number of results per engine
             engines: Specific engines to use (None = use all)
+            deadline: Time budget; engines still running when it expires are abandoned
+                and the results gathered so far are returned
         
         Returns:
             List of SearchResult objects
         """
         if engines is None:
             engines = self.engine_priority
+        deadline = deadline or Deadline()
         
         logger.info(f"🔍 Advanced search: '{query}' across {len(engines)} engines")
         
@@ -371,7 +381,8 @@ class AdvancedWebSearchEngine:
         successful_engines = []
         
         # Try engines in parallel with limited concurrency
-        with ThreadPoolExecutor(max_workers=self.max_concurrent_searches) as executor:
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrent_searches)
+        try:
             # Submit search tasks
             future_to_engine = {
                 executor.submit(self._search_single_engine, engine, query, num_results): engine 
@@ -379,7 +390,7 @@ class AdvancedWebSearchEngine:
             }
             
             # Collect results as they complete
-            for future in as_completed(future_to_engine, timeout=60):
+            for future in as_completed(future_to_engine, timeout=deadline.remaining(cap=self.search_timeout)):
                 engine = future_to_engine[future]
                 try:
                     results = future.result()
@@ -391,13 +402,20 @@ class AdvancedWebSearchEngine:
                         logger.warning(f"⚠️ {engine.value}: No results found")
                 except Exception as e:
                     logger.error(f"❌ {engine.value}: Search failed - {e}")
+        except TimeoutError:
+            logger.warning(f"⏰ Search time budget used up, keeping results from {len(successful_engines)} engines")
+        finally:
+            # Don't wait for engines that are still running past the budget
+            executor.shutdown(wait=False, cancel_futures=True)
         
         # If no results and fallback is enabled, try remaining engines sequentially
-        if not all_results and self.fallback_enabled:
+        if not all_results and self.fallback_enabled and not deadline.expired():
             logger.info("🔄 Activating fallback mode...")
             remaining_engines = [e for e in self.engine_priority if e not in engines]
             
             for engine in remaining_engines:
+                if deadline.expired():
+                    break
                 try:
                     results = self._search_single_engine(engine, query, num_results)
                     if results:
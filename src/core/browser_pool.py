@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Browser Pool
+Long-lived headless Chromium workers for fetching JavaScript-rendered job pages
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from typing import List, Dict, Any
+
+try:
+    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+# Resource types that never contain listing text
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media'}
+
+# Elements that appear once a site has rendered its job cards
+JOB_CARD_SELECTORS: Dict[str, List[str]] = {
+    'linkedin.com': ['div[data-job-id]', '.job-search-card', '.job-result-card', '.base-card',
+                     '[data-entity-urn*="fsd_jobPosting"]'],
+    'indeed.com': ['.job_seen_beacon', 'a[data-jk]', '#jobDescriptionText'],
+    'glassdoor.com': ['[data-test="jobListing"]', '[data-test="job-title"]'],
+    'monster.com': ['[data-testid="svx-job-card"]', '[data-testid="jobTitle"]'],
+    'careerbuilder.com': ['li.data-results-content-parent', '.job-listing-item'],
+}
+GENERIC_JOB_CARD_SELECTORS = ['[data-job-id]', '[class*="job-card"]', '[class*="jobCard"]', '[class*="job-listing"]']
+
+_STOP = object()
+
+
+def job_card_selector(url: str) -> str:
+    """Combined CSS selector for the job cards of the site a URL belongs to"""
+    lowered = url.lower()
+    for site, selectors in JOB_CARD_SELECTORS.items():
+        if site in lowered:
+            return ", ".join(selectors)
+    return ", ".join(GENERIC_JOB_CARD_SELECTORS)
+
+
+class BrowserPool:
+    """
+    A fixed number of browser worker threads serving page fetches from a queue
+
+    Playwright's sync API objects belong to the thread that created them, so
+    each worker owns its Playwright instance, browser, context and one page,
+    and reuses them for every URL it is handed. Images, fonts and media are
+    aborted at the network layer, and instead of a fixed sleep a fetch waits
+    until the site's job cards are attached (or a short timeout). Each browser
+    is relaunched after `pages_per_browser` pages so long-running processes
+    don't accumulate renderer memory. Workers start on the first fetch.
+    """
+
+    def __init__(self, size: int = 2, pages_per_browser: int = 50, navigation_timeout_ms: int = 15000,
+                 selector_timeout_ms: int = 5000, headless: bool = True):
+        self.size = size
+        self.pages_per_browser = pages_per_browser
+        self.navigation_timeout_ms = navigation_timeout_ms
+        self.selector_timeout_ms = selector_timeout_ms
+        self.headless = headless
+        self._requests: "queue.Queue" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {'pages': 0, 'failures': 0, 'selector_timeouts': 0, 'browser_launches': 0}
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed")
+            if self._workers:
+                return
+            for i in range(self.size):
+                worker = threading.Thread(target=self._run_worker, name=f"browser-pool-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+            atexit.register(self.close)
+            logger.info(f"🚀 Started browser pool with {self.size} workers")
+
+    def fetch(self, url: str, timeout: float = None) -> str:
+        """
+        Render a page and return its HTML
+
+        Args:
+            url: Page to load
+            timeout: Seconds budget for the page, including time waiting for a free
+                worker; navigation and selector waits are shortened to fit it
+
+        Raises:
+            RuntimeError: If Playwright is not installed or the pool is closed
+            TimeoutError: If the page was not ready within the timeout
+        """
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("Playwright is not installed")
+        self._ensure_started()
+        future = Future()
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+        self._requests.put((url, future, expires_at))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # A worker that hasn't picked it up yet will skip it
+            future.cancel()
+            raise
+
+    def _route(self, route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            route.abort()
+        else:
+            route.continue_()
+
+    def _launch(self, playwright):
+        browser = playwright.chromium.launch(headless=self.headless)
+        context = browser.new_context(user_agent=USER_AGENT)
+        context.route("**/*", self._route)
+        page = context.new_page()
+        with self._lock:
+            self.stats['browser_launches'] += 1
+        return browser, page
+
+    def _budget_ms(self, limit_ms: int, expires_at: float = None) -> int:
+        """A wait limit shortened to what is left before expires_at"""
+        if expires_at is None:
+            return limit_ms
+        return max(1, min(limit_ms, int((expires_at - time.monotonic()) * 1000)))
+
+    def _load(self, page, url: str, expires_at: float = None) -> str:
+        page.goto(url, wait_until='domcontentloaded',
+                  timeout=self._budget_ms(self.navigation_timeout_ms, expires_at))
+        try:
+            page.wait_for_selector(job_card_selector(url), state='attached',
+                                   timeout=self._budget_ms(self.selector_timeout_ms, expires_at))
+        except PlaywrightTimeoutError:
+            with self._lock:
+                self.stats['selector_timeouts'] += 1
+            logger.debug(f"No job cards rendered on {url} within {self.selector_timeout_ms}ms")
+        return page.content()
+
+    def _run_worker(self):
+        """Worker thread: serve fetches with one reused browser page, relaunching every N pages"""
+        try:
+            with sync_playwright() as playwright:
+                self._serve(playwright)
+        except Exception as e:
+            # Playwright itself failed (e.g. browsers not installed): fail fetches instead of hanging them
+            logger.error(f"❌ Browser pool worker failed: {e}")
+            while True:
+                item = self._requests.get()
+                if item is _STOP:
+                    break
+                if item[1].set_running_or_notify_cancel():
+                    item[1].set_exception(e)
+
+    def _serve(self, playwright):
+        browser, page, served = None, None, 0
+        try:
+            while True:
+                item = self._requests.get()
+                if item is _STOP:
+                    break
+                url, future, expires_at = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    if browser is None or served >= self.pages_per_browser:
+                        if browser is not None:
+                            browser.close()
+                            logger.info(f"♻️ Recycling browser after {served} pages")
+                        browser, page = self._launch(playwright)
+                        served = 0
+                    html_content = self._load(page, url, expires_at)
+                    served += 1
+                    with self._lock:
+                        self.stats['pages'] += 1
+                    future.set_result(html_content)
+                except Exception as e:
+                    with self._lock:
+                        self.stats['failures'] += 1
+                    future.set_exception(e)
+                    # The page may be stuck mid-navigation; start the next fetch on a fresh browser
+                    served = self.pages_per_browser
+        finally:
+            if browser is not None:
+                browser.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pages served, failures and browser launches so far"""
+        with self._lock:
+            return {**self.stats, 'workers': len(self._workers), 'queued': self._requests.qsize()}
+
+    def close(self):
+        """Stop the workers and their browsers (pending fetches are still served first)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+        for _ in workers:
+            self._requests.put(_STOP)
+        for worker in workers:
+            worker.join(timeout=30)
+
+
+def fetch_with_fresh_browser(url: str) -> str:
+    """Fetch a page the way RAGEngine did before the pool: new browser per URL and a fixed 3s wait"""
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.set_extra_http_headers({'User-Agent': USER_AGENT})
+        page.goto(url, wait_until='networkidle', timeout=15000)
+        page.wait_for_timeout(3000)
+        html_content = page.content()
+        browser.close()
+        return html_content
+
+
+# Test functionality
+if __name__ == "__main__":
+    import functools
+    import http.server
+    import sys
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from pathlib import Path
+
+    print("🧪 Measuring browser pool throughput against a local static server...")
+    print("=" * 50)
+    if not PLAYWRIGHT_AVAILABLE:
+        # Nothing is estimated: without a browser there are no numbers to report
+        print("❌ Playwright is not installed (pip install playwright && playwright install chromium)")
+        sys.exit(1)
+
+    # Job cards are rendered by script after a short delay, like the real job boards,
+    # and every page pulls in an image and a font that the pool blocks
+    site = Path(tempfile.mkdtemp(prefix="browser_pool_site_"))
+    (site / "logo.png").write_bytes(b"\x89PNG" + b"\0" * 200000)
+    (site / "font.woff2").write_bytes(b"\0" * 100000)
+    for i in range(40):
+        (site / f"jobs{i}.html").write_text(f"""<html><head>
+<style>@font-face {{ font-family: f; src: url(font.woff2); }} body {{ font-family: f; }}</style></head>
+<body><img src="logo.png?{i}"><div id="results"></div>
+<script>setTimeout(() => {{
+  document.getElementById('results').innerHTML =
+    Array.from({{length: 25}}, (_, k) => `<div class="job-card" data-job-id="${{k}}">Engineer ${{k}}</div>`).join('');
+}}, 400);</script></body></html>""")
+
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(site))
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_port}/jobs{i}.html" for i in range(40)]
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+
+    def pages_per_minute(fetch, sample: List[str]) -> float:
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pages = list(executor.map(fetch, sample))
+        assert all('data-job-id="24"' in html for html in pages)
+        return len(pages) / (time.time() - start_time) * 60
+
+    legacy = pages_per_minute(fetch_with_fresh_browser, urls[:8])
+    print(f"Fresh browser per URL + 3s wait: {legacy:.0f} pages/min")
+
+    pool = BrowserPool(size=concurrency, pages_per_browser=20)
+    pages_per_minute(pool.fetch, urls[:concurrency])  # launch the browsers outside the measurement
+    pooled = pages_per_minute(pool.fetch, urls)
+    print(f"Browser pool ({concurrency} workers):      {pooled:.0f} pages/min ({pooled / legacy:.1f}x)")
+    print(pool.get_stats())
+    pool.close()
+    server.shutdown()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Cold Storage
+Disk-backed store for rarely read job fields, fetched on demand with a small LRU
+"""
+
+import logging
+import pickle
+import tempfile
+import threading
+from array import array
+from functools import lru_cache
+from typing import List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class ColdStore:
+    """
+    Append-only file of pickled records addressed by integer id
+
+    Only the offset and length of each record stay in memory (16 bytes per
+    record). The file is an anonymous temporary file in `directory`, so it is
+    removed when the store is closed or garbage-collected; put it on a real
+    disk, since a tmpfs would keep the "spilled" data in RAM. Replaced
+    records are not reclaimed until the store is rebuilt (e.g. on reload).
+    """
+
+    def __init__(self, directory: str = None, cache_size: int = 256):
+        self._file = tempfile.TemporaryFile(prefix="cold_columns_", dir=directory)
+        self._offsets = array('q')
+        self._lengths = array('q')
+        self._size = 0
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.read = lru_cache(maxsize=cache_size)(self._read)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def bytes_on_disk(self) -> int:
+        return self._size
+
+    def append_many(self, records: List[Dict[str, Any]]) -> List[int]:
+        """
+        Write records to the end of the file
+
+        Args:
+            records: Field name -> value dicts
+
+        Returns:
+            Record ids, in the same order
+        """
+        blobs = [pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL) for record in records]
+        with self._lock:
+            first_id = len(self._offsets)
+            self._file.seek(self._size)
+            for blob in blobs:
+                self._file.write(blob)
+                self._offsets.append(self._size)
+                self._lengths.append(len(blob))
+                self._size += len(blob)
+            self._file.flush()
+        return list(range(first_id, first_id + len(blobs)))
+
+    def _read(self, record_id: int) -> Dict[str, Any]:
+        """Read one record from disk (wrapped with an LRU as `read`; do not mutate the result)"""
+        with self._lock:
+            self._file.seek(self._offsets[record_id])
+            blob = self._file.read(self._lengths[record_id])
+            self.reads += 1
+        return pickle.loads(blob)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Record count, file size and cache effectiveness"""
+        cache = self.read.cache_info()
+        return {
+            'records': len(self),
+            'bytes_on_disk': self._size,
+            'cache_hits': cache.hits,
+            'cache_misses': cache.misses
+        }
+
+    def close(self):
+        """Delete the backing file"""
+        self.read.cache_clear()
+        self._file.close()
+
+
+# Test functionality
+if __name__ == "__main__":
+    import random
+    import time
+
+    print("🧪 Testing cold storage...")
+    print("=" * 50)
+
+    store = ColdStore()
+    rng = random.Random(0)
+    records = [{'apply_link': f"https://example.com/apply/{i}", 'company_logo': f"https://cdn.example.com/{i}.png",
+                'description': "x" * rng.randint(200, 2000)} for i in range(20000)]
+    start_time = time.time()
+    ids = store.append_many(records)
+    print(f"Wrote {len(ids)} records ({store.bytes_on_disk / 1e6:.1f} MB) in {time.time() - start_time:.2f}s")
+
+    assert all(store.read(i) == records[i] for i in rng.sample(ids, 1000))
+    start_time = time.time()
+    for record_id in rng.sample(ids, 5000):
+        store._read(record_id)
+    print(f"Uncached read: {(time.time() - start_time) / 5000 * 1e6:.1f}µs per record")
+    print(store.get_stats())
+    store.close()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Dataset Catalog
+Registers many job datasets, loads them lazily and evicts least-recently-used ones under a memory budget
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Set
+
+try:
+    from .job_database_manager import JobDatabaseManager, JobData
+    from .tokenizer import Tokenizer
+    from .location_gazetteer import LocationGazetteer
+except ImportError:
+    from job_database_manager import JobDatabaseManager, JobData
+    from tokenizer import Tokenizer
+    from location_gazetteer import LocationGazetteer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DatasetSpec:
+    """A registered dataset (one corpus per country/source)"""
+    name: str
+    csv_path: str
+    snapshot_dir: Optional[str] = None
+    country: Optional[str] = None
+    source: Optional[str] = None
+
+
+class DatasetCatalog:
+    """
+    Named JobDatabaseManager instances loaded on first use
+
+    Registering a dataset is free; it is loaded (from its jobs snapshot when
+    current, else from CSV) the first time a query needs it. Loaded datasets
+    are kept in LRU order, and after each load the least recently used ones
+    are evicted until the estimated resident size fits the memory budget
+    (sizes are re-measured after upserts). Evicted datasets with upserts are
+    written to their snapshot first. The job keys of every dataset loaded so
+    far are kept, so ID lookups only load the datasets that may hold the ID.
+    Queries spanning several datasets merge the per-dataset results by date.
+    """
+
+    def __init__(self, memory_budget_mb: float = None, tokenizer: Tokenizer = None,
+                 gazetteer: LocationGazetteer = None, spam_keywords: List[str] = None):
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024) if memory_budget_mb else None
+        self.tokenizer = tokenizer
+        self.gazetteer = gazetteer
+        self.spam_keywords = spam_keywords
+        self.specs: Dict[str, DatasetSpec] = {}
+        # Loaded managers, least recently used first
+        self._loaded: "OrderedDict[str, JobDatabaseManager]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        # Job keys (posting IDs, else URL/content keys) per dataset, kept across evictions
+        self._job_keys: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        # One lock per dataset so a slow load doesn't block queries on other datasets
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.loads = 0
+        self.evictions = 0
+        # Optional SavedSearchPercolator notified of the newly inserted jobs of every upsert
+        self.percolator = None
+
+    def register(self, name: str, csv_path: str, snapshot_dir: str = None,
+                 country: str = None, source: str = None) -> DatasetSpec:
+        """
+        Add a dataset to the catalog without loading it
+
+        Args:
+            name: Unique dataset name
+            csv_path: CSV the dataset is loaded from
+            snapshot_dir: Snapshot directory (defaults next to the CSV)
+            country: Country code used to select datasets in queries
+            source: Source name (linkedin, bdjobs, ...) used to select datasets
+
+        Returns:
+            The registered DatasetSpec
+        """
+        spec = DatasetSpec(name, csv_path, snapshot_dir, country.upper() if country else None,
+                           source.lower() if source else None)
+        with self._lock:
+            if name in self._loaded:
+                self.evict(name)
+            self._job_keys.pop(name, None)
+            self.specs[name] = spec
+            self._load_locks.setdefault(name, threading.Lock())
+        logger.info(f"Registered dataset '{name}' ({csv_path})")
+        return spec
+
+    def unregister(self, name: str) -> bool:
+        """Remove a dataset, evicting it if loaded"""
+        with self._lock:
+            if name not in self.specs:
+                return False
+            self.evict(name)
+            del self.specs[name]
+            self._job_keys.pop(name, None)
+            return True
+
+    def get(self, name: str) -> JobDatabaseManager:
+        """
+        Return a dataset's manager, loading it on first use
+
+        Raises:
+            KeyError: If the dataset is not registered
+        """
+        with self._lock:
+            spec = self.specs[name]
+            manager = self._loaded.get(name)
+            if manager is not None:
+                self._loaded.move_to_end(name)
+                return manager
+            load_lock = self._load_locks[name]
+
+        with load_lock:
+            with self._lock:
+                manager = self._loaded.get(name)
+                if manager is not None:
+                    self._loaded.move_to_end(name)
+                    return manager
+
+            logger.info(f"📂 Loading dataset '{name}'...")
+            manager = JobDatabaseManager(spec.csv_path, snapshot_dir=spec.snapshot_dir,
+                                         tokenizer=self.tokenizer, gazetteer=self.gazetteer,
+                                         spam_keywords=self.spam_keywords)
+            size = manager.estimate_memory_bytes()
+            job_keys = manager.job_keys()
+
+            with self._lock:
+                self._loaded[name] = manager
+                self._sizes[name] = size
+                self._job_keys[name] = job_keys
+                self.loads += 1
+                self._enforce_budget(keep=name)
+        return manager
+
+    def evict(self, name: str) -> bool:
+        """Drop a loaded dataset from memory (its snapshot is updated if it has upserts)"""
+        with self._lock:
+            manager = self._loaded.pop(name, None)
+            self._sizes.pop(name, None)
+        if manager is None:
+            return False
+        if manager.has_unsaved_changes:
+            manager.save_snapshot()
+        self.evictions += 1
+        logger.info(f"♻️ Evicted dataset '{name}'")
+        return True
+
+    def resident_bytes(self) -> int:
+        """Estimated memory held by all loaded datasets"""
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def _remeasure(self, name: str, manager: JobDatabaseManager):
+        """Update a loaded dataset's size after its jobs changed and re-apply the budget"""
+        size = manager.estimate_memory_bytes()
+        with self._lock:
+            if self._loaded.get(name) is manager:
+                self._sizes[name] = size
+                self._enforce_budget(keep=name)
+
+    def _enforce_budget(self, keep: str):
+        """Evict least recently used datasets until the loaded ones fit the budget"""
+        if self.memory_budget is None:
+            return
+        while self.resident_bytes() > self.memory_budget:
+            victim = next((name for name in self._loaded if name != keep), None)
+            if victim is None:
+                logger.warning(f"⚠️ Dataset '{keep}' alone ({self._sizes[keep]} bytes) exceeds the memory budget "
+                               f"({self.memory_budget} bytes)")
+                break
+            self.evict(victim)
+
+    def _select(self, datasets: List[str] = None, country: str = None, source: str = None) -> List[str]:
+        """Names of the datasets a query should run on"""
+        with self._lock:
+            names = list(datasets) if datasets else list(self.specs)
+            unknown = [name for name in names if name not in self.specs]
+            if unknown:
+                raise KeyError(f"Unknown datasets: {unknown}")
+            return [name for name in names
+                    if (not country or self.specs[name].country == country.upper())
+                    and (not source or self.specs[name].source == source.lower())]
+
+    @staticmethod
+    def _merge(results: List[List[JobData]], limit: int, sort_by_date: bool = True) -> List[JobData]:
+        """Merge per-dataset result lists, dropping jobs already returned by another dataset"""
+        if sort_by_date:
+            def date_key(job):
+                return JobDatabaseManager._parse_posted_date(job.posted_date) or datetime.min
+            merged = heapq.merge(*results, key=date_key, reverse=True)
+        else:
+            merged = itertools.chain.from_iterable(results)
+
+        jobs, seen = [], set()
+        for job in merged:
+            key = JobDatabaseManager._job_key(job)
+            if key:
+                if key in seen:
+                    continue
+                seen.add(key)
+            jobs.append(job)
+            if len(jobs) >= limit:
+                break
+        return jobs
+
+    def search_jobs(self, query: str, location: str = None,
+                    experience_level: str = None, limit: int = 20,
+                    sort_by_date: bool = True, remote: bool = False,
+                    has_salary: bool = False, datasets: List[str] = None,
+                    country: str = None, source: str = None) -> List[JobData]:
+        """
+        Search the selected datasets and merge their results (see JobDatabaseManager.search_jobs)
+
+        Args:
+            datasets: Dataset names to search (all registered datasets by default)
+            country: Only search datasets registered for this country
+            source: Only search datasets registered for this source
+        """
+        results = [self.get(name).search_jobs(query, location=location, experience_level=experience_level,
+                                              limit=limit, sort_by_date=sort_by_date, remote=remote,
+                                              has_salary=has_salary)
+                   for name in self._select(datasets, country, source)]
+        return self._merge(results, limit, sort_by_date)
+
+    def estimate_hits(self, query: str, location: str = None,
+                      experience_level: str = None, remote: bool = False,
+                      has_salary: bool = False, datasets: List[str] = None,
+                      country: str = None, source: str = None) -> float:
+        """Sum of the hit estimates of the selected datasets (see JobDatabaseManager.estimate_hits)"""
+        return sum(self.get(name).estimate_hits(query, location=location, experience_level=experience_level,
+                                                remote=remote, has_salary=has_salary)
+                   for name in self._select(datasets, country, source))
+
+    def filter_jobs(self, filters: Dict[str, Any], limit: int = 20, sort_by_date: bool = True,
+                    datasets: List[str] = None, country: str = None, source: str = None) -> List[JobData]:
+        """Filter the selected datasets and merge their results (see JobDatabaseManager.filter_jobs)"""
+        results = [self.get(name).filter_jobs(filters, limit=limit, sort_by_date=sort_by_date)
+                   for name in self._select(datasets, country, source)]
+        return self._merge(results, limit, sort_by_date)
+
+    def get_recent_jobs(self, limit: int = 20, days: int = 30, datasets: List[str] = None) -> List[JobData]:
+        """Most recent jobs across the selected datasets"""
+        results = [self.get(name).get_recent_jobs(limit=limit, days=days) for name in self._select(datasets)]
+        return self._merge(results, limit)
+
+    def _find_dataset(self, job_id: str) -> Optional[str]:
+        """
+        Name of the dataset holding a posting ID
+
+        Only datasets whose known job keys contain the ID (loaded ones first)
+        and datasets never loaded yet are tried, so a lookup doesn't cycle
+        every dataset through the memory budget.
+        """
+        key = JobDatabaseManager._normalize_job_id(job_id)
+        if not key:
+            return None
+        with self._lock:
+            names = [name for name in reversed(self._loaded) if key in self._job_keys.get(name, ())]
+            names += [name for name in self.specs if name not in self._loaded and key in self._job_keys.get(name, ())]
+            names += [name for name in self.specs if name not in self._job_keys]
+        for name in names:
+            if self.get(name).get_job_by_id(key) is not None:
+                return name
+        return None
+
+    def get_job_by_id(self, job_id: str) -> Optional[JobData]:
+        """Look up a posting ID in any dataset"""
+        name = self._find_dataset(job_id)
+        return self.get(name).get_job_by_id(job_id) if name else None
+
+    def similar_jobs(self, job_id: str, k: int = 10) -> List[JobData]:
+        """Jobs similar to a given job, from the dataset that holds it (embedding spaces differ per dataset)"""
+        name = self._find_dataset(job_id)
+        return self.get(name).similar_jobs(job_id, k=k) if name else []
+
+    def upsert_jobs(self, jobs: List[JobData], dataset: str) -> Dict[str, int]:
+        """Insert or update jobs in one dataset (see JobDatabaseManager.upsert_jobs)"""
+        manager = self.get(dataset)
+        result, inserted = manager._upsert_jobs(jobs)
+        with self._lock:
+            self._job_keys.setdefault(dataset, set()).update(
+                key for key in map(JobDatabaseManager._job_key, jobs) if key)
+        self._remeasure(dataset, manager)
+        # Only new postings alert; updates of stored jobs alerted when first inserted
+        if self.percolator is not None:
+            self.percolator.percolate([jobs[i] for i in inserted])
+        return result
+
+    def expire_jobs(self, now: datetime = None) -> int:
+        """Remove expired jobs from the loaded datasets (see JobDatabaseManager.expire_jobs)"""
+        with self._lock:
+            loaded = list(self._loaded.items())
+        expired = 0
+        for name, manager in loaded:
+            count = manager.expire_jobs(now)
+            if count:
+                job_keys = manager.job_keys()
+                with self._lock:
+                    if name in self._job_keys:
+                        self._job_keys[name] = job_keys
+                self._remeasure(name, manager)
+            expired += count
+        return expired
+
+    def list_datasets(self) -> List[Dict[str, Any]]:
+        """Registered datasets with their load state and estimated size"""
+        with self._lock:
+            return [{
+                'name': spec.name,
+                'csv_path': spec.csv_path,
+                'country': spec.country,
+                'source': spec.source,
+                'loaded': spec.name in self._loaded,
+                'resident_bytes': self._sizes.get(spec.name, 0)
+            } for spec in self.specs.values()]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Catalog statistics plus combined counts for the loaded datasets"""
+        with self._lock:
+            loaded = list(self._loaded.items())
+        dataset_stats = [manager.get_statistics() for _, manager in loaded]
+        return {
+            'total_jobs': sum(stats.get('total_jobs', 0) for stats in dataset_stats),
+            'datasets': self.list_datasets(),
+            'loaded_datasets': [name for name, _ in loaded],
+            'resident_bytes': self.resident_bytes(),
+            'memory_budget_bytes': self.memory_budget,
+            'loads': self.loads,
+            'evictions': self.evictions
+        }
+
+
+# Test functionality
+if __name__ == "__main__":
+    import sys
+    import time
+
+    print("🧪 Testing dataset catalog...")
+    print("=" * 50)
+
+    csv_paths = sys.argv[1:] or ["Linkedin job listings information.csv", "linkedin_jobs_fast.csv"]
+    catalog = DatasetCatalog(memory_budget_mb=48)
+    for i, path in enumerate(csv_paths):
+        catalog.register(f"dataset_{i}", path, source="linkedin")
+
+    for name in list(catalog.specs) * 2:
+        start_time = time.time()
+        results = catalog.search_jobs("software engineer", datasets=[name], limit=5)
+        print(f"{name}: {len(results)} results in {(time.time() - start_time) * 1000:.0f}ms")
+
+    start_time = time.time()
+    merged = catalog.search_jobs("engineer", location="Dhaka", limit=10)
+    print(f"All datasets: {len(merged)} results in {(time.time() - start_time) * 1000:.0f}ms")
+    for dataset in catalog.list_datasets():
+        print(f"   {dataset['name']}: loaded={dataset['loaded']}, {dataset['resident_bytes'] / 1e6:.1f} MB")
+    stats = catalog.get_statistics()
+    print(f"Loads: {stats['loads']}, evictions: {stats['evictions']}, "
+          f"resident: {stats['resident_bytes'] / 1e6:.1f} MB of {stats['memory_budget_bytes'] / 1e6:.1f} MB")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Deadline
+One time budget shared by every stage of a search, with cooperative cancellation
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    Absolute expiry time for a search
+
+    Created once per request and passed down to the web search, page fetches
+    and LLM calls. Each stage asks for `remaining(cap=...)` (its own usual
+    timeout, shortened to what is left of the budget) and workers check
+    `expired()` between units of work. `cancel()` expires it immediately,
+    e.g. when the client has gone away. Without a timeout it never expires
+    on its own and `remaining(cap)` is just the cap.
+    """
+
+    def __init__(self, timeout: float = None, parent: 'Deadline' = None):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout if timeout is not None else None
+        self.parent = parent
+        if parent is not None and parent.expires_at is not None:
+            self.expires_at = parent.expires_at if self.expires_at is None else min(self.expires_at, parent.expires_at)
+        self._cancelled = threading.Event()
+
+    def stage(self, share: float) -> 'Deadline':
+        """
+        Sub-deadline for one stage of the search
+
+        Args:
+            share: Fraction of the remaining time the stage may use
+
+        Returns:
+            A Deadline expiring after that share (never after this one), and
+            cancelled whenever this one is
+        """
+        remaining = self.remaining()
+        return Deadline(remaining * share if remaining is not None else None, parent=self)
+
+    def remaining(self, cap: float = None) -> Optional[float]:
+        """
+        Seconds left in the budget
+
+        Args:
+            cap: The stage's own timeout; the result is never larger
+
+        Returns:
+            Seconds left (0.0 once expired), or None with no timeout and no cap
+        """
+        if self.cancelled:
+            return 0.0
+        if self.expires_at is None:
+            return cap
+        left = max(0.0, self.expires_at - time.monotonic())
+        return left if cap is None else min(left, cap)
+
+    def expired(self) -> bool:
+        """True once the budget is used up or the deadline was cancelled"""
+        if self.cancelled:
+            return True
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cancel(self):
+        """Expire the deadline now"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def __repr__(self) -> str:
+        return f"Deadline(timeout={self.timeout}, remaining={self.remaining()})"
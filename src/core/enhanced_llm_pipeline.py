@@ -10,6 +10,7 @@ from typing import List, Dict, Optional, Any, Union
 from dataclasses import dataclass
 from enum import Enum
 import re
+import threading
 from concurrent.futures import ThreadPoolExecutor, TimeoutError
 
 try:
@@ -29,6 +30,13 @@ try:
 except ImportError:
     OLLAMA_AVAILABLE = False
 
+try:
+    from .deadline import Deadline
+    from .tracing import span
+except ImportError:
+    from deadline import Deadline
+    from tracing import span
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -160,8 +168,11 @@ class GeminiLLM:
         try:
             prompt = PromptTemplate.JOB_EXTRACTION_MAIN.format(html_content=html_content)
             
-            # Make request with retries
+            # Make request with retries, all within the timeout
             for attempt in range(self.max_retries):
+                remaining = timeout - (time.time() - start_time)
+                if remaining <= 0:
+                    break
                 try:
                     response = self.model.generate_content(
                         prompt,
@@ -169,7 +180,8 @@ class GeminiLLM:
                             temperature=0.1,
                             top_p=0.8,
                             max_output_tokens=4096,
-                        )
+                        ),
+                        request_options={"timeout": remaining}
                     )
                     
                     if response and response.text:
@@ -188,7 +200,8 @@ class GeminiLLM:
                 except Exception as e:
                     logger.warning(f"⚠️ Gemini attempt {attempt + 1} failed: {e}")
                     if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay * (2 ** attempt))
+                        time.sleep(max(0.0, min(self.retry_delay * (2 ** attempt),
+                                                timeout - (time.time() - start_time))))
                     continue
             
             # All attempts failed
@@ -199,7 +212,7 @@ class GeminiLLM:
                 provider=LLMProvider.GEMINI.value,
                 processing_time=processing_time,
                 confidence_score=0.0,
-                errors=[f"All {self.max_retries} attempts failed"]
+                errors=[f"All attempts failed within {timeout:.1f}s"]
             )
             
         except Exception as e:
@@ -495,7 +508,7 @@ class HuggingFaceLLM:
         try:
             if self.api_key:
                 # Use Hugging Face Inference API
-                jobs = self._api_extraction(html_content)
+                jobs = self._api_extraction(html_content, timeout)
             elif self.pipeline:
                 # Use local model
                 jobs = self._local_extraction(html_content)
@@ -526,7 +539,7 @@ class HuggingFaceLLM:
                 errors=[str(e)]
             )
     
-    def _api_extraction(self, html_content: str) -> List[JobListing]:
+    def _api_extraction(self, html_content: str, timeout: float = 30.0) -> List[JobListing]:
         """Extract jobs using Hugging Face Inference API"""
         try:
             import requests
@@ -552,7 +565,7 @@ class HuggingFaceLLM:
                 self.api_url,
                 headers=self.headers,
                 json={"inputs": prompt, "parameters": {"max_length": 1000}},
-                timeout=30
+                timeout=timeout
             )
             
             if response.status_code == 200:
@@ -660,12 +673,13 @@ class HuggingFaceLLM:
 class OllamaLLM:
     """Ollama LLM implementation (local, free)"""
     
-    def __init__(self, model_name: str = "llama2"):
+    def __init__(self, model_name: str = "llama2", timeout: float = 45.0):
         if not OLLAMA_AVAILABLE:
             raise ImportError("ollama package not installed")
         
         self.model_name = model_name
-        self.client = ollama.Client()
+        # The client fixes its HTTP timeout, so calls are capped at the pipeline's extraction timeout
+        self.client = ollama.Client(timeout=timeout)
         self._test_connection()
     
     def _test_connection(self):
@@ -799,11 +813,12 @@ class EnhancedLLMPipeline:
         # Initialize Hugging Face if available
         if TRANSFORMERS_AVAILABLE:
             try:
-                # Initialize Hugging Face with API key if available
+                # Initialize Hugging Face with API key if available (read from config only
+                # when the caller didn't pass one)
                 try:
-                    from config import Config
-                    config_instance = Config()
-                    huggingface_api_key = config_instance.get_llm_config().get('huggingface_api_key')
+                    if not huggingface_api_key:
+                        from config import Config
+                        huggingface_api_key = Config().get_llm_config().get('huggingface_api_key')
                     if huggingface_api_key:
                         self.providers[LLMProvider.HUGGINGFACE] = HuggingFaceLLM(api_key=huggingface_api_key)
                         logger.info("✅ Hugging Face LLM initialized with API key")
@@ -830,18 +845,32 @@ class EnhancedLLMPipeline:
         
         self.max_concurrent_extractions = 1  # Conservative for now
         self.extraction_timeout = 45.0
+        # Provider calls run here so a call can be abandoned when its time budget runs out.
+        # An abandoned call is not cancelled: it keeps its thread until the provider's own
+        # HTTP timeout (set from the same budget) ends it, so slots are counted separately
+        # and released only when a call really finishes.
+        self.max_concurrent_calls = 8
+        self._call_executor = ThreadPoolExecutor(max_workers=self.max_concurrent_calls, thread_name_prefix="llm-call")
+        self._call_slots = threading.BoundedSemaphore(self.max_concurrent_calls)
     
-    def extract_jobs_from_html(self, html_content: str, source_url: str = "") -> ExtractionResult:
+    def extract_jobs_from_html(self, html_content: str, source_url: str = "",
+                               deadline: Deadline = None) -> ExtractionResult:
         """
         Extract jobs from HTML using the best available LLM
         
         Args:
             html_content: Raw HTML content
             source_url: Source URL for context
+            deadline: Time budget; each provider gets at most the remaining time
+                (capped at extraction_timeout) as its HTTP timeout, and once it
+                expires only the local fallback extraction is tried. A provider
+                call that overruns it is abandoned, not cancelled; while such
+                calls occupy every slot, providers are skipped for the fallback
             
         Returns:
             ExtractionResult with job listings
         """
+        deadline = deadline or Deadline()
         if not self.providers:
             logger.error("❌ No LLM providers available")
             return ExtractionResult(
@@ -861,9 +890,32 @@ class EnhancedLLMPipeline:
             if not llm:
                 continue
             
+            if deadline.expired():
+                # Skip the remaining providers; the local fallback below is cheap
+                logger.warning(f"⏰ Time budget used up before trying {provider.value}")
+                break
+            
+            if not self._call_slots.acquire(blocking=False):
+                # Queueing behind abandoned calls would only spend the budget waiting
+                logger.warning(f"⚠️ All {self.max_concurrent_calls} LLM call slots busy, skipping providers")
+                break
+            
             try:
                 logger.info(f"🔄 Trying {provider.value} for extraction...")
-                result = llm.extract_jobs(html_content, self.extraction_timeout)
+                timeout = deadline.remaining(cap=self.extraction_timeout)
+                try:
+                    future = self._call_executor.submit(llm.extract_jobs, html_content, timeout)
+                except Exception:
+                    self._call_slots.release()
+                    raise
+                future.add_done_callback(lambda _: self._call_slots.release())
+                with span(f"llm:{provider.value}"):
+                    try:
+                        result = future.result(timeout=timeout)
+                    except TimeoutError:
+                        # Abandoned: the running call ends on its own HTTP timeout and frees its slot then
+                        logger.warning(f"⏰ {provider.value} extraction timed out after {timeout:.1f}s, abandoning the call")
+                        continue
                 
                 if result.success and result.jobs:
                     # Enrich jobs with source information
@@ -884,7 +936,8 @@ class EnhancedLLMPipeline:
         # All providers failed - try simple fallback extraction
         logger.warning("⚠️ All LLM providers failed, trying fallback extraction...")
         try:
-            fallback_jobs = self._fallback_extraction(html_content, source_url)
+            with span("fallback_extraction"):
+                fallback_jobs = self._fallback_extraction(html_content, source_url)
             if fallback_jobs:
                 logger.info(f"✅ Fallback extraction found {len(fallback_jobs)} jobs")
                 return ExtractionResult(
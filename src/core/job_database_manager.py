@@ -8,10 +8,16 @@ import pandas as pd
 import numpy as np
 import re
 import logging
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Set, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import json
+import hashlib
+import pickle
+from collections import Counter
+from bisect import bisect_left, bisect_right, insort
+import zlib
+import threading
 from pathlib import Path
 import sys
 import os
@@ -20,6 +26,29 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from config import Config
 
+try:
+    from .query_planner import QueryPlanner, IndexPredicate
+    from .semantic_index import SemanticIndex
+    from .ann_index import IVFIndex
+    from .rw_lock import ReadWriteLock, read_locked, write_locked
+    from .text_compression import DescriptionCompressor
+    from .cold_storage import ColdStore
+    from .job_screening import JobScreener, default_screener
+    from .tokenizer import Tokenizer, UnicodeTokenizer
+    from .location_gazetteer import LocationGazetteer, default_gazetteer
+    from .job_identity import job_fingerprint
+except ImportError:
+    from query_planner import QueryPlanner, IndexPredicate
+    from semantic_index import SemanticIndex
+    from ann_index import IVFIndex
+    from rw_lock import ReadWriteLock, read_locked, write_locked
+    from text_compression import DescriptionCompressor
+    from cold_storage import ColdStore
+    from job_screening import JobScreener, default_screener
+    from tokenizer import Tokenizer, UnicodeTokenizer
+    from location_gazetteer import LocationGazetteer, default_gazetteer
+    from job_identity import job_fingerprint
+
 @dataclass
 class JobData:
     """Standardized job data structure"""
@@ -48,26 +77,191 @@ class JobData:
     base_salary: Optional[Dict] = None
     job_base_pay_range: Optional[str] = None
     job_posted_time: Optional[str] = None
+    # Jobs written through from the web fallback: when they were fetched and
+    # when they drop out of the store (ISO timestamps; None for dataset rows)
+    fetched_at: Optional[str] = None
+    expires_at: Optional[str] = None
+    
+    def compress_description(self, compressor: DescriptionCompressor):
+        """Keep the description as a compressed blob; `job.description` still returns the text"""
+        text = self.__dict__.get('description')
+        if isinstance(text, str) and text:
+            self._compressed_description = (compressor, compressor.compress(text))
+            del self.__dict__['description']
+    
+    def cold_record(self) -> Dict[str, Any]:
+        """The cold fields held in memory (descriptions stay compressed)"""
+        record = {name: self.__dict__[name] for name in COLD_FIELDS if name in self.__dict__}
+        packed = self.__dict__.get('_compressed_description')
+        if packed is not None:
+            record['description'] = packed[1]
+        return record
+    
+    def spill(self, store: ColdStore, record_id: int, compressor: Optional[DescriptionCompressor]):
+        """
+        Replace the cold fields with one reference to their record in the cold store
+        
+        Values are swapped in place rather than deleted, so the instance dict
+        keeps its compact key-sharing layout.
+        """
+        ref = ColdRef(store, record_id, compressor)
+        for name in COLD_FIELDS:
+            self.__dict__[name] = ref
+        self.__dict__.pop('_compressed_description', None)
+    
+    def __getstate__(self):
+        # Pickled/copied jobs carry plain values, not references to the compressor or cold store
+        state = dict(self.__dict__)
+        packed = state.pop('_compressed_description', None)
+        if packed is not None and 'description' not in state:
+            compressor, blob = packed
+            state['description'] = compressor.decompress(blob)
+        for name, value in state.items():
+            if isinstance(value, ColdRef):
+                state[name] = value.load(name)
+        return state
+
+
+class ColdRef:
+    """Location of a job's cold fields in a ColdStore"""
+    __slots__ = ('store', 'record_id', 'compressor')
+    
+    def __init__(self, store: ColdStore, record_id: int, compressor: Optional[DescriptionCompressor]):
+        self.store = store
+        self.record_id = record_id
+        self.compressor = compressor
+    
+    def load(self, name: str) -> Any:
+        value = self.store.read(self.record_id).get(name)
+        return self.compressor.decompress(value) if isinstance(value, bytes) and self.compressor else value
+
+
+class _ColdField:
+    """
+    Data descriptor for fields that may be compressed or spilled to the cold store
+    
+    Plain values are stored in and read from the instance dict as usual;
+    a compressed description or a ColdRef is resolved on access.
+    """
+    
+    def __init__(self, name: str, default: Any):
+        self.name = name
+        self.default = default
+    
+    def __get__(self, job, owner=None):
+        if job is None:
+            if self.default is _MISSING:
+                raise AttributeError(self.name)
+            return self.default
+        value = job.__dict__.get(self.name, _MISSING)
+        if type(value) is ColdRef:
+            return value.load(self.name)
+        if value is _MISSING:
+            packed = job.__dict__.get('_compressed_description') if self.name == 'description' else None
+            if packed is not None:
+                compressor, blob = packed
+                return compressor.decompress(blob)
+            if self.default is _MISSING:
+                raise AttributeError(f"'{type(job).__name__}' object has no attribute '{self.name}'")
+            return self.default
+        return value
+    
+    def __set__(self, job, value):
+        job.__dict__[self.name] = value
+
+
+# Rarely read fields that are compressed or spilled to disk under a memory limit
+COLD_FIELDS = ('description', 'company_logo', 'apply_link', 'base_salary')
+_MISSING = object()
+for _name in COLD_FIELDS:
+    setattr(JobData, _name, _ColdField(_name, getattr(JobData, _name, _MISSING)))
 
 class JobDatabaseManager:
-    """Manages the LinkedIn job dataset with search and filter capabilities"""
+    """
+    Manages the LinkedIn job dataset with search and filter capabilities
+    
+    Safe for concurrent use: queries run under the shared side of a
+    reader-writer lock, upserts and reloads under the exclusive side.
+    """
+    
+    # Parsed jobs cached in the snapshot directory (skips CSV parsing on reload)
+    JOBS_SNAPSHOT_FILE = "jobs.pkl"
     
-    def __init__(self, csv_path: str = "Linkedin job listings information.csv"):
+    # Scraper CSV headers -> LinkedIn dataset headers
+    COLUMN_ALIASES = {
+        'title': 'job_title',
+        'company': 'company_name',
+        'location': 'job_location',
+        'description': 'job_summary',
+        'summary': 'job_summary',
+        'job_id': 'job_posting_id'
+    }
+    
+    def __init__(self, csv_path: str = "Linkedin job listings information.csv",
+                 snapshot_dir: str = None, shard: Tuple[int, int] = None,
+                 tokenizer: Tokenizer = None, gazetteer: LocationGazetteer = None,
+                 memory_limit_mb: float = None, spam_keywords: List[str] = None):
         self.config = Config()
         self.csv_path = csv_path
+        # (shard_id, num_shards) when this manager owns only a hash partition of the dataset
+        self.shard = shard
+        # Directory holding offline-built artifacts (semantic vectors, etc.) for this dataset
+        csv_file = Path(csv_path)
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else \
+            csv_file.parent / f"{csv_file.stem}_snapshot"
         self.logger = logging.getLogger(__name__)
+        self._rw_lock = ReadWriteLock()
+        # Serializes lazy loading/building of the vector indexes by concurrent readers
+        self._index_build_lock = threading.RLock()
         self.df = None
         self.jobs_cache = []
+        self.posted_dates = []
         self.search_index = {}
+        # Row of each job by _job_key (its posting ID when it has one)
+        self.id_index = {}
+        self.query_planner = QueryPlanner()
+        # Splits titles and queries into index terms (n-grams for CJK, NFKC + case-folding)
+        self.tokenizer = tokenizer or UnicodeTokenizer()
+        # Resolves job locations to division/district node ids ("bd/dhaka/gazipur")
+        self.gazetteer = gazetteer or default_gazetteer()
+        # Per-row gazetteer nodes (most specific first, with ancestors)
+        self.location_nodes = []
+        self.semantic_index = None
+        self.ann_index = None
+        # Shared-dictionary compressor holding job descriptions in memory
+        self.description_compressor = None
+        # Above this many jobs semantic search uses the IVF index instead of brute force
+        self.ann_threshold = 20000
+        # Optional SavedSearchPercolator notified of the newly inserted jobs of every upsert
+        self.percolator = None
+        # Above this estimated resident size, cold columns are spilled to disk
+        self.memory_limit = int(memory_limit_mb * 1024 * 1024) if memory_limit_mb else None
+        self.cold_store = None
+        # Rejects incomplete and spam postings before they become JobData
+        self.screener = JobScreener(spam_keywords) if spam_keywords is not None else default_screener
+        self.rejection_counts = Counter()
+        # Upserts not yet written to the jobs snapshot
+        self.has_unsaved_changes = False
+        # Signature of the CSV the loaded jobs came from
+        self._source = None
         
         # Load the dataset
         self._load_dataset()
         self._create_search_index()
+        self._apply_memory_limit()
     
-    def _load_dataset(self):
-        """Load and preprocess the LinkedIn CSV dataset"""
+    def _load_dataset(self, use_snapshot: bool = True):
+        """Load and preprocess the LinkedIn CSV dataset (from the jobs snapshot when it is current)"""
         try:
+            if use_snapshot and self._load_jobs_snapshot():
+                self._order_by_posted_date()
+                self._compress_descriptions()
+                self.logger.info(f"✅ Loaded {len(self.jobs_cache)} jobs from snapshot {self.snapshot_dir}")
+                return
+            
             self.logger.info(f"Loading LinkedIn job dataset from {self.csv_path}")
+            self._source = self._source_signature()
+            self.rejection_counts = Counter()
             
             # Load CSV with proper encoding
             self.df = pd.read_csv(self.csv_path, encoding='utf-8')
@@ -75,9 +269,25 @@ class JobDatabaseManager:
             # Clean and preprocess data
             self._clean_data()
             
+            # Keep only this manager's hash partition in sharded mode
+            if self.shard:
+                self._select_shard()
+            
+            # Drop incomplete and spam rows before paying for JobData construction
+            self._screen_rows()
+            
             # Convert to standardized format
             self._convert_to_standard_format()
             
+            # Store jobs newest first so posting lists come out in date order
+            self._order_by_posted_date()
+            
+            # Descriptions are most of the memory; keep them compressed
+            self._compress_descriptions()
+            
+            self.df = None
+            self.save_snapshot()
+            
             self.logger.info(f"✅ Loaded {len(self.jobs_cache)} jobs from dataset")
             
         except Exception as e:
@@ -86,9 +296,19 @@ class JobDatabaseManager:
     
     def _clean_data(self):
         """Clean and preprocess the raw data"""
+        # Scraper outputs use short headers and may have no description column
+        aliases = {column: target for column, target in self.COLUMN_ALIASES.items()
+                   if column in self.df.columns and target not in self.df.columns}
+        self.df = self.df.rename(columns=aliases)
+        if 'job_summary' not in self.df.columns:
+            self.df['job_summary'] = ''
+        
         # Remove rows with missing essential data
         essential_columns = ['job_title', 'company_name', 'job_location', 'job_summary']
-        self.df = self.df.dropna(subset=essential_columns)
+        row_count = len(self.df)
+        self.df = self.df.dropna(subset=[col for col in essential_columns if col in self.df.columns])
+        if len(self.df) < row_count:
+            self.rejection_counts['missing_essential_column'] += row_count - len(self.df)
         
         # Clean text fields
         text_columns = ['job_title', 'company_name', 'job_location', 'job_summary']
@@ -108,6 +328,71 @@ class JobDatabaseManager:
         if 'job_num_applicants' in self.df.columns:
             self.df['job_num_applicants'] = pd.to_numeric(self.df['job_num_applicants'], errors='coerce')
     
+    def _source_signature(self) -> Dict[str, Any]:
+        """Identify the CSV (and shard) a jobs snapshot was built from"""
+        stat = os.stat(self.csv_path)
+        return {'csv_path': str(Path(self.csv_path).resolve()), 'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns, 'shard': list(self.shard) if self.shard else None,
+                'spam_keywords': sorted(self.screener.spam_keywords)}
+    
+    def _load_jobs_snapshot(self) -> bool:
+        """Load jobs_cache from the snapshot if it was built from the current CSV"""
+        path = self.snapshot_dir / self.JOBS_SNAPSHOT_FILE
+        if not path.exists():
+            return False
+        try:
+            with open(path, 'rb') as f:
+                snapshot = pickle.load(f)
+            if snapshot.get('source') != self._source_signature():
+                self.logger.info(f"Jobs snapshot {path} is stale, reloading from CSV")
+                return False
+            self.jobs_cache = snapshot['jobs']
+            self._source = snapshot['source']
+            self.rejection_counts = Counter(snapshot.get('rejections', {}))
+            return True
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not read jobs snapshot {path}: {e}")
+            return False
+    
+    def save_snapshot(self):
+        """Write the parsed jobs (including upserts) to the snapshot directory"""
+        path = self.snapshot_dir / self.JOBS_SNAPSHOT_FILE
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            with self._rw_lock.read():
+                snapshot = {'source': self._source, 'jobs': self.jobs_cache,
+                            'rejections': dict(self.rejection_counts)}
+                temp_path = path.with_suffix('.tmp')
+                with open(temp_path, 'wb') as f:
+                    pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, path)
+                self.has_unsaved_changes = False
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not write jobs snapshot {path}: {e}")
+    
+    @staticmethod
+    def shard_for_key(key: str, num_shards: int) -> int:
+        """Stable hash partition of a job key (see _job_key)"""
+        return zlib.crc32(key.encode('utf-8')) % num_shards
+    
+    def _select_shard(self):
+        """Drop rows that hash to other shards"""
+        shard_id, num_shards = self.shard
+        def column(name: str) -> pd.Series:
+            return self.df[name] if name in self.df.columns else pd.Series([None] * len(self.df), index=self.df.index)
+        keys = [self._row_key(*row) for row in zip(column('job_posting_id'), column('url'), column('job_title'),
+                                                   column('company_name'), column('job_location'))]
+        mask = [self.shard_for_key(key, num_shards) == shard_id for key in keys]
+        self.df = self.df[mask]
+    
+    def _screen_rows(self):
+        """Apply the screener to the whole DataFrame and record rejections per reason"""
+        keep, counts = self.screener.screen_frame(self.df)
+        self.df = self.df[keep]
+        self.rejection_counts.update(counts)
+        if counts:
+            self.logger.info(f"Screened out {sum(counts.values())} rows: {dict(counts)}")
+    
     def _parse_salary(self, salary_str: str) -> Optional[Dict]:
         """Parse salary string to structured format"""
         if pd.isna(salary_str) or salary_str == 'nan':
@@ -157,14 +442,29 @@ class JobDatabaseManager:
                     job_posted_time=row.get('job_posted_time')
                 )
                 
-                # Validate job before adding
-                if self._validate_job(job):
-                    self.jobs_cache.append(job)
+                self.jobs_cache.append(job)
                     
             except Exception as e:
                 self.logger.error(f"Error converting job row: {e}")
                 continue
     
+    def _order_by_posted_date(self):
+        """Sort jobs_cache by posted date (most recent first) and cache parsed dates"""
+        self.jobs_cache = self._sort_jobs_by_date(self.jobs_cache)
+        self.posted_dates = [self._parse_posted_date(job.posted_date) for job in self.jobs_cache]
+    
+    def _compress_descriptions(self, training_sample: int = 5000):
+        """Train a shared dictionary on a sample of descriptions and compress them all"""
+        descriptions = [job.description for job in self.jobs_cache[:training_sample]]
+        self.description_compressor = DescriptionCompressor().train(descriptions)
+        for job in self.jobs_cache:
+            job.compress_description(self.description_compressor)
+        
+        stats = self.description_compressor.get_stats()
+        if stats['compressed_bytes']:
+            self.logger.info(f"Compressed descriptions: {stats['raw_bytes']} -> {stats['compressed_bytes']} bytes "
+                             f"({stats['compression_ratio']}x)")
+    
     def _extract_skills_from_text(self, text: str) -> List[str]:
         """Extract potential skills from job description"""
         if not text:
@@ -206,20 +506,10 @@ class JobDatabaseManager:
         except:
             return None
     
-    def _validate_job(self, job: JobData) -> bool:
-        """Validate job data before including in results"""
-        # Check required fields
-        if not job.title or not job.company or not job.location:
-            return False
-        
-        # Basic spam detection
-        spam_keywords = ['work from home', 'earn money', 'make money', 'quick cash', 'get rich']
-        title_lower = job.title.lower()
-        
-        if any(keyword in title_lower for keyword in spam_keywords):
-            return False
-        
-        return True
+    @staticmethod
+    def _validate_job(job: JobData) -> bool:
+        """Validate a job with the default screening rules (managers use their own `screener`)"""
+        return default_screener.is_valid(job)
     
     def _create_search_index(self):
         """Create search index for fast keyword matching"""
@@ -227,153 +517,680 @@ class JobDatabaseManager:
             'titles': {},
             'companies': {},
             'locations': {},
+            'location_nodes': {},
             'skills': {},
-            'industries': {}
+            'industries': {},
+            'experience_levels': {},
+            'flags': {'remote': [], 'has_salary': []}
         }
+        self.id_index = {}
+        self.location_nodes = []
         
         for i, job in enumerate(self.jobs_cache):
-            # Index by title keywords
-            if job.title and isinstance(job.title, str):
-                title_words = re.findall(r'\b\w+\b', job.title.lower())
-                for word in title_words:
-                    if len(word) > 2:  # Skip short words
-                        if word not in self.search_index['titles']:
-                            self.search_index['titles'][word] = []
-                        self.search_index['titles'][word].append(i)
-            
-            # Index by company
-            if job.company and isinstance(job.company, str):
-                company_lower = job.company.lower()
-                if company_lower not in self.search_index['companies']:
-                    self.search_index['companies'][company_lower] = []
-                self.search_index['companies'][company_lower].append(i)
-            
-            # Index by location
-            if job.location and isinstance(job.location, str):
-                location_lower = job.location.lower()
-                if location_lower not in self.search_index['locations']:
-                    self.search_index['locations'][location_lower] = []
-                self.search_index['locations'][location_lower].append(i)
+            # Index by job key for direct lookups and upserts
+            key = self._job_key(job)
+            if key:
+                self.id_index[key] = i
             
-            # Index by skills
-            if job.skills and isinstance(job.skills, list):
-                for skill in job.skills:
-                    if isinstance(skill, str):
-                        skill_lower = skill.lower()
-                        if skill_lower not in self.search_index['skills']:
-                            self.search_index['skills'][skill_lower] = []
-                        self.search_index['skills'][skill_lower].append(i)
-            
-            # Index by industries
-            if job.job_industries and isinstance(job.job_industries, str):
-                industry_lower = job.job_industries.lower()
-                if industry_lower not in self.search_index['industries']:
-                    self.search_index['industries'][industry_lower] = []
-                self.search_index['industries'][industry_lower].append(i)
+            nodes = self.gazetteer.resolve_job_location(job.location)
+            self.location_nodes.append(nodes)
+            for name, value in self._index_entries(job, nodes):
+                self.search_index[name].setdefault(value, []).append(i)
+    
+    def _index_entries(self, job: JobData, nodes: Tuple[str, ...]) -> List[Tuple[str, str]]:
+        """(index name, key) pairs a job is listed under in the search index, each once"""
+        entries = []
+        
+        # Index by title keywords
+        if job.title and isinstance(job.title, str):
+            entries.extend(('titles', word) for word in self.tokenizer.tokenize(job.title))
+        
+        # Index by company
+        if job.company and isinstance(job.company, str):
+            entries.append(('companies', job.company.lower()))
+        
+        # Index by location
+        if job.location and isinstance(job.location, str):
+            entries.append(('locations', job.location.lower()))
+        
+        # Index by gazetteer node, so a division lists every job in its districts
+        entries.extend(('location_nodes', node_id) for node_id in nodes)
+        
+        # Index by skills
+        if job.skills and isinstance(job.skills, list):
+            entries.extend(('skills', skill.lower()) for skill in job.skills if isinstance(skill, str))
+        
+        # Index by industries
+        if job.job_industries and isinstance(job.job_industries, str):
+            entries.append(('industries', job.job_industries.lower()))
+        
+        # Index by experience level
+        if job.experience_level and isinstance(job.experience_level, str):
+            entries.append(('experience_levels', job.experience_level.lower()))
+        
+        # Index boolean filters so they can be pushed down into the planner
+        if self._is_remote_job(job):
+            entries.append(('flags', 'remote'))
+        if job.salary:
+            entries.append(('flags', 'has_salary'))
+        
+        # Deduplicated so each posting list names a job once
+        return list(dict.fromkeys(entries))
+    
+    def _discard_posting(self, name: str, value: str, row: int):
+        """Remove a row from one posting list (dropping the list when it becomes empty)"""
+        postings = self.search_index[name].get(value)
+        if postings is None:
+            return
+        position = bisect_left(postings, row)
+        if position < len(postings) and postings[position] == row:
+            del postings[position]
+        if not postings and name != 'flags':
+            del self.search_index[name][value]
     
+    def _date_position(self, date: Optional[datetime]) -> int:
+        """Row a job with this posted date goes to: after every job at least as recent"""
+        target = date or datetime.min
+        low, high = 0, len(self.posted_dates)
+        while low < high:
+            middle = (low + high) // 2
+            if (self.posted_dates[middle] or datetime.min) >= target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def _splice_rows(self, removed_rows: List[int], new_jobs: List[JobData]) -> np.ndarray:
+        """
+        Remove rows and insert jobs at their posted-date positions, updating the search index in place
+        
+        Only the posting-list entries of the removed and inserted rows are
+        touched, plus the row numbers after the first change (found by
+        bisecting each posting list); nothing is re-tokenized or re-sorted.
+        New jobs go after existing jobs with the same date, as the stable
+        date sort of a full reload would put them.
+        
+        Args:
+            removed_rows: Ascending rows to remove
+            new_jobs: Jobs to insert
+        
+        Returns:
+            The new row order as indices into the old rows followed by new_jobs
+            (for reordering the vector indexes)
+        """
+        old_count = len(self.jobs_cache)
+        
+        for row in removed_rows:
+            job = self.jobs_cache[row]
+            for name, value in self._index_entries(job, self.location_nodes[row]):
+                self._discard_posting(name, value, row)
+            key = self._job_key(job)
+            if key and self.id_index.get(key) == row:
+                del self.id_index[key]
+        for row in reversed(removed_rows):
+            del self.jobs_cache[row]
+            del self.posted_dates[row]
+            del self.location_nodes[row]
+        
+        # (row, new job) pairs, kept current as later inserts shift earlier ones down
+        placed = []
+        for j, job in enumerate(new_jobs):
+            date = self._parse_posted_date(job.posted_date)
+            row = self._date_position(date)
+            placed = [(other + 1 if other >= row else other, k) for other, k in placed]
+            placed.append((row, j))
+            self.jobs_cache.insert(row, job)
+            self.posted_dates.insert(row, date)
+            self.location_nodes.insert(row, self.gazetteer.resolve_job_location(job.location))
+        placed.sort()
+        
+        # A surviving row moves up past the removed rows before it and down past
+        # the new rows inserted before it (insertion points in survivor numbering)
+        insert_points = [row - rank for rank, (row, _) in enumerate(placed)]
+        
+        def renumber(row: int) -> int:
+            survivor = row - bisect_left(removed_rows, row)
+            return survivor + bisect_right(insert_points, survivor)
+        
+        # Rows before both the first removal and the first insertion keep their number
+        first_changed = min(removed_rows[:1] + insert_points[:1], default=old_count)
+        for index in self.search_index.values():
+            for postings in index.values():
+                start = bisect_left(postings, first_changed)
+                if start < len(postings):
+                    postings[start:] = [renumber(row) for row in postings[start:]]
+        
+        for row, j in placed:
+            for name, value in self._index_entries(new_jobs[j], self.location_nodes[row]):
+                insort(self.search_index[name].setdefault(value, []), row)
+        for row in range(min(first_changed, len(self.jobs_cache)), len(self.jobs_cache)):
+            key = self._job_key(self.jobs_cache[row])
+            if key:
+                self.id_index[key] = row
+        
+        survivors = np.delete(np.arange(old_count), removed_rows)
+        return np.insert(survivors, np.array(insert_points, dtype=np.int64),
+                         old_count + np.array([j for _, j in placed], dtype=np.int64))
+    
+    @staticmethod
+    def _normalize_job_id(job_id: Any) -> Optional[str]:
+        """Normalize a posting ID (pandas may load it as int or float) to a string key"""
+        if job_id is None or (isinstance(job_id, float) and np.isnan(job_id)):
+            return None
+        if isinstance(job_id, float) and job_id.is_integer():
+            job_id = int(job_id)
+        return str(job_id).strip() or None
+    
+    @staticmethod
+    def _is_remote_job(job: JobData) -> bool:
+        """Check whether a job is remote based on its location and title"""
+        location = job.location.lower() if isinstance(job.location, str) else ''
+        title = job.title.lower() if isinstance(job.title, str) else ''
+        return 'remote' in location or 'work from home' in title
+    
+    def _substring_postings(self, index_name: str, value: str) -> List[List[int]]:
+        """Collect posting lists for every index key containing the given substring"""
+        value_lower = value.lower()
+        return [postings for key, postings in self.search_index[index_name].items()
+                if value_lower in key]
+    
+    def _location_predicate(self, location: str) -> IndexPredicate:
+        """
+        Location filter answered from the gazetteer node index
+        
+        A job matches when it resolved to one of the filter's nodes (so
+        "Chattogram" finds "Chittagong" and "Dhaka Division" finds Gazipur)
+        or, for places outside the gazetteer, when its location contains the
+        filter text as before.
+        """
+        location_lower = location.lower()
+        query_nodes = set(self.gazetteer.resolve_query(location))
+        postings = [self.search_index['location_nodes'][node_id] for node_id in query_nodes
+                    if node_id in self.search_index['location_nodes']]
+        postings += self._substring_postings('locations', location_lower)
+        return IndexPredicate(
+            'location',
+            postings,
+            row_check=lambda idx: (not query_nodes.isdisjoint(self.location_nodes[idx]) or
+                                   location_lower in str(self.jobs_cache[idx].location).lower())
+        )
+    
+    @read_locked
     def search_jobs(self, query: str, location: str = None, 
                    experience_level: str = None, limit: int = 20, 
-                   sort_by_date: bool = True) -> List[JobData]:
+                   sort_by_date: bool = True, remote: bool = False,
+                   has_salary: bool = False) -> List[JobData]:
         """
         Search jobs by keyword, location, and experience level with semantic matching
         
+        Predicates are evaluated by the query planner, most selective index first.
+        
         Args:
             query: Search query (job title, skills, etc.)
             location: Location filter
             experience_level: Experience level filter
             limit: Maximum number of results
             sort_by_date: Sort results by posted date (most recent first)
+            remote: Only return remote jobs
+            has_salary: Only return jobs with salary information
         
         Returns:
             List of matching JobData objects
         """
-        matching_indices = set()
+        predicates, residual_filters = self._build_predicates(
+            query, location, experience_level, remote, has_salary
+        )
+        if sort_by_date:
+            # jobs_cache is stored newest first, so index order is date order
+            # and the planner can stop after `limit` hits
+            matching_indices = self.query_planner.execute_ordered(predicates, limit, residual_filters)
+        else:
+            matching_indices = list(self.query_planner.execute(predicates, residual_filters))[:limit]
+        
+        # Convert indices to jobs
+        results = [self.jobs_cache[idx] for idx in matching_indices]
+        
+        self.logger.info(f"Found {len(results)} jobs matching query: '{query}'")
+        return results
+    
+    @read_locked
+    def estimate_hits(self, query: str, location: str = None,
+                      experience_level: str = None, remote: bool = False,
+                      has_salary: bool = False) -> float:
+        """
+        Predict how many jobs search_jobs would match, without running it
+        
+        Uses only the posting-list sizes of the search predicates (see
+        QueryPlanner.estimate_hits); residual row filters are not applied.
+        
+        Returns:
+            Expected number of matching jobs
+        """
+        predicates, _ = self._build_predicates(query, location, experience_level, remote, has_salary)
+        return self.query_planner.estimate_hits(predicates, len(self.jobs_cache))
+    
+    def _build_predicates(self, query: str, location: str = None,
+                          experience_level: str = None, remote: bool = False,
+                          has_salary: bool = False) -> Tuple[List[IndexPredicate], List]:
+        """Translate search arguments into index predicates and residual row filters"""
+        predicates = []
+        residual_filters = []
         
         # Search by query with semantic matching
         if query:
             query_lower = query.lower()
-            query_words = re.findall(r'\b\w+\b', query_lower)
+            query_words = self.tokenizer.tokenize(query)
+            text_postings = []
             
             # Enhanced semantic search with job role prioritization
             for word in query_words:
-                if len(word) > 2:
-                    # Search in titles with semantic variations
-                    if word in self.search_index['titles']:
-                        matching_indices.update(self.search_index['titles'][word])
-                    
-                    # Search for related terms (e.g., "ai" should match "artificial intelligence")
-                    related_terms = self._get_related_terms(word)
-                    for term in related_terms:
-                        if term in self.search_index['titles']:
-                            matching_indices.update(self.search_index['titles'][term])
-                    
-                    # Search in skills
-                    if word in self.search_index['skills']:
-                        matching_indices.update(self.search_index['skills'][word])
-                    
-                    # Search in companies
-                    if word in self.search_index['companies']:
-                        matching_indices.update(self.search_index['companies'][word])
+                # Search in titles with semantic variations
+                if word in self.search_index['titles']:
+                    text_postings.append(self.search_index['titles'][word])
+                
+                # Search for related terms (e.g., "ai" should match "artificial intelligence")
+                related_terms = self._get_related_terms(word)
+                for term in related_terms:
+                    if term in self.search_index['titles']:
+                        text_postings.append(self.search_index['titles'][term])
+                
+                # Search in skills
+                if word in self.search_index['skills']:
+                    text_postings.append(self.search_index['skills'][word])
+                
+                # Search in companies
+                if word in self.search_index['companies']:
+                    text_postings.append(self.search_index['companies'][word])
             
-            # Apply job role filtering for better relevance (optimized for speed)
-            if matching_indices:
-                # Use list comprehension for faster filtering
-                if 'ai engineer' in query_lower or 'artificial intelligence' in query_lower:
-                    ai_terms = ['ai', 'artificial intelligence', 'machine learning', 'ml', 'deep learning']
-                    matching_indices = {idx for idx in matching_indices 
-                                      if any(term in self.jobs_cache[idx].title.lower() for term in ai_terms)}
-                elif 'software engineer' in query_lower or 'software developer' in query_lower:
-                    software_terms = ['software', 'developer', 'programmer', 'coding']
-                    matching_indices = {idx for idx in matching_indices 
-                                      if any(term in self.jobs_cache[idx].title.lower() for term in software_terms)}
-                elif 'data scientist' in query_lower or 'data analyst' in query_lower:
-                    data_terms = ['data', 'analyst', 'scientist', 'analytics']
-                    matching_indices = {idx for idx in matching_indices 
-                                      if any(term in self.jobs_cache[idx].title.lower() for term in data_terms)}
-                elif 'designer' in query_lower:
-                    design_terms = ['designer', 'design', 'ui', 'ux', 'graphic']
-                    matching_indices = {idx for idx in matching_indices 
-                                      if any(term in self.jobs_cache[idx].title.lower() for term in design_terms)}
-                # For other searches, keep all matches (no additional filtering needed)
+            predicates.append(IndexPredicate('text', text_postings))
+            
+            # Apply job role filtering for better relevance
+            role_terms = self._get_role_filter_terms(query_lower)
+            if role_terms:
+                residual_filters.append(
+                    lambda idx: any(term in self.jobs_cache[idx].title.lower() for term in role_terms)
+                )
         
         # Filter by location
         if location:
-            location_lower = location.lower()
-            location_matches = set()
-            
-            for idx in matching_indices:
-                job = self.jobs_cache[idx]
-                if location_lower in job.location.lower():
-                    location_matches.add(idx)
-            
-            matching_indices = location_matches
+            predicates.append(self._location_predicate(location))
         
         # Filter by experience level
         if experience_level:
-            exp_matches = set()
             exp_lower = experience_level.lower()
+            predicates.append(IndexPredicate(
+                'experience_level',
+                self._substring_postings('experience_levels', exp_lower),
+                row_check=lambda idx: (isinstance(self.jobs_cache[idx].experience_level, str) and
+                                       exp_lower in self.jobs_cache[idx].experience_level.lower())
+            ))
+        
+        # Filter by remote work
+        if remote:
+            predicates.append(IndexPredicate('remote', [self.search_index['flags']['remote']]))
+        
+        # Filter by salary availability
+        if has_salary:
+            predicates.append(IndexPredicate('has_salary', [self.search_index['flags']['has_salary']]))
+        
+        return predicates, residual_filters
+    
+    @staticmethod
+    def _get_role_filter_terms(query_lower: str) -> List[str]:
+        """Get title terms a job must contain for role-specific queries"""
+        if 'ai engineer' in query_lower or 'artificial intelligence' in query_lower:
+            return ['ai', 'artificial intelligence', 'machine learning', 'ml', 'deep learning']
+        elif 'software engineer' in query_lower or 'software developer' in query_lower:
+            return ['software', 'developer', 'programmer', 'coding']
+        elif 'data scientist' in query_lower or 'data analyst' in query_lower:
+            return ['data', 'analyst', 'scientist', 'analytics']
+        elif 'designer' in query_lower:
+            return ['designer', 'design', 'ui', 'ux', 'graphic']
+        # For other searches, keep all matches (no additional filtering needed)
+        return []
+    
+    @read_locked
+    def explain_search(self, query: str, location: str = None,
+                       experience_level: str = None, remote: bool = False,
+                       has_salary: bool = False) -> List[Dict[str, int]]:
+        """Return the predicate evaluation order the planner would use for a search"""
+        predicates, _ = self._build_predicates(query, location, experience_level, remote, has_salary)
+        return self.query_planner.explain(predicates)
+    
+    def _keyword_scores(self, query: str) -> Dict[int, int]:
+        """Count how many query terms (titles, skills, companies) each job matches"""
+        predicates, _ = self._build_predicates(query)
+        scores = {}
+        for predicate in predicates:
+            for posting in predicate.postings:
+                for idx in posting:
+                    scores[idx] = scores.get(idx, 0) + 1
+        return scores
+    
+    def _dataset_fingerprint(self) -> str:
+        """Identify the loaded jobs (and their order) so stale snapshots can be detected"""
+        digest = hashlib.sha1()
+        for job in self.jobs_cache:
+            digest.update(f"{job.job_posting_id}|{job.url}\n".encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _semantic_fingerprint(self) -> str:
+        """Dataset fingerprint plus the tokenizer, which decides the semantic vocabulary"""
+        return hashlib.sha1(f"{self._dataset_fingerprint()}|{self.tokenizer!r}".encode('utf-8')).hexdigest()
+    
+    def _semantic_text(self, job: JobData) -> str:
+        """Text embedded for a job (title repeated to weight it over the description)"""
+        return f"{job.title} {job.title} {job.description or ''}"
+    
+    @read_locked
+    def build_semantic_index(self, dimensions: int = 128, save: bool = True) -> SemanticIndex:
+        """
+        Build the offline LSA embedding index for the loaded jobs
+        
+        Args:
+            dimensions: Embedding dimensionality
+            save: Persist the index into the snapshot directory
+        
+        Returns:
+            The built SemanticIndex
+        """
+        with self._index_build_lock:
+            texts = [self._semantic_text(job) for job in self.jobs_cache]
+            index = SemanticIndex(dimensions=dimensions, tokenizer=self.tokenizer).build(
+                texts, fingerprint=self._semantic_fingerprint()
+            )
+            if save:
+                index.save(self.snapshot_dir)
+            self.ann_index = None
+            self.semantic_index = index
+            return index
+    
+    @read_locked
+    def build_ann_index(self, n_lists: int = None, n_probe: int = 8, save: bool = True) -> IVFIndex:
+        """
+        Build the approximate nearest-neighbor index over the semantic job vectors
+        
+        Args:
+            n_lists: Number of k-means lists (defaults to sqrt of the job count)
+            n_probe: Lists scanned per query; raise for recall, lower for latency
+            save: Persist the index into the snapshot directory
+        
+        Returns:
+            The built IVFIndex
+        """
+        with self._index_build_lock:
+            semantic_index = self._get_semantic_index()
+            index = IVFIndex(n_lists=n_lists, n_probe=n_probe).build(
+                semantic_index.vectors, fingerprint=semantic_index.fingerprint
+            )
+            if save:
+                index.save(self.snapshot_dir)
+            self.ann_index = index
+            return index
+    
+    def _get_ann_index(self) -> IVFIndex:
+        """Load the IVF index from the snapshot, rebuilding it if missing or stale"""
+        ann_index = self.ann_index
+        if ann_index is not None:
+            return ann_index
+        
+        with self._index_build_lock:
+            if self.ann_index is not None:
+                return self.ann_index
+            semantic_index = self._get_semantic_index()
+            index = IVFIndex.load(self.snapshot_dir)
+            if index is not None and index.fingerprint == semantic_index.fingerprint \
+                    and len(index) == len(semantic_index.vectors):
+                self.ann_index = index
+                return index
+            return self.build_ann_index()
+    
+    def _update_vector_indexes(self, new_jobs: List[JobData], order: np.ndarray):
+        """
+        Keep loaded semantic/ANN indexes in step with a splice of the rows
+        
+        New jobs are embedded with the existing model (LSA fold-in), then
+        vectors and list assignments are permuted into the new row order.
+        The fingerprint is derived from the previous one and the new jobs
+        instead of rehashing every job; it only has to differ from what is
+        on disk, so stale snapshots are rebuilt on the next load.
+        """
+        if self.semantic_index is None:
+            return
+        
+        index = self.semantic_index
+        vectors = np.asarray(index.vectors, dtype=np.float32)
+        added = np.stack([index.encode(self._semantic_text(job), cache=False) for job in new_jobs]) if new_jobs else None
+        if added is not None:
+            vectors = np.concatenate([vectors, added])
+        
+        if self.ann_index is not None:
+            assignments = self.ann_index.assignments
+            if added is not None:
+                assignments = np.concatenate([assignments, self.ann_index.assign(added)])
+            self.ann_index.set_assignments(assignments[order])
+        
+        index.vectors = vectors[order]
+        digest = hashlib.sha1(f"{index.fingerprint}|{len(order)}\n".encode('utf-8'))
+        for job in new_jobs:
+            digest.update(f"{job.job_posting_id}|{job.url}\n".encode('utf-8'))
+        index.fingerprint = digest.hexdigest()
+        if self.ann_index is not None:
+            self.ann_index.fingerprint = index.fingerprint
+    
+    @staticmethod
+    def _job_key(job: JobData) -> str:
+        """
+        Identity used for upserts and sharding
+        
+        The posting ID, else the URL, else a title/company/location content
+        key; '' when none of them identifies the job (such jobs never match).
+        """
+        return JobDatabaseManager._row_key(job.job_posting_id, job.url, job.title, job.company, job.location)
+    
+    @staticmethod
+    def _row_key(job_id: Any, url: Any, title: Any, company: Any, location: Any) -> str:
+        """_job_key from raw field values (CSV cells may be NaN)"""
+        job_id = JobDatabaseManager._normalize_job_id(job_id)
+        if job_id:
+            return job_id
+        if isinstance(url, str) and url:
+            return url
+        fingerprint = job_fingerprint(title if isinstance(title, str) else '',
+                                      company if isinstance(company, str) else '')
+        if not fingerprint:
+            return ''
+        location = " ".join(location.casefold().split()) if isinstance(location, str) else ''
+        return f"content:{fingerprint}|{location}"
+    
+    def upsert_jobs(self, jobs: List[JobData]) -> Dict[str, int]:
+        """
+        Insert new jobs or replace existing ones (matched by _job_key)
+        
+        The store stays in posted-date order and all loaded indexes are updated
+        in place: a replaced job is removed and re-inserted at its date, so the
+        cost grows with the batch and the rows after it, not with a full
+        re-sort and index rebuild under the write lock.
+        
+        Args:
+            jobs: Jobs to insert or update
+        
+        Returns:
+            Counts of inserted, updated and rejected jobs
+        """
+        result, inserted = self._upsert_jobs(jobs)
+        
+        # Alerts are matched outside the lock so notification callbacks don't block searches;
+        # jobs that were already stored alerted when they were first inserted
+        if self.percolator is not None:
+            self.percolator.percolate([jobs[i] for i in inserted])
+        return result
+    
+    def _upsert_jobs(self, jobs: List[JobData]) -> Tuple[Dict[str, int], List[int]]:
+        """
+        upsert_jobs without alerting, also reporting which jobs were new
+        
+        Returns:
+            (counts, positions in `jobs` of the inserted jobs); coordinators
+            that percolate themselves alert on those only
+        """
+        accepted = []
+        for position, job in enumerate(jobs):
+            reason = self.screener.rejection_reason(job)
+            if reason:
+                self.rejection_counts[reason] += 1
+            else:
+                accepted.append((position, job))
+        result = {'inserted': 0, 'updated': 0, 'rejected': len(jobs) - len(accepted)}
+        if not accepted:
+            return result, []
+        
+        # Readers see either the old or the new store, never a half-built index
+        with self._rw_lock.write():
+            removed_rows, new_jobs = set(), []
+            # Slot in new_jobs per key, so a key repeated in the batch keeps its last version
+            batch_slots = {}
+            # Input position of the current version of each inserted job, by slot
+            inserted = {}
+            for position, job in accepted:
+                if self.description_compressor is not None:
+                    job.compress_description(self.description_compressor)
+                key = self._job_key(job)
+                if key and key in batch_slots:
+                    new_jobs[batch_slots[key]] = job
+                    if batch_slots[key] in inserted:
+                        inserted[batch_slots[key]] = position
+                    result['updated'] += 1
+                    continue
+                row = self.id_index.get(key) if key else None
+                if row is not None:
+                    removed_rows.add(row)
+                    result['updated'] += 1
+                else:
+                    inserted[len(new_jobs)] = position
+                    result['inserted'] += 1
+                if key:
+                    batch_slots[key] = len(new_jobs)
+                new_jobs.append(job)
             
-            for idx in matching_indices:
-                job = self.jobs_cache[idx]
-                if job.experience_level and isinstance(job.experience_level, str) and exp_lower in job.experience_level.lower():
-                    exp_matches.add(idx)
-            
-            matching_indices = exp_matches
+            order = self._splice_rows(sorted(removed_rows), new_jobs)
+            self._update_vector_indexes(new_jobs, order)
+            if self.cold_store is not None:
+                self._spill_jobs(new_jobs)
+            else:
+                self._apply_memory_limit()
+            self.has_unsaved_changes = True
         
-        # Convert indices to jobs
-        results = [self.jobs_cache[idx] for idx in matching_indices]
+        self.logger.info(f"Upserted jobs: {result}")
+        return result, sorted(inserted.values())
+    
+    def expire_jobs(self, now: datetime = None) -> int:
+        """
+        Remove jobs whose expires_at has passed
         
-        # Sort by date if requested
-        if sort_by_date:
-            results = self._sort_jobs_by_date(results)
+        Only written-through web jobs carry an expiry; dataset rows never expire.
         
-        # Limit results
-        results = results[:limit]
+        Args:
+            now: Reference time (defaults to the current time)
         
-        self.logger.info(f"Found {len(results)} jobs matching query: '{query}'")
-        return results
+        Returns:
+            Number of jobs removed
+        """
+        now = now or datetime.now()
+        with self._rw_lock.write():
+            expired = [i for i, job in enumerate(self.jobs_cache) if self._is_expired(job, now)]
+            if not expired:
+                return 0
+            self._update_vector_indexes([], self._splice_rows(expired, []))
+            self.has_unsaved_changes = True
+        
+        self.logger.info(f"Expired {len(expired)} jobs")
+        return len(expired)
+    
+    @staticmethod
+    def _is_expired(job: JobData, now: datetime) -> bool:
+        """True if the job has an expiry time at or before now"""
+        expires_at = JobDatabaseManager._parse_posted_date(job.expires_at)
+        return expires_at is not None and expires_at <= now
+    
+    def _get_semantic_index(self) -> SemanticIndex:
+        """Load the semantic index from the snapshot, rebuilding it if missing or stale"""
+        semantic_index = self.semantic_index
+        if semantic_index is not None:
+            return semantic_index
+        
+        with self._index_build_lock:
+            if self.semantic_index is not None:
+                return self.semantic_index
+            index = SemanticIndex.load(self.snapshot_dir, tokenizer=self.tokenizer)
+            if index is not None and index.fingerprint == self._semantic_fingerprint():
+                self.semantic_index = index
+                self.logger.info(f"Loaded semantic index from {self.snapshot_dir}")
+                return index
+            self.logger.warning("⚠️ Semantic index missing or stale, building it now")
+            return self.build_semantic_index()
+    
+    def semantic_search(self, query: str, k: int = 20) -> List[JobData]:
+        """
+        Search jobs by meaning using the local LSA embedding index
+        
+        Args:
+            query: Free-text query
+            k: Maximum number of results
+        
+        Returns:
+            List of JobData objects, most similar first
+        """
+        return [job for job, _ in self._semantic_hits(query, k)]
+    
+    def hybrid_search(self, query: str, k: int = 20, semantic_weight: float = 0.6) -> List[JobData]:
+        """
+        Search jobs by fusing semantic similarity with keyword match scores
+        
+        Args:
+            query: Free-text query
+            k: Maximum number of results
+            semantic_weight: Weight of the semantic score (keyword score gets the rest)
+        
+        Returns:
+            List of JobData objects, best fused score first
+        """
+        return [job for job, _ in self._hybrid_hits(query, k, semantic_weight)]
+    
+    @read_locked
+    def _semantic_hits(self, query: str, k: int = 20) -> List[Tuple[JobData, float]]:
+        """Semantic search returning (job, cosine similarity) pairs"""
+        if not query or not self.jobs_cache:
+            return []
+        index = self._get_semantic_index()
+        if len(self.jobs_cache) >= self.ann_threshold:
+            hits = self._get_ann_index().search(index.encode(query), index.vectors, k)
+        else:
+            hits = index.search(query, k)
+        return [(self.jobs_cache[idx], score) for idx, score in hits if score > 0]
+    
+    @read_locked
+    def _hybrid_hits(self, query: str, k: int = 20,
+                     semantic_weight: float = 0.6) -> List[Tuple[JobData, float]]:
+        """Hybrid search returning (job, fused score) pairs"""
+        if not query or not self.jobs_cache:
+            return []
+        
+        index = self._get_semantic_index()
+        fused = semantic_weight * np.clip(index.scores(query), 0, None)
+        
+        keyword_scores = self._keyword_scores(query)
+        if keyword_scores:
+            max_score = max(keyword_scores.values())
+            ids = np.fromiter(keyword_scores.keys(), dtype=np.int64, count=len(keyword_scores))
+            values = np.fromiter(keyword_scores.values(), dtype=np.float32, count=len(keyword_scores))
+            fused[ids] += (1 - semantic_weight) * values / max_score
+        
+        hits = index.top_k(fused, k)
+        return [(self.jobs_cache[idx], score) for idx, score in hits if score > 0]
     
-    def _get_related_terms(self, word: str) -> List[str]:
+    @staticmethod
+    def _get_related_terms(word: str) -> List[str]:
         """Get semantically related terms for enhanced search"""
         word_lower = word.lower()
         
@@ -392,22 +1209,32 @@ class JobDatabaseManager:
         
         return semantic_mapping.get(word_lower, [])
     
+    @staticmethod
+    def _parse_posted_date(posted_date: Optional[str]) -> Optional[datetime]:
+        """Parse a posted date string to a naive datetime (None if missing or invalid)"""
+        if not posted_date:
+            return None
+        try:
+            # Handle different date formats
+            parsed = datetime.fromisoformat(posted_date.replace('Z', '+00:00'))
+        except (ValueError, TypeError):
+            try:
+                parsed = datetime.strptime(posted_date, '%Y-%m-%d')
+            except (ValueError, TypeError):
+                return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.replace(tzinfo=None)
+        return parsed
+    
     def _sort_jobs_by_date(self, jobs: List[JobData]) -> List[JobData]:
         """Sort jobs by posted date (most recent first)"""
         def get_date_key(job):
-            if not job.posted_date:
-                return datetime.min  # Put jobs without dates at the end
-            try:
-                # Handle different date formats
-                if 'T' in job.posted_date:
-                    return datetime.fromisoformat(job.posted_date.replace('Z', '+00:00'))
-                else:
-                    return datetime.strptime(job.posted_date, '%Y-%m-%d')
-            except:
-                return datetime.min  # Put invalid dates at the end
+            # Put jobs without dates or with invalid dates at the end
+            return self._parse_posted_date(job.posted_date) or datetime.min
         
         return sorted(jobs, key=get_date_key, reverse=True)
     
+    @read_locked
     def filter_jobs(self, filters: Dict[str, Any], limit: int = 20, 
                    sort_by_date: bool = True) -> List[JobData]:
         """
@@ -431,16 +1258,17 @@ class JobDatabaseManager:
         """
         filtered_jobs = self.jobs_cache.copy()
         
+        # Location is answered from the node index before the row-by-row filters
+        if filters.get('location'):
+            location_ids = self._location_predicate(filters['location']).ids()
+            filtered_jobs = [job for i, job in enumerate(filtered_jobs) if i in location_ids]
+        
         # Apply filters
         for key, value in filters.items():
             if value is None:
                 continue
                 
-            if key == 'location':
-                filtered_jobs = [job for job in filtered_jobs 
-                               if value.lower() in job.location.lower()]
-            
-            elif key == 'experience_level':
+            if key == 'experience_level':
                 filtered_jobs = [job for job in filtered_jobs 
                                if job.experience_level and isinstance(job.experience_level, str) and 
                                value.lower() in job.experience_level.lower()]
@@ -465,22 +1293,50 @@ class JobDatabaseManager:
             elif key == 'posted_within_days':
                 cutoff_date = datetime.now() - timedelta(days=value)
                 filtered_jobs = [job for job in filtered_jobs 
-                               if job.posted_date and 
-                               datetime.fromisoformat(job.posted_date.replace('Z', '+00:00')) > cutoff_date]
-        
-        # Sort by date if requested
-        if sort_by_date:
-            filtered_jobs = self._sort_jobs_by_date(filtered_jobs)
+                               if (self._parse_posted_date(job.posted_date) or datetime.min) > cutoff_date]
         
+        # jobs_cache is stored newest first and filtering preserves that order,
+        # so results are already sorted by date
         return filtered_jobs[:limit]
     
+    @read_locked
     def get_job_by_id(self, job_id: str) -> Optional[JobData]:
         """Get a specific job by its posting ID"""
-        for job in self.jobs_cache:
-            if job.job_posting_id == job_id:
-                return job
-        return None
+        idx = self.id_index.get(self._normalize_job_id(job_id))
+        return self.jobs_cache[idx] if idx is not None else None
+    
+    @read_locked
+    def job_keys(self) -> Set[str]:
+        """Identity keys (see _job_key) of all stored jobs"""
+        return set(self.id_index)
+    
+    @read_locked
+    def similar_jobs(self, job_id: str, k: int = 10) -> List[JobData]:
+        """
+        Find jobs similar to a given job using its precomputed semantic vector
+        
+        Args:
+            job_id: Posting ID of the reference job
+            k: Maximum number of similar jobs
+        
+        Returns:
+            List of similar JobData objects, most similar first (empty if the job is unknown)
+        """
+        idx = self.id_index.get(self._normalize_job_id(job_id))
+        if idx is None:
+            return []
+        
+        index = self._get_semantic_index()
+        vector = np.asarray(index.vectors[idx])
+        # Ask for one extra hit since the job itself is the best match
+        if len(self.jobs_cache) >= self.ann_threshold:
+            hits = self._get_ann_index().search(vector, index.vectors, k + 1)
+        else:
+            hits = index.top_k(index.vectors @ vector, k + 1)
+        
+        return [self.jobs_cache[hit] for hit, score in hits if hit != idx and score > 0][:k]
     
+    @read_locked
     def get_jobs_by_company(self, company_name: str, limit: int = 20) -> List[JobData]:
         """Get all jobs from a specific company"""
         company_lower = company_name.lower()
@@ -494,6 +1350,12 @@ class JobDatabaseManager:
         
         return results
     
+    @read_locked
+    def _distinct_values(self, field_name: str) -> set:
+        """Distinct non-empty values of a JobData field"""
+        return {getattr(job, field_name) for job in self.jobs_cache if getattr(job, field_name)}
+    
+    @read_locked
     def get_statistics(self) -> Dict[str, Any]:
         """Get dataset statistics"""
         if not self.jobs_cache:
@@ -533,8 +1395,88 @@ class JobDatabaseManager:
                 stats['industries'][job.job_industries] = \
                     stats['industries'].get(job.job_industries, 0) + 1
         
+        if self.description_compressor is not None:
+            stats['description_compression'] = self.description_compressor.get_stats()
+        
+        stats['rejections'] = dict(self.rejection_counts)
+        
+        stats['memory'] = {
+            'resident_bytes': self.estimate_memory_bytes(),
+            'memory_limit_bytes': self.memory_limit,
+            'cold_columns_spilled': self.cold_store is not None,
+            'cold_store': self.cold_store.get_stats() if self.cold_store is not None else None
+        }
+        
         return stats
     
+    def _spill_jobs(self, jobs: List[JobData]):
+        """Write the cold fields of the given jobs to the cold store"""
+        record_ids = self.cold_store.append_many([job.cold_record() for job in jobs])
+        for job, record_id in zip(jobs, record_ids):
+            job.spill(self.cold_store, record_id, self.description_compressor)
+    
+    def _apply_memory_limit(self):
+        """
+        Enter spill mode when the estimated resident size exceeds the memory limit
+        
+        Descriptions, company logos, apply links and raw salary data move to
+        a disk-backed ColdStore in the snapshot directory and are read back on
+        access; indexes and the fields used for searching stay in memory.
+        """
+        if self.memory_limit is None or self.cold_store is not None:
+            return
+        resident = self.estimate_memory_bytes()
+        if resident <= self.memory_limit:
+            return
+        
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        self.cold_store = ColdStore(self.snapshot_dir)
+        self._spill_jobs(self.jobs_cache)
+        remaining = self.estimate_memory_bytes()
+        self.logger.info(f"💾 Spilled cold columns to disk: resident {resident} -> {remaining} bytes "
+                         f"(limit {self.memory_limit})")
+        if remaining > self.memory_limit:
+            self.logger.warning(f"⚠️ Indexes and hot columns alone ({remaining} bytes) exceed the memory limit")
+    
+    @staticmethod
+    def _job_size(job: JobData) -> int:
+        """Approximate bytes held by one job object and its field values"""
+        size = sys.getsizeof(job) + sys.getsizeof(job.__dict__)
+        # Objects shared between fields (one ColdRef for all spilled fields) are counted once
+        for value in {id(value): value for value in job.__dict__.values()}.values():
+            if isinstance(value, tuple):  # (shared compressor, blob)
+                size += sys.getsizeof(value) + sys.getsizeof(value[1])
+            elif isinstance(value, list):
+                size += sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+            elif value is not None:
+                size += sys.getsizeof(value)
+        return size
+    
+    @read_locked
+    def estimate_memory_bytes(self, sample_size: int = 1000) -> int:
+        """
+        Approximate resident size of the loaded jobs, search indexes and in-memory vectors
+        
+        Job sizes are measured on an evenly spaced sample and extrapolated.
+        Memory-mapped vectors are not counted.
+        """
+        if not self.jobs_cache:
+            return 0
+        
+        sample = self.jobs_cache[::max(1, len(self.jobs_cache) // sample_size)]
+        total = sum(self._job_size(job) for job in sample) / len(sample) * len(self.jobs_cache)
+        total += sys.getsizeof(self.jobs_cache) + sys.getsizeof(self.posted_dates) + sys.getsizeof(self.location_nodes)
+        for index in self.search_index.values():
+            total += sys.getsizeof(index)
+            total += sum(sys.getsizeof(key) + sys.getsizeof(postings) for key, postings in index.items())
+        total += sys.getsizeof(self.id_index) + sum(sys.getsizeof(key) for key in self.id_index)
+        if self.description_compressor is not None:
+            total += len(self.description_compressor.dictionary)
+        for array in (getattr(self.semantic_index, 'vectors', None), getattr(self.ann_index, 'assignments', None)):
+            if isinstance(array, np.ndarray) and not isinstance(array, np.memmap):
+                total += array.nbytes
+        return int(total)
+    
     def export_to_json(self, jobs: List[JobData], filename: str = "exported_jobs.json"):
         """Export jobs to JSON file"""
         try:
@@ -545,6 +1487,7 @@ class JobDatabaseManager:
         except Exception as e:
             self.logger.error(f"Error exporting jobs: {e}")
     
+    @read_locked
     def get_recent_jobs(self, limit: int = 20, days: int = 30) -> List[JobData]:
         """
         Get the most recent jobs posted within specified days
@@ -559,26 +1502,95 @@ class JobDatabaseManager:
         cutoff_date = datetime.now() - timedelta(days=days)
         recent_jobs = []
         
-        for job in self.jobs_cache:
-            if job.posted_date:
-                try:
-                    if 'T' in job.posted_date:
-                        job_date = datetime.fromisoformat(job.posted_date.replace('Z', '+00:00'))
-                    else:
-                        job_date = datetime.strptime(job.posted_date, '%Y-%m-%d')
-                    
-                    if job_date >= cutoff_date:
-                        recent_jobs.append(job)
-                except:
-                    continue
-        
-        # Sort by date (most recent first)
-        recent_jobs = self._sort_jobs_by_date(recent_jobs)
+        # jobs_cache is stored newest first, so stop at the first job past the cutoff
+        for job, job_date in zip(self.jobs_cache, self.posted_dates):
+            if len(recent_jobs) >= limit or job_date is None or job_date < cutoff_date:
+                break
+            recent_jobs.append(job)
         
-        return recent_jobs[:limit]
+        return recent_jobs
     
+    @write_locked
     def reload_dataset(self):
         """Reload the dataset from CSV"""
-        self._load_dataset()
+        self._load_dataset(use_snapshot=False)
         self._create_search_index()
+        # Jobs still held by callers keep the old store alive until they are released
+        self.cold_store = None
+        self._apply_memory_limit()
+        self.semantic_index = None
+        self.ann_index = None
         self.logger.info("Dataset reloaded successfully")
+
+
+# Test functionality
+if __name__ == "__main__":
+    import random
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    
+    logging.basicConfig(level=logging.WARNING)
+    
+    print("🧪 Stress testing concurrent searches while upserting...")
+    print("=" * 50)
+    
+    manager = JobDatabaseManager(sys.argv[1] if len(sys.argv) > 1 else "Linkedin job listings information.csv")
+    queries = ["software engineer", "data analyst", "python developer", "designer", "manager", "marketing"]
+    initial_count = len(manager.jobs_cache)
+    stop = threading.Event()
+    errors = []
+    
+    def reader(worker_id: int) -> int:
+        """Run searches and check that every result is internally consistent"""
+        rng = random.Random(worker_id)
+        searches = 0
+        while not stop.is_set():
+            try:
+                query = rng.choice(queries)
+                for job in manager.search_jobs(query, limit=20):
+                    found = manager.get_job_by_id(job.job_posting_id) if job.job_posting_id else job
+                    assert found is not None, f"search returned job {job.job_posting_id} missing from id index"
+                    assert found.job_posting_id == job.job_posting_id
+                manager.semantic_search(query, k=10)
+                dates = [manager._parse_posted_date(job.posted_date) or datetime.min
+                         for job in manager.get_recent_jobs(limit=50, days=100000)]
+                assert dates == sorted(dates, reverse=True), "recent jobs out of date order"
+                searches += 1
+            except Exception as e:
+                errors.append(f"reader {worker_id}: {type(e).__name__}: {e}")
+                stop.set()
+        return searches
+    
+    def writer() -> int:
+        """Upsert batches of new and updated jobs"""
+        upserts = 0
+        for batch in range(50):
+            if stop.is_set():
+                break
+            new_jobs = [JobData(title=f"{random.choice(queries).title()} {batch}-{i}", company=f"Stress Co {i}",
+                                location="Dhaka, Bangladesh", description="Concurrency stress test job",
+                                url=f"https://example.com/stress/{batch}/{i}", job_posting_id=f"stress-{batch}-{i}",
+                                posted_date=(datetime.now() - timedelta(days=random.randint(0, 60))).isoformat())
+                        for i in range(20)]
+            updated = [JobData(**{**asdict(job), 'title': f"{job.title} (updated)"})
+                       for job in random.sample(manager.jobs_cache, 5)]
+            manager.upsert_jobs(new_jobs + updated)
+            upserts += 1
+        return upserts
+    
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=9) as pool:
+        reader_futures = [pool.submit(reader, worker_id) for worker_id in range(8)]
+        writer_future = pool.submit(writer)
+        batches = writer_future.result()
+        stop.set()
+        total_searches = sum(future.result() for future in reader_futures)
+    elapsed = time.time() - start_time
+    
+    expected = initial_count + batches * 20
+    print(f"{batches} upsert batches, {total_searches} search rounds in {elapsed:.1f}s")
+    print(f"Jobs: {len(manager.jobs_cache)} (expected {expected}), id index: {len(manager.id_index)}")
+    if errors or len(manager.jobs_cache) != expected:
+        print(f"❌ Stress test failed: {errors[:5]}")
+        sys.exit(1)
+    print("✅ No inconsistencies observed")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Job Identity
+Canonical identity of a job posting across sources, for merging search results
+"""
+
+import base64
+import logging
+import re
+from typing import Dict, List, Any, Optional, Iterable
+from urllib.parse import urlsplit, parse_qs, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only record how a visitor got to a page
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'dclid', 'yclid', 'igshid', 'mc_cid', 'mc_eid', '_hsenc', '_hsmi',
+    'ref', 'refid', 'ref_src', 'referrer', 'src', 'source', 'from', 'trk', 'trkinfo', 'trackingid',
+    'tracking_id', 'lipi', 'midtoken', 'midsig', 'eborigin', 'original_referer', 'position', 'pagenum',
+    'sessionid', 'campaignid', 'tk', 'vjs', 'advn', 'adid', 'sid'
+}
+TRACKING_PREFIXES = ('utm_',)
+HOST_PREFIXES = ('www.', 'm.', 'mobile.')
+
+# Job boards whose posting URLs carry a stable posting ID in varying surroundings
+# (title slugs, country subdomains, search pages with the posting selected)
+LINKEDIN_POSTING_PATH = re.compile(r'/jobs/view/(?:[^/]*-)?(\d+)')
+COMPANY_SUFFIXES = re.compile(r'\b(inc|incorporated|ltd|limited|llc|plc|pvt|private|corp|corporation|co|company|gmbh)\b')
+# Company values scrapers use when the employer is missing; they identify nothing
+PLACEHOLDER_COMPANIES = {'n a', 'na', 'none', 'null', 'nan', 'unknown', 'not specified', 'not available',
+                         'not disclosed', 'confidential'}
+
+
+def resolve_bing_redirect(url: str) -> str:
+    """Return the target of a Bing redirect URL (other URLs are returned unchanged)"""
+    if 'bing.com/ck/a' not in url:
+        return url
+    try:
+        query_params = parse_qs(urlsplit(url).query)
+        if 'u' not in query_params:
+            return url
+        encoded_url = query_params['u'][0]
+        # Bing prefixes the base64 payload with 'a1'
+        clean_encoded_url = encoded_url[2:] if encoded_url.startswith('a1') else encoded_url
+        for padding in ['', '=', '==', '===']:
+            try:
+                return base64.b64decode(clean_encoded_url + padding).decode('utf-8')
+            except Exception as decode_error:
+                logger.debug(f"Base64 decode attempt with '{padding}' failed: {decode_error}")
+        logger.warning(f"⚠️ Base64 decode failed for Bing redirect: {url}")
+        return clean_encoded_url if clean_encoded_url.startswith('http') else f"https://{clean_encoded_url}"
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to extract URL from Bing redirect: {e}")
+        return url
+
+
+def canonicalize_url(url: str) -> Optional[str]:
+    """
+    Scheme-less canonical form of a posting URL, or None if it isn't an http(s) URL
+
+    Bing redirects are decoded, the host is lowercased without www./m.
+    prefixes, tracking parameters and fragments are dropped, the remaining
+    parameters are sorted, and LinkedIn/Indeed postings are reduced to their
+    posting ID, so "https://bd.linkedin.com/jobs/view/python-developer-at-acme-42?trk=x"
+    and "https://www.linkedin.com/jobs/view/42/" are the same posting.
+    """
+    url = resolve_bing_redirect((url or '').strip())
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower().rstrip('.')
+    for prefix in HOST_PREFIXES:
+        host = host.removeprefix(prefix)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    values = dict(params)
+
+    if host == 'linkedin.com' or host.endswith('.linkedin.com'):
+        match = LINKEDIN_POSTING_PATH.search(parts.path)
+        job_id = match.group(1) if match else values.get('currentJobId')
+        if job_id:
+            return f"linkedin.com/jobs/view/{job_id}"
+    if host == 'indeed.com' or host.endswith('.indeed.com'):
+        job_key = values.get('jk') or values.get('vjk')
+        if job_key:
+            return f"indeed.com/viewjob?jk={job_key}"
+
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/')
+    query = urlencode(sorted((name, value) for name, value in params
+                             if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)))
+    return f"{host}{path}{'?' + query if query else ''}"
+
+
+def _normalize_words(text: str) -> str:
+    return " ".join(re.findall(r"\w+", (text or "").casefold()))
+
+
+def job_fingerprint(title: str, company: str) -> Optional[str]:
+    """
+    Normalized "title|company" of a posting, or None without both
+
+    Case, punctuation, job-board title suffixes ("- Job ID 123", "(For Acme)")
+    and legal company suffixes (Ltd, Inc, ...) are ignored. Placeholder
+    companies ("N/A", "Unknown") count as missing.
+    """
+    title = re.sub(r'\s*-\s*(for|job id|job-id)\b.*$', '', title or '', flags=re.IGNORECASE)
+    title = _normalize_words(re.sub(r'\s*\(for\s+.*?\)', '', title, flags=re.IGNORECASE))
+    company = _normalize_words(re.sub(r'\.com\b', '', company or '', flags=re.IGNORECASE))
+    company = " ".join(COMPANY_SUFFIXES.sub(' ', company).split())
+    if not title or not company or company in PLACEHOLDER_COMPANIES:
+        return None
+    return f"{title}|{company}"
+
+
+class JobIdentityIndex:
+    """
+    Hash index of the postings seen so far, by canonical URL and by fingerprint
+
+    Postings are added in order of preference (database results first); a
+    later posting that matches an indexed one is a duplicate and is dropped,
+    and its other keys are indexed under the kept posting so further variants
+    match as well. Each add is O(1), so merging n results is O(n).
+
+    The canonical URL decides whenever both postings have one: the same title
+    at the same company under two posting URLs is two openings. The
+    fingerprint only matches when one side has no URL key, e.g. a web job
+    whose URL is the listing page it was extracted from (it shares that URL
+    with every other job on the page; merge treats a page that yielded a
+    single job as that job's posting).
+    Works with any job object that has title, company and url attributes
+    (JobData, JobListing) or keys (dicts).
+    """
+
+    def __init__(self):
+        self._by_url: Dict[str, Any] = {}
+        self._by_fingerprint: Dict[str, Any] = {}
+        # Postings per fingerprint that have no URL key yet, the only ones a job with a URL can match
+        self._without_url: Dict[str, Any] = {}
+        self.duplicates = 0
+
+    @staticmethod
+    def _field(job: Any, name: str) -> str:
+        value = job.get(name) if isinstance(job, dict) else getattr(job, name, None)
+        # Missing values may arrive as None or a pandas NaN
+        return value if isinstance(value, str) else ''
+
+    def keys(self, job: Any, page_url: str = None) -> tuple:
+        """(canonical URL, fingerprint) of a job; either may be None"""
+        url_key = canonicalize_url(self._field(job, 'url'))
+        if url_key and page_url and url_key == canonicalize_url(page_url):
+            url_key = None
+        return url_key, job_fingerprint(self._field(job, 'title'), self._field(job, 'company'))
+
+    def _lookup(self, url_key: Optional[str], fingerprint: Optional[str]) -> Optional[Any]:
+        if url_key:
+            found = self._by_url.get(url_key)
+            if found is None and fingerprint:
+                found = self._without_url.get(fingerprint)
+            return found
+        return self._by_fingerprint.get(fingerprint) if fingerprint else None
+
+    def find(self, job: Any, page_url: str = None) -> Optional[Any]:
+        """The indexed posting a job duplicates, if any"""
+        return self._lookup(*self.keys(job, page_url))
+
+    def add(self, job: Any, page_url: str = None) -> bool:
+        """
+        Index a job unless it duplicates an indexed posting
+
+        Args:
+            job: Job to add
+            page_url: Page the job was extracted from, for web jobs
+
+        Returns:
+            True if the job is new, False for a duplicate
+        """
+        url_key, fingerprint = self.keys(job, page_url)
+        kept = self._lookup(url_key, fingerprint)
+        if kept is not None:
+            self.duplicates += 1
+        posting = kept if kept is not None else job
+        if url_key:
+            self._by_url.setdefault(url_key, posting)
+            if fingerprint and self._without_url.get(fingerprint) is posting:
+                # The posting now has a URL, so other URLs with its fingerprint are other openings
+                del self._without_url[fingerprint]
+        if fingerprint:
+            self._by_fingerprint.setdefault(fingerprint, posting)
+            if not url_key and kept is None:
+                self._without_url.setdefault(fingerprint, posting)
+        return kept is None
+
+    def merge(self, jobs: Iterable[Any], page_url: str = None) -> List[Any]:
+        """The jobs that are new to the index, in order, indexing them"""
+        jobs = list(jobs)
+        listing_url = page_url if len(jobs) > 1 else None
+        return [job for job in jobs if self.add(job, listing_url)]
+
+
+# Test functionality
+if __name__ == "__main__":
+    from types import SimpleNamespace
+
+    print("🧪 Testing job identity...")
+    print("=" * 50)
+
+    bing = "https://www.bing.com/ck/a?!&&p=abc&u=a1" + base64.b64encode(
+        b"https://bd.linkedin.com/jobs/view/python-developer-at-acme-4281237907?trk=public_jobs").decode().rstrip("=")
+    for url in [bing, "https://www.linkedin.com/jobs/view/4281237907/",
+                "https://www.linkedin.com/jobs/search/?currentJobId=4281237907&keywords=python",
+                "http://m.example.com/careers//123/?utm_source=x&b=2&a=1#apply"]:
+        print(f"{canonicalize_url(url)}  <-  {url[:70]}")
+
+    database_jobs = [SimpleNamespace(title="Python Developer", company="Acme Ltd.",
+                                     url="https://www.linkedin.com/jobs/view/4281237907/")]
+    listing_page = "https://jobs.example.com/search?q=python"
+    web_jobs = [
+        {"title": "Python Developer", "company": "ACME Limited", "url": listing_page},
+        {"title": "Senior Python Developer - Job ID 77", "company": "Beta Inc", "url": listing_page},
+        {"title": "Backend Engineer", "company": "Acme", "url": bing},
+        {"title": "Data Engineer", "company": "Gamma", "url": listing_page},
+        {"title": "Python Developer", "company": "Acme", "url": "https://acme.example/jobs/2"},
+        {"title": "Graphic Designer", "company": "N/A", "url": listing_page},
+        {"title": "Graphic Designer", "company": "N/A", "url": listing_page},
+    ]
+    index = JobIdentityIndex()
+    merged = index.merge(database_jobs) + index.merge(web_jobs, page_url=listing_page)
+    print(f"Merged {len(database_jobs) + len(web_jobs)} jobs into {len(merged)} ({index.duplicates} duplicates):")
+    for job in merged:
+        print(f"   {JobIdentityIndex._field(job, 'title')} at {JobIdentityIndex._field(job, 'company')}")
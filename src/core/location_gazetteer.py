@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Location Gazetteer
+Bangladesh divisions and districts with aliases, resolved to hierarchical node ids
+"""
+
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COUNTRY_ID = "bd"
+
+# Division -> districts. Canonical names use current official spellings;
+# older/alternative spellings are aliases.
+BANGLADESH_DIVISIONS: Dict[str, List[str]] = {
+    "Barishal": ["Barguna", "Barishal", "Bhola", "Jhalokati", "Patuakhali", "Pirojpur"],
+    "Chattogram": ["Bandarban", "Brahmanbaria", "Chandpur", "Chattogram", "Cumilla", "Cox's Bazar",
+                   "Feni", "Khagrachhari", "Lakshmipur", "Noakhali", "Rangamati"],
+    "Dhaka": ["Dhaka", "Faridpur", "Gazipur", "Gopalganj", "Kishoreganj", "Madaripur", "Manikganj",
+              "Munshiganj", "Narayanganj", "Narsingdi", "Rajbari", "Shariatpur", "Tangail"],
+    "Khulna": ["Bagerhat", "Chuadanga", "Jashore", "Jhenaidah", "Khulna", "Kushtia", "Magura",
+               "Meherpur", "Narail", "Satkhira"],
+    "Mymensingh": ["Jamalpur", "Mymensingh", "Netrokona", "Sherpur"],
+    "Rajshahi": ["Bogura", "Chapai Nawabganj", "Joypurhat", "Naogaon", "Natore", "Pabna",
+                 "Rajshahi", "Sirajganj"],
+    "Rangpur": ["Dinajpur", "Gaibandha", "Kurigram", "Lalmonirhat", "Nilphamari", "Panchagarh",
+                "Rangpur", "Thakurgaon"],
+    "Sylhet": ["Habiganj", "Moulvibazar", "Sunamganj", "Sylhet"],
+}
+
+# Extra spellings for divisions and districts (the canonical name is always an alias)
+PLACE_ALIASES: Dict[str, List[str]] = {
+    "Barishal": ["barisal", "বরিশাল"],
+    "Chattogram": ["chittagong", "ctg", "চট্টগ্রাম"],
+    "Dhaka": ["dacca", "ঢাকা"],
+    "Khulna": ["খুলনা"],
+    "Mymensingh": ["mymenshingh", "ময়মনসিংহ"],
+    "Rajshahi": ["রাজশাহী"],
+    "Rangpur": ["রংপুর"],
+    "Sylhet": ["সিলেট"],
+    "Cumilla": ["comilla"],
+    "Cox's Bazar": ["coxs bazar", "cox bazar", "coxsbazar"],
+    "Jhalokati": ["jhalakathi", "jhalokathi"],
+    "Khagrachhari": ["khagrachari"],
+    "Lakshmipur": ["laxmipur", "lakshmipur"],
+    "Jashore": ["jessore"],
+    "Bogura": ["bogra"],
+    # Not bare "nawabganj": Dhaka and Dinajpur districts have Nawabganj upazilas too
+    "Chapai Nawabganj": ["chapainawabganj"],
+    "Netrokona": ["netrakona"],
+    "Moulvibazar": ["maulvibazar", "moulvi bazar"],
+    "Brahmanbaria": ["b.baria"],
+}
+
+# Well-known areas that job posts use instead of the district name
+DISTRICT_AREAS: Dict[str, List[str]] = {
+    "Dhaka": ["gulshan", "banani", "uttara", "dhanmondi", "mirpur", "motijheel", "tejgaon", "mohakhali",
+              "bashundhara", "badda", "savar", "keraniganj", "dhaka cantonment", "dhaka city"],
+    "Gazipur": ["tongi", "kaliakair"],
+    "Narayanganj": ["siddhirganj", "rupganj"],
+    "Chattogram": ["agrabad", "patenga", "chittagong city"],
+}
+
+
+@dataclass
+class LocationNode:
+    """A place in the gazetteer hierarchy"""
+    node_id: str
+    name: str
+    level: str  # country, division or district
+    parent: Optional[str] = None
+    aliases: List[str] = field(default_factory=list)
+
+
+def _normalize(text: str) -> str:
+    """NFKC + case-fold, with apostrophes dropped so "Cox's" == "Coxs\""""
+    return re.sub(r"['’`]", "", unicodedata.normalize('NFKC', text).casefold())
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", _normalize(name)).strip("-")
+
+
+class LocationGazetteer:
+    """
+    Resolves free-text locations to country/division/district node ids
+
+    Node ids are hierarchical ("bd", "bd/dhaka", "bd/dhaka/gazipur"), so a
+    job resolved to a district can be indexed under the district and all its
+    ancestors, and "anywhere in Dhaka division" becomes a single posting lookup.
+    Aliases are matched with one precompiled pattern.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, LocationNode] = {}
+        self.alias_index: Dict[str, List[str]] = {}
+        self._build()
+        aliases = sorted(self.alias_index, key=len, reverse=True)
+        self._pattern = re.compile(r"(?<!\w)(" + "|".join(re.escape(alias) for alias in aliases) + r")(?!\w)")
+        self.resolve_job_location = lru_cache(maxsize=65536)(self._resolve_job_location)
+
+    def _add_node(self, node: LocationNode):
+        self.nodes[node.node_id] = node
+        for alias in node.aliases:
+            self.alias_index.setdefault(_normalize(alias), []).append(node.node_id)
+
+    def _build(self):
+        self._add_node(LocationNode(COUNTRY_ID, "Bangladesh", "country", None, ["bangladesh", "বাংলাদেশ"]))
+        for division, districts in BANGLADESH_DIVISIONS.items():
+            division_id = f"{COUNTRY_ID}/{_slug(division)}"
+            names = [division] + PLACE_ALIASES.get(division, [])
+            aliases = names + [f"{name} division" for name in names] + [f"{name} bibhag" for name in names]
+            self._add_node(LocationNode(division_id, division, "division", COUNTRY_ID, aliases))
+            for district in districts:
+                names = [district] + PLACE_ALIASES.get(district, [])
+                aliases = names + [f"{name} district" for name in names] + [f"{name} zila" for name in names]
+                aliases += DISTRICT_AREAS.get(district, [])
+                self._add_node(LocationNode(f"{division_id}/{_slug(district)}", district, "district",
+                                            division_id, aliases))
+
+    def ancestors(self, node_id: str) -> List[str]:
+        """The node and its ancestors, most specific first"""
+        chain = []
+        while node_id:
+            chain.append(node_id)
+            node_id = self.nodes[node_id].parent
+        return chain
+
+    def _is_ancestor(self, ancestor: str, node_id: str) -> bool:
+        return node_id != ancestor and node_id.startswith(ancestor + "/")
+
+    def _matches(self, text: str) -> List[List[str]]:
+        """Candidate node ids for every alias found in the text"""
+        if not isinstance(text, str) or not text:
+            return []
+        return [self.alias_index[match] for match in self._pattern.findall(_normalize(text))]
+
+    def _resolve_job_location(self, location: str) -> Tuple[str, ...]:
+        """
+        Resolve a job's location to its most specific nodes plus all their ancestors
+
+        A name shared by a division and its district ("Dhaka") means the
+        division when a more specific place in it is also named
+        ("Gazipur, Dhaka"), otherwise the district.
+        """
+        matches = self._matches(location)
+        certain = {candidates[0] for candidates in matches if len(candidates) == 1}
+        # In match order (not a set) so the first node, used for display, doesn't depend on hashing
+        chosen = {}
+        for candidates in matches:
+            if len(candidates) == 1:
+                chosen[candidates[0]] = None
+            else:
+                explained = [c for c in candidates if any(self._is_ancestor(c, node) for node in certain)]
+                chosen[explained[0] if explained else max(candidates, key=lambda c: c.count("/"))] = None
+
+        expanded = []
+        for node_id in chosen:
+            if not any(self._is_ancestor(node_id, other) for other in chosen):
+                expanded.extend(self.ancestors(node_id))
+        return tuple(dict.fromkeys(expanded))
+
+    def resolve_query(self, location: str) -> List[str]:
+        """
+        Resolve a location filter to node ids
+
+        Ambiguous names resolve to the broadest node ("Dhaka" -> Dhaka
+        division), matching how substring filters behaved; "Dhaka district"
+        or an area name narrows it down. Places qualified by their parent
+        ("Gazipur, Dhaka, Bangladesh") keep only the most specific node.
+        """
+        nodes = list(dict.fromkeys(min(candidates, key=lambda c: c.count("/"))
+                                   for candidates in self._matches(location)))
+        return [node for node in nodes if not any(self._is_ancestor(node, other) for other in nodes)]
+
+    def matches(self, query: str, location: str) -> bool:
+        """Whether a job location satisfies a location filter (same node or plain substring)"""
+        if not isinstance(location, str) or not location:
+            return False
+        if query.lower() in location.lower():
+            return True
+        return not set(self.resolve_query(query)).isdisjoint(self.resolve_job_location(location))
+
+    def display_name(self, node_id: str) -> str:
+        """Human-readable name, e.g. "Gazipur, Bangladesh" or "Dhaka Division, Bangladesh\""""
+        node = self.nodes[node_id]
+        if node.level == "country":
+            return node.name
+        if node.level == "division":
+            return f"{node.name} Division, Bangladesh"
+        return f"{node.name}, Bangladesh"
+
+
+@lru_cache(maxsize=1)
+def default_gazetteer() -> LocationGazetteer:
+    """Shared gazetteer instance (built once per process)"""
+    return LocationGazetteer()
+
+
+# Test functionality
+if __name__ == "__main__":
+    gazetteer = default_gazetteer()
+
+    print("🧪 Testing location gazetteer...")
+    print("=" * 50)
+    print(f"{len(gazetteer.nodes)} nodes, {len(gazetteer.alias_index)} aliases")
+    for sample in ["Dhaka, Dhaka, Bangladesh", "Gazipur, Dhaka, Bangladesh", "Chittagong", "Chattogram Division",
+                   "Gulshan 2, Dhaka", "Cox's Bazar", "ঢাকা, বাংলাদেশ", "Remote", "Bengaluru, India"]:
+        print(f"{sample!r}: job -> {list(gazetteer.resolve_job_location(sample))}, "
+              f"query -> {gazetteer.resolve_query(sample)}")
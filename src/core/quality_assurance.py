@@ -14,6 +14,11 @@ import hashlib
 from collections import defaultdict
 import json
 
+try:
+    from .location_gazetteer import default_gazetteer
+except ImportError:
+    from location_gazetteer import default_gazetteer
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -224,15 +229,14 @@ class JobValidator:
         
         location = location.strip()
         
-        # Check for valid location patterns
+        # Any division, district or known area resolves in the gazetteer
         valid_patterns = [
-            r'\b(dhaka|chittagong|sylhet|rajshahi|khulna|barisal|rangpur|mymensingh)\b',
             r'\b(bangladesh|bd)\b',
-            r'\b(remote|work from home|wfh|online)\b',
-            r'\b(gulshan|banani|uttara|dhanmondi|mirpur)\b'
+            r'\b(remote|work from home|wfh|online)\b'
         ]
         
-        if not any(re.search(pattern, location.lower()) for pattern in valid_patterns):
+        if not default_gazetteer().resolve_job_location(location) and \
+                not any(re.search(pattern, location.lower()) for pattern in valid_patterns):
             warnings.append("Location may not be valid for Bangladesh job market")
             score -= 0.05
         
@@ -743,19 +747,14 @@ class JobEnricher:
         
         location = location.strip()
         
-        # Common normalizations
-        normalizations = {
-            'dhaka': 'Dhaka, Bangladesh',
-            'chittagong': 'Chittagong, Bangladesh',
-            'sylhet': 'Sylhet, Bangladesh',
-            'remote': 'Remote',
-            'bangladesh': 'Bangladesh'
-        }
+        if 'remote' in location.lower():
+            return 'Remote'
         
-        location_lower = location.lower()
-        for key, value in normalizations.items():
-            if key in location_lower and value not in location:
-                return value
+        # Canonical name of the most specific place (aliases and Bangla spellings included)
+        gazetteer = default_gazetteer()
+        nodes = gazetteer.resolve_job_location(location)
+        if nodes:
+            return gazetteer.display_name(nodes[0])
         
         return location
     
@@ -13,6 +13,11 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from config import Config
 
+try:
+    from .tracing import span
+except ImportError:
+    from tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -479,12 +484,13 @@ Respond only with the JSON object.
                 }
             }
             
-            response = requests.post(
-                self.api_url,
-                headers=self.headers,
-                json=payload,
-                timeout=15
-            )
+            with span("mistral_relevance"):
+                response = requests.post(
+                    self.api_url,
+                    headers=self.headers,
+                    json=payload,
+                    timeout=15
+                )
             
             if response.status_code == 200:
                 result = response.json()
@@ -518,7 +524,10 @@ Respond only with the JSON object.
             "developer", "engineer", "designer", "manager", "analyst", "consultant",
             "programmer", "coder", "architect", "specialist", "coordinator",
             "salary", "pay", "compensation", "benefits", "remote", "work from home",
-            "full time", "part time", "contract", "freelance", "internship", "resume", "cv"
+            "full time", "part time", "contract", "freelance", "internship", "resume", "cv",
+            # Bangla and Chinese job words, so non-Latin queries reach the index
+            "চাকরি", "চাকুরি", "নিয়োগ", "কাজ", "ডেভেলপার", "ইঞ্জিনিয়ার", "ডিজাইনার", "ম্যানেজার",
+            "招聘", "工作", "职位", "工程师", "设计师", "开发", "经理"
         ]
         
         # Non-job keywords (indicating irrelevant queries)
@@ -610,12 +619,13 @@ Respond only with the JSON object.
                 }
             }
             
-            response = requests.post(
-                self.api_url,
-                headers=self.headers,
-                json=payload,
-                timeout=15
-            )
+            with span("mistral_response"):
+                response = requests.post(
+                    self.api_url,
+                    headers=self.headers,
+                    json=payload,
+                    timeout=15
+                )
             
             if response.status_code == 200:
                 result = response.json()
@@ -686,6 +696,74 @@ Respond only with the JSON object.
         
         return templates
     
+    def analyze_query(self, query: str) -> Dict[str, Any]:
+        """
+        Parse a query and decide whether it is a job search, without searching
+        
+        Args:
+            query: Natural language query
+            
+        Returns:
+            Dictionary with is_relevant and parsed_data, plus search_params for
+            relevant queries or response/suggestions for irrelevant ones
+        """
+        with span("parse_query"):
+            parsed_data = self.parse_query(query)
+        
+        # Check for inappropriate content first
+        if self._is_inappropriate_content(query):
+            return {
+                "is_relevant": False,
+                "is_inappropriate": True,
+                "response": "I'm a professional job search assistant focused on helping with careers and employment. I can help you find job opportunities, improve your resume, or explore career paths.",
+                "suggestions": [
+                    "Search for job opportunities",
+                    "Get career guidance", 
+                    "Find resume tips"
+                ],
+                "parsed_data": parsed_data
+            }
+        
+        # Check if query is relevant
+        if not parsed_data.get("is_relevant", True):
+            # Get intelligent response for irrelevant query
+            intelligent_response = self._get_intelligent_response(query)
+            return {
+                "is_relevant": False,
+                "is_inappropriate": intelligent_response.get("is_inappropriate", False),
+                "response": intelligent_response.get("response", "I'm a job search assistant. I can help you find jobs!"),
+                "suggestions": intelligent_response.get("suggestions", ["Try asking about job opportunities"]),
+                "parsed_data": parsed_data
+            }
+        
+        return {
+            "is_relevant": True,
+            "parsed_data": parsed_data,
+            "search_params": self._build_search_params(parsed_data)
+        }
+    
+    def search_database(self, job_db_manager, search_params: Dict[str, Any], limit: int = 20) -> List[Any]:
+        """Run a database search with parameters from analyze_query"""
+        # Remote and salary filters are pushed down into the index
+        return job_db_manager.search_jobs(
+            query=search_params["query"],
+            location=search_params["location"],
+            experience_level=search_params["experience_level"],
+            limit=limit,
+            remote=search_params["remote"],
+            has_salary=search_params["has_salary"]
+        )
+    
+    def estimate_database_hits(self, job_db_manager, search_params: Dict[str, Any]) -> float:
+        """Predicted number of database hits for parameters from analyze_query (see search_database)"""
+        return job_db_manager.estimate_hits(
+            query=search_params["query"],
+            location=search_params["location"],
+            experience_level=search_params["experience_level"],
+            remote=search_params["remote"],
+            has_salary=search_params["has_salary"]
+        )
+    
     def search_jobs_with_database(self, query: str, job_db_manager, limit: int = 20) -> Dict[str, Any]:
         """
         Search jobs using the job database manager with parsed query
@@ -699,58 +777,12 @@ Respond only with the JSON object.
             Dictionary with results and metadata
         """
         try:
-            # Parse the query
-            parsed_data = self.parse_query(query)
-            
-            # Check for inappropriate content first
-            if self._is_inappropriate_content(query):
-                return {
-                    "jobs": [],
-                    "is_relevant": False,
-                    "is_inappropriate": True,
-                    "response": "I'm a professional job search assistant focused on helping with careers and employment. I can help you find job opportunities, improve your resume, or explore career paths.",
-                    "suggestions": [
-                        "Search for job opportunities",
-                        "Get career guidance", 
-                        "Find resume tips"
-                    ],
-                    "parsed_data": parsed_data
-                }
-            
-            # Check if query is relevant
-            if not parsed_data.get("is_relevant", True):
-                # Get intelligent response for irrelevant query
-                intelligent_response = self._get_intelligent_response(query)
-                return {
-                    "jobs": [],
-                    "is_relevant": False,
-                    "is_inappropriate": intelligent_response.get("is_inappropriate", False),
-                    "response": intelligent_response.get("response", "I'm a job search assistant. I can help you find jobs!"),
-                    "suggestions": intelligent_response.get("suggestions", ["Try asking about job opportunities"]),
-                    "parsed_data": parsed_data
-                }
-            
-            # Build search parameters
-            search_params = self._build_search_params(parsed_data)
-            
-            # Search using job database manager
-            results = job_db_manager.search_jobs(
-                query=search_params["query"],
-                location=search_params["location"],
-                experience_level=search_params["experience_level"],
-                limit=limit
-            )
-            
-            # Apply additional filters
-            if search_params["filters"]:
-                results = self._apply_additional_filters(results, search_params["filters"])
+            analysis = self.analyze_query(query)
+            if not analysis["is_relevant"]:
+                return {"jobs": [], **analysis}
             
-            return {
-                "jobs": results,
-                "is_relevant": True,
-                "parsed_data": parsed_data,
-                "search_params": search_params
-            }
+            results = self.search_database(job_db_manager, analysis["search_params"], limit=limit)
+            return {"jobs": results, **analysis}
             
         except Exception as e:
             logger.error(f"Error searching jobs: {e}")
@@ -787,32 +819,19 @@ Respond only with the JSON object.
         if parsed_data.get("salary_range"):
             filters["salary_range"] = parsed_data["salary_range"]
         
+        # Salary filter (basic implementation): "above"/"high" keeps jobs with salary information
+        salary_filter = (parsed_data.get("salary_range") or "").lower()
+        has_salary = "above" in salary_filter or "high" in salary_filter
+        
         return {
             "query": search_query,
             "location": parsed_data.get("location"),
             "experience_level": parsed_data.get("experience_level"),
+            "remote": bool(parsed_data.get("remote")),
+            "has_salary": has_salary,
             "filters": filters
         }
     
-    def _apply_additional_filters(self, jobs: List[Any], filters: Dict[str, Any]) -> List[Any]:
-        """Apply additional filters to job results"""
-        filtered_jobs = jobs
-        
-        # Filter by remote work
-        if filters.get("remote"):
-            filtered_jobs = [job for job in filtered_jobs 
-                           if "remote" in job.location.lower() or 
-                              "work from home" in job.title.lower()]
-        
-        # Filter by salary range (basic implementation)
-        if filters.get("salary_range"):
-            salary_filter = filters["salary_range"].lower()
-            if "above" in salary_filter or "high" in salary_filter:
-                # Keep jobs with salary information
-                filtered_jobs = [job for job in filtered_jobs if job.salary]
-        
-        return filtered_jobs
-    
     def validate_parsed_data(self, parsed_data: Dict[str, Any]) -> bool:
         """Validate that parsed data has required fields"""
         required_fields = ["job_type", "search_query"]
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Query Planner
+Orders index predicates by estimated selectivity for JobDatabaseManager searches
+"""
+
+import heapq
+import logging
+from typing import List, Dict, Optional, Callable, Iterable, Iterator, Set
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IndexPredicate:
+    """A search predicate backed by one or more posting lists from the search index"""
+    name: str
+    postings: List[List[int]] = field(default_factory=list)
+    # Optional per-row check used instead of materializing the postings when the
+    # candidate set is already smaller than this predicate
+    row_check: Optional[Callable[[int], bool]] = None
+    _ids: Optional[Set[int]] = field(default=None, init=False, repr=False)
+
+    # Posting lists with at most this many entries in total are unioned exactly for hit estimates
+    EXACT_UNION_LIMIT = 4096
+
+    @property
+    def estimate(self) -> int:
+        """Upper bound on matching rows (sum of posting list lengths)"""
+        return sum(len(p) for p in self.postings)
+
+    def union_estimate(self) -> int:
+        """
+        Matching rows for hit estimates: the size of the union of the posting lists
+
+        Exact when the lists are short (the union is kept for execution),
+        else the largest list, a lower bound. The words of one query mostly
+        hit the same rows, so the sum of the lists overcounts badly.
+        """
+        if self._ids is not None or self.estimate <= self.EXACT_UNION_LIMIT:
+            return len(self.ids())
+        return max((len(p) for p in self.postings), default=0)
+
+    def ids(self) -> Set[int]:
+        """Materialize the union of the posting lists"""
+        if self._ids is None:
+            self._ids = set()
+            for posting in self.postings:
+                self._ids.update(posting)
+        return self._ids
+
+    def iter_sorted(self) -> Iterator[int]:
+        """Walk the union of the (ascending) posting lists in order without materializing it"""
+        last = None
+        for idx in heapq.merge(*self.postings):
+            if idx != last:
+                yield idx
+                last = idx
+
+    def contains(self, idx: int) -> bool:
+        """Check a single row against this predicate"""
+        if self.row_check is not None and self._ids is None:
+            return self.row_check(idx)
+        return idx in self.ids()
+
+
+class QueryPlanner:
+    """Evaluates index predicates cheapest-first with short-circuiting"""
+
+    def order(self, predicates: Iterable[IndexPredicate]) -> List[IndexPredicate]:
+        """Return predicates sorted by estimated selectivity (most selective first)"""
+        return sorted(predicates, key=lambda p: p.estimate)
+
+    def explain(self, predicates: Iterable[IndexPredicate]) -> List[Dict[str, int]]:
+        """Describe the evaluation order chosen for a set of predicates"""
+        return [{'predicate': p.name, 'estimate': p.estimate} for p in self.order(predicates)]
+
+    def estimate_hits(self, predicates: Iterable[IndexPredicate], total_rows: int) -> float:
+        """
+        Predict how many rows match all predicates from posting-list sizes alone
+
+        Predicates are treated as independent (each keeps union_estimate /
+        total_rows of the rows) and the result is capped by the most selective
+        one. Only short posting lists are materialized (see union_estimate).
+
+        Args:
+            predicates: Index-backed predicates (all must match)
+            total_rows: Number of rows in the store
+
+        Returns:
+            Expected number of matching rows (0.0 when any predicate is empty)
+        """
+        estimates = [min(p.union_estimate(), total_rows) for p in predicates]
+        if not estimates or total_rows <= 0:
+            return 0.0
+        expected = float(total_rows)
+        for estimate in estimates:
+            expected *= estimate / total_rows
+        return min(expected, float(min(estimates)))
+
+    def execute(self, predicates: List[IndexPredicate],
+                residual_filters: Optional[List[Callable[[int], bool]]] = None) -> Set[int]:
+        """
+        Intersect predicates starting from the most selective one
+
+        Args:
+            predicates: Index-backed predicates (all must match)
+            residual_filters: Row-level checks applied to the final candidates
+
+        Returns:
+            Set of matching row indices
+        """
+        if not predicates:
+            return set()
+
+        plan = self.order(predicates)
+        logger.debug(f"Query plan: {[(p.name, p.estimate) for p in plan]}")
+
+        # Any empty predicate means an empty intersection
+        if plan[0].estimate == 0:
+            return set()
+
+        candidates = set(plan[0].ids())
+        for predicate in plan[1:]:
+            if predicate.row_check is not None and len(candidates) < predicate.estimate:
+                # Probing a few rows is cheaper than building the predicate's id set
+                candidates = {idx for idx in candidates if predicate.row_check(idx)}
+            else:
+                candidates &= predicate.ids()
+
+            if not candidates:
+                return set()
+
+        for check in residual_filters or []:
+            candidates = {idx for idx in candidates if check(idx)}
+            if not candidates:
+                return set()
+
+        return candidates
+
+    def execute_ordered(self, predicates: List[IndexPredicate], limit: int,
+                        residual_filters: Optional[List[Callable[[int], bool]]] = None) -> List[int]:
+        """
+        Return the first `limit` matching row indices in ascending index order
+
+        Posting lists are sorted by row index, so walking the most selective
+        predicate in order lets the search stop as soon as `limit` hits are found.
+
+        Args:
+            predicates: Index-backed predicates (all must match)
+            limit: Maximum number of row indices to return
+            residual_filters: Row-level checks applied to each candidate
+
+        Returns:
+            List of matching row indices in ascending order
+        """
+        if not predicates or limit <= 0:
+            return []
+
+        plan = self.order(predicates)
+        logger.debug(f"Ordered query plan (limit={limit}): {[(p.name, p.estimate) for p in plan]}")
+
+        if plan[0].estimate == 0:
+            return []
+
+        driver, others = plan[0], plan[1:]
+        checks = list(residual_filters or [])
+        results = []
+        for idx in driver.iter_sorted():
+            if all(p.contains(idx) for p in others) and all(check(idx) for check in checks):
+                results.append(idx)
+                if len(results) >= limit:
+                    break
+
+        return results
+
+
+# Test functionality
+if __name__ == "__main__":
+    import random
+
+    print("🧪 Testing query planner estimates...")
+    print("=" * 50)
+
+    random.seed(7)
+    total_rows = 20000
+
+    def posting(share: float, rows: range = range(total_rows)) -> List[int]:
+        return sorted(idx for idx in rows if random.random() < share)
+
+    # Every job lists python; developer titles (and their related terms) overlap heavily
+    python, developer, dev = posting(1.0), posting(0.4), posting(0.3)
+    # A niche role in a few hundred rows, matched through three words
+    niche_rows = range(0, total_rows, 50)
+    graphic, designer, design = posting(0.9, niche_rows), posting(1.0, niche_rows), posting(0.8, niche_rows)
+    # A mid-sized role whose many related terms all hit its rows: the lists sum past the total
+    data_rows = range(0, total_rows, 8)
+    data_terms = [posting(0.9, data_rows) for _ in range(10)]
+    dhaka = posting(0.3)
+
+    planner = QueryPlanner()
+    for label, predicates in [
+        ("python developer", [IndexPredicate('text', [python, developer, dev])]),
+        ("data engineer", [IndexPredicate('text', data_terms)]),
+        ("graphic designer", [IndexPredicate('text', [graphic, designer, design])]),
+        ("graphic designer in Dhaka", [IndexPredicate('text', [graphic, designer, design]),
+                                        IndexPredicate('location', [dhaka])]),
+    ]:
+        estimate = planner.estimate_hits(predicates, total_rows)
+        actual = len(planner.execute([IndexPredicate(p.name, p.postings) for p in predicates]))
+        print(f"{label}: estimate {estimate:.0f}, actual {actual}, "
+              f"sum of postings {sum(p.estimate for p in predicates)}, total {total_rows}")
+        if label != "python developer":
+            assert estimate < total_rows, f"selective query '{label}' estimated as the whole store"
+    print("✅ Selective queries estimate below the total")
@@ -1,48 +1,166 @@
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from dataclasses import dataclass, asdict, is_dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+import hashlib
 import logging
-from typing import Dict, List, Any
+import queue
+import threading
+from typing import Dict, List, Any, Iterator, Tuple
 import time
+from urllib.parse import urlparse
 
 try:
     from .query_parser import QueryParser
-    from .job_database_manager import JobDatabaseManager
+    from .job_database_manager import JobDatabaseManager, JobData
+    from .sharded_job_database import ShardedJobDatabaseManager
+    from .dataset_catalog import DatasetCatalog
     # 4-Layer System Components
     from .advanced_web_search import AdvancedWebSearchEngine
     from .enhanced_llm_pipeline import EnhancedLLMPipeline
     from .intelligent_source_router import IntelligentSourceRouter
     from .quality_assurance import QualityAssuranceLayer
+    from .browser_pool import BrowserPool
+    from .deadline import Deadline
+    from .response_cache import ResponseCache, STALE, normalize_text
+    from .tracing import Span, StageTimings, activate, current_span, span
+    from .shared_components import LazyComponent, get_shared
+    from .job_identity import JobIdentityIndex, canonicalize_url, resolve_bing_redirect
 except ImportError:
     from query_parser import QueryParser
-    from job_database_manager import JobDatabaseManager
+    from job_database_manager import JobDatabaseManager, JobData
+    from sharded_job_database import ShardedJobDatabaseManager
+    from dataset_catalog import DatasetCatalog
     # 4-Layer System Components
     from advanced_web_search import AdvancedWebSearchEngine
     from enhanced_llm_pipeline import EnhancedLLMPipeline
     from intelligent_source_router import IntelligentSourceRouter
     from quality_assurance import QualityAssuranceLayer
+    from browser_pool import BrowserPool
+    from deadline import Deadline
+    from response_cache import ResponseCache, STALE, normalize_text
+    from tracing import Span, StageTimings, activate, current_span, span
+    from shared_components import LazyComponent, get_shared
+    from job_identity import JobIdentityIndex, canonicalize_url, resolve_bing_redirect
 
 logger = logging.getLogger(__name__)
 
+# End-of-stream marker for the web fallback pipeline queues
+_PIPELINE_DONE = object()
+
+class SearchEventType(Enum):
+    """Stages reported by RAGEngine.search_stream"""
+    PARSED_QUERY = "parsed_query"
+    DATABASE_RESULTS = "database_results"
+    WEB_RESULTS = "web_results"
+    SUMMARY = "summary"
+    ERROR = "error"
+
+@dataclass
+class SearchEvent:
+    """One streamed search update"""
+    type: SearchEventType
+    data: Dict[str, Any]
+    elapsed: float  # seconds since the search started
+
 class RAGEngine:
-    def __init__(self):
-        """Initialize all the core components of the agent with 4-layer system."""
+    # Sites whose listings are rendered client-side and need a real browser
+    JAVASCRIPT_SITES = ['linkedin.com', 'indeed.com', 'glassdoor.com', 'monster.com', 'careerbuilder.com']
+
+    # Heavy components are built on first use (or by warm_up) and, except for the
+    # write-through QA layer, shared by every engine in the process
+    query_parser = LazyComponent('_build_query_parser')
+    job_database = LazyComponent('_build_job_database')
+    web_search_engine = LazyComponent('_build_web_search_engine')
+    llm_pipeline = LazyComponent('_build_llm_pipeline')
+    source_router = LazyComponent('_build_source_router')
+    quality_assurance = LazyComponent('_build_quality_assurance')
+    write_through_qa = LazyComponent('_build_write_through_qa')
+    browser_pool = LazyComponent('_build_browser_pool')
+    LAZY_COMPONENTS = ('query_parser', 'job_database', 'web_search_engine', 'llm_pipeline',
+                       'source_router', 'quality_assurance', 'write_through_qa', 'browser_pool')
+
+    def __init__(self, num_database_shards: int = None, dataset_catalog: DatasetCatalog = None,
+                 database_memory_limit_mb: float = None):
+        """
+        Configure the agent's 4-layer system without building it yet.
+        
+        Components are created on first use; call warm_up() to build them ahead
+        of the first search. Workers that only serve database queries never
+        build the web search engine, LLM pipeline or browser pool.
+        
+        Args:
+            num_database_shards: Run the job database as this many worker-process shards
+                (None or 1 keeps a single in-process JobDatabaseManager)
+            dataset_catalog: Search a catalog of lazily loaded datasets instead of one CSV
+            database_memory_limit_mb: Spill cold job columns to disk above this resident size
+        """
         logger.info("🚀 Initializing Enhanced RAG Engine with Job Database Integration...")
+        self.num_database_shards = num_database_shards if num_database_shards and num_database_shards > 1 else None
+        self.dataset_catalog = dataset_catalog
+        self.database_memory_limit_mb = database_memory_limit_mb
         
-        # Core components
-        self.query_parser = QueryParser()
+        # Web fallback pipeline: concurrent page fetches, concurrent LLM extractions,
+        # and the capacity of the queues between the stages
+        self.web_fetch_workers = 8
+        self.web_extract_workers = 4
+        self.web_pipeline_queue_size = 16
+        # Fraction of a search's time budget the SERP queries may use before results are fetched
+        self.web_search_budget_share = 0.4
+        # Search response cache: parsed queries and database results are fresh for the cache
+        # TTL; web fallback results are expensive and change slowly, so they stay fresh longer
+        # and are refreshed in the background (with their own time budget) once stale
+        self.response_cache = ResponseCache(max_entries=512, ttl=120, stale_ttl=600)
+        self.web_cache_ttl = 3600
+        self.web_refresh_timeout = 60
+        # The web fallback runs when the database finds fewer jobs than this; when the
+        # index statistics predict as much before the search, it is started speculatively
+        self.web_fallback_min_results = 5
+        self.speculative_web_fallback = True
+        # Write-through of web fallback jobs: QA-approved jobs are upserted into the job
+        # database in the background so later queries find them in the index. They expire
+        # after web_job_ttl_days; with a dataset catalog they go to web_jobs_dataset.
+        self.web_write_through = True
+        self.web_job_ttl_days = 14
+        self.web_jobs_dataset = None
+        self._write_through_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="web-write-through")
+        # Per-stage timings of every search, aggregated across searches
+        self.stage_timings = StageTimings()
         
-        # Job Database Manager (Primary Data Source)
-        logger.info("📊 Initializing Job Database Manager...")
+        logger.info("✅ Advanced RAG Engine configured; components are built on first use")
+
+    def _build_query_parser(self) -> QueryParser:
+        return get_shared("query_parser", QueryParser)
+
+    def _build_job_database(self):
+        """The shared job database for this engine's settings (None if it failed to load; retried on next use)"""
+        if self.dataset_catalog is not None:
+            return self.dataset_catalog
         try:
-            self.job_database = JobDatabaseManager()
-            logger.info(f"✅ Job Database loaded with {self.job_database.get_statistics()['total_jobs']} jobs")
+            return get_shared(("job_database", self.num_database_shards, self.database_memory_limit_mb),
+                              self._load_job_database)
         except Exception as e:
             logger.error(f"❌ Failed to initialize Job Database: {e}")
-            self.job_database = None
-        
-        # 4-Layer System Components
+            return None
+
+    def _load_job_database(self):
+        logger.info("📊 Initializing Job Database Manager...")
+        if self.num_database_shards:
+            job_database = ShardedJobDatabaseManager(num_shards=self.num_database_shards,
+                                                     memory_limit_mb=self.database_memory_limit_mb)
+        else:
+            job_database = JobDatabaseManager(memory_limit_mb=self.database_memory_limit_mb)
+        logger.info(f"✅ Job Database loaded with {job_database.get_statistics()['total_jobs']} jobs")
+        return job_database
+
+    def _build_web_search_engine(self) -> AdvancedWebSearchEngine:
         logger.info("🔧 Initializing Layer 1: Advanced Web Search Engine...")
-        self.web_search_engine = AdvancedWebSearchEngine()
-        
+        return get_shared("web_search_engine", AdvancedWebSearchEngine)
+
+    def _build_llm_pipeline(self) -> EnhancedLLMPipeline:
+        return get_shared("llm_pipeline", self._load_llm_pipeline)
+
+    def _load_llm_pipeline(self) -> EnhancedLLMPipeline:
         logger.info("🤖 Initializing Layer 2: Enhanced LLM Pipeline...")
         # Initialize LLM pipeline with Hugging Face and Gemini API keys
         try:
@@ -56,81 +174,264 @@ class RAGEngine:
             huggingface_api_key = None
             gemini_api_key = None
         
-        self.llm_pipeline = EnhancedLLMPipeline(
+        return EnhancedLLMPipeline(
             huggingface_api_key=huggingface_api_key,
             gemini_api_key=gemini_api_key
         )
-        
+
+    def _build_source_router(self) -> IntelligentSourceRouter:
         logger.info("🎯 Initializing Layer 3: Intelligent Source Router...")
-        self.source_router = IntelligentSourceRouter()
-        
+        return get_shared("source_router", IntelligentSourceRouter)
+
+    def _build_quality_assurance(self) -> QualityAssuranceLayer:
         logger.info("✅ Initializing Layer 4: Quality Assurance Layer...")
-        self.quality_assurance = QualityAssuranceLayer()
+        return get_shared("quality_assurance", QualityAssuranceLayer)
+
+    def _build_write_through_qa(self) -> QualityAssuranceLayer:
+        # Private: its statistics describe this engine's write-through batches only
+        return QualityAssuranceLayer()
+
+    def _build_browser_pool(self) -> BrowserPool:
+        # Headless browsers for JavaScript-heavy sites, launched on first fetch and reused
+        return get_shared("browser_pool", lambda: BrowserPool(size=2))
+
+    def warm_up(self, components: List[str] = None) -> Dict[str, float]:
+        """
+        Build components now instead of on the first search
+        
+        Args:
+            components: Names from LAZY_COMPONENTS to build (all by default), e.g.
+                ["query_parser", "job_database"] for a worker serving database queries
+        
+        Returns:
+            Seconds spent building each component (about 0 for ones already built)
         
-        logger.info("✅ Advanced RAG Engine initialized successfully with 4-layer system")
+        Raises:
+            ValueError: For a name that is not a lazy component
+        """
+        names = list(components) if components is not None else list(self.LAZY_COMPONENTS)
+        unknown = [name for name in names if name not in self.LAZY_COMPONENTS]
+        if unknown:
+            raise ValueError(f"Unknown components: {unknown}")
+        
+        timings = {}
+        for name in names:
+            start_time = time.perf_counter()
+            getattr(self, name)
+            timings[name] = time.perf_counter() - start_time
+        logger.info(f"🔥 Warmed up {', '.join(f'{name} ({seconds:.2f}s)' for name, seconds in timings.items())}")
+        return timings
 
-    def search(self, raw_query: str) -> dict:
+    def search(self, raw_query: str, timeout: float = None, debug: bool = False) -> dict:
         """
         Executes the enhanced RAG pipeline with dataset-first approach:
         Parse -> Check Relevance -> Search Database -> Fallback to APIs -> Quality Assurance -> Generate
         
         Args:
             raw_query (str): User's natural language query
+            timeout (float): Seconds budget for the whole search; when it runs out the
+                web fallback is cut short and the results found so far are returned
+            debug (bool): Include the per-stage timing tree under "spans"
             
         Returns:
             dict: Contains summary and job listings with quality metrics
         """
+        database_jobs = []
+        web_batches = []
+        result = {}
+        
+        for event in self.search_stream(raw_query, timeout=timeout, debug=debug):
+            if event.type is SearchEventType.DATABASE_RESULTS:
+                database_jobs = event.data["jobs"]
+            elif event.type is SearchEventType.WEB_RESULTS:
+                web_batches.append(event.data)
+            elif event.type is SearchEventType.SUMMARY:
+                result = dict(event.data)
+            elif event.type is SearchEventType.ERROR:
+                return {"jobs": [], **event.data}
+        
+        # Web jobs arrive in completion order; report them in search-result order
+        web_batches.sort(key=lambda batch: batch["rank"])
+        result["jobs"] = database_jobs + [job for batch in web_batches for job in batch["jobs"]]
+        return result
+
+    def search_stream(self, raw_query: str, limit: int = 20, timeout: float = None,
+                      deadline: Deadline = None, debug: bool = False) -> Iterator[SearchEvent]:
+        """
+        Run the search pipeline, yielding results as each stage produces them
+        
+        Events, in order: PARSED_QUERY, DATABASE_RESULTS (usually within
+        milliseconds), one WEB_RESULTS per web page with extracted jobs (only
+        when the database found too few), then SUMMARY. Irrelevant queries
+        go straight from PARSED_QUERY to SUMMARY; failures end the stream
+        with ERROR. Closing the generator early stops the web fallback, and
+        so does the deadline: the stream then ends with a SUMMARY marked
+        timed_out covering the results delivered so far. When the index
+        statistics predict too few database hits, the web fallback starts
+        alongside the database search and is cancelled if the prediction
+        was wrong. Results are merged across sources by canonical job
+        identity: a posting already delivered (by URL or title/company) is
+        not delivered again, and SUMMARY counts the drops as duplicate_jobs.
+        
+        Every stage and sub-call is timed as a span; the durations are added
+        to stage_timings, and with debug the span tree is included in the
+        final SUMMARY or ERROR event under "spans".
+        
+        Args:
+            raw_query: User's natural language query
+            limit: Maximum number of database results
+            timeout: Seconds budget for the whole search (None = no limit)
+            deadline: Shared Deadline to use instead of timeout (lets the caller cancel)
+            debug: Include the span tree in the final event
+            
+        Yields:
+            SearchEvent objects
+        """
         start_time = time.time()
+        deadline = deadline or Deadline(timeout)
         logger.info(f"🔍 Starting Enhanced RAG search for query: '{raw_query}'")
         
+        def event(event_type: SearchEventType, data: Dict[str, Any]) -> SearchEvent:
+            return SearchEvent(event_type, data, time.time() - start_time)
+        
+        speculative_deadline, speculative_batches = None, None
+        trace = Span("search")
+        web_span = None
+        
+        def close_trace() -> Dict[str, Any]:
+            # Spans must not be open across a yield, so the web span is finished by hand
+            if trace.end is None:
+                if web_span is not None:
+                    web_span.finish()
+                trace.finish()
+                self.stage_timings.record(trace)
+            return {"spans": trace.to_dict()} if debug else {}
+        
         try:
             # 1. PARSE & CHECK RELEVANCE: Use enhanced query parser
             logger.info("📝 Step 1: Parsing and checking query relevance...")
             
             if not self.job_database:
                 logger.error("❌ Job database not available")
-                return {"summary": "Sorry, the job database is not available.", "jobs": []}
+                yield event(SearchEventType.SUMMARY, {"summary": "Sorry, the job database is not available.",
+                                                      **close_trace()})
+                return
             
-            # Use enhanced search method that handles irrelevant queries
-            search_result = self.query_parser.search_jobs_with_database(
-                raw_query, 
-                self.job_database, 
-                limit=20
-            )
+            with span("analyze_query", parent=trace):
+                analysis = self._analyze_query(raw_query)
+            parsed_data = analysis.get("parsed_data", {})
+            search_params = analysis.get("search_params")
+            yield event(SearchEventType.PARSED_QUERY, analysis)
             
             # Check if query is relevant
-            if not search_result.get("is_relevant", True):
+            if not analysis.get("is_relevant", True):
                 logger.info("❌ Query is not job-related")
-                return {
-                    "summary": search_result.get("response", "I'm a job search assistant."),
-                    "jobs": [],
-                    "suggestions": search_result.get("suggestions", []),
+                yield event(SearchEventType.SUMMARY, {
+                    "summary": analysis.get("response", "I'm a job search assistant."),
+                    "suggestions": analysis.get("suggestions", []),
                     "is_relevant": False,
-                    "is_inappropriate": search_result.get("is_inappropriate", False)
-                }
+                    "is_inappropriate": analysis.get("is_inappropriate", False),
+                    **close_trace()
+                })
+                return
             
-            # Get jobs from database
-            database_jobs = search_result.get("jobs", [])
-            logger.info(f"✅ Database search found {len(database_jobs)} jobs")
+            # 2. SEARCH DATABASE
+            def search_database():
+                return self.query_parser.search_database(self.job_database, search_params, limit=limit)
             
-            # 2. FALLBACK: If insufficient results, try Web Search + LLM
-            all_jobs = database_jobs.copy()
+            # Queries the index statistics predict to be sparse start the web fallback now,
+            # in parallel with the database search, instead of after it
+            web_key = ("web",) + tuple(self._build_web_search_queries(parsed_data))
+            with span("estimate_database_hits", parent=trace):
+                predicted_hits = self._estimate_database_hits(raw_query, search_params)
+            if (self.speculative_web_fallback and predicted_hits < self.web_fallback_min_results
+                    and not deadline.expired() and web_key not in self.response_cache):
+                logger.info(f"🔮 Predicted {predicted_hits:.1f} database hits, starting web fallback speculatively")
+                speculative_deadline = Deadline(parent=deadline)
+                web_span = trace.child("web_fallback", speculative=True)
+                with activate(web_span):
+                    speculative_batches = self._iter_web_search_batches(parsed_data, speculative_deadline)
             
-            if len(database_jobs) < 5:  # If we have less than 5 jobs, try web search
-                logger.info("🔄 Insufficient database results, trying web search fallback...")
-                web_search_jobs = self._search_with_web_search(raw_query, search_result.get("parsed_data", {}))
-                all_jobs.extend(web_search_jobs)
-                logger.info(f"✅ Web search fallback added {len(web_search_jobs)} jobs")
+            with span("database_search", parent=trace) as database_span:
+                database_jobs, database_cache_state = None, None
+                if search_params:
+                    try:
+                        database_jobs, database_cache_state = self.response_cache.get_or_load(
+                            self._database_cache_key(parsed_data, search_params, limit), search_database)
+                    except Exception as e:
+                        logger.error(f"Error searching jobs: {e}")
+                if database_jobs is None:
+                    # Fallback to basic search; a degraded result is not cached
+                    database_jobs = self.job_database.search_jobs(raw_query, limit=limit)
+                database_span.attributes.update(jobs=len(database_jobs), cached=database_cache_state is not None)
+            # The same posting can come from several datasets and from the web; the first
+            # (database) copy is kept and later ones are dropped as they arrive
+            identity_index = JobIdentityIndex()
+            database_jobs = identity_index.merge(database_jobs)
+            logger.info(f"✅ Database search found {len(database_jobs)} jobs"
+                        f"{f' ({database_cache_state} cache hit)' if database_cache_state else ''}")
+            yield event(SearchEventType.DATABASE_RESULTS, {"jobs": database_jobs,
+                                                           "cached": database_cache_state is not None})
             
-            # 3. QUALITY ASSURANCE: Skip for better performance
-            logger.info(f"✅ Step 3: Quality assurance processing {len(all_jobs)} jobs...")
-            # Skip QA processing for better performance - jobs are already validated in database
-            processed_jobs = all_jobs
-
-            # 4. GENERATE: Create summary and format results (optimized)
-            logger.info("📊 Step 4: Generating summary and formatting results...")
-            # Use simple summary for better performance
-            summary = f"Found {len(processed_jobs)} jobs matching your query: '{raw_query}'"
+            # 3. FALLBACK: If insufficient results, try Web Search + LLM
+            web_search_jobs = 0
+            web_cache_state = None
+            if len(database_jobs) < self.web_fallback_min_results and not deadline.expired():
+                cached_batches, web_cache_state = (None, None) if speculative_batches is not None \
+                    else self.response_cache.get(web_key)
+                web_span = web_span or trace.child("web_fallback", cached=web_cache_state is not None)
+                if web_cache_state is not None:
+                    logger.info(f"♻️ Serving web fallback results from cache ({web_cache_state})")
+                    if web_cache_state == STALE:
+                        self.response_cache.refresh(web_key, lambda: self._refresh_web_batches(parsed_data),
+                                                    ttl=self.web_cache_ttl)
+                    for rank, url, jobs in cached_batches:
+                        jobs = identity_index.merge(jobs, page_url=url)
+                        if not jobs:
+                            continue
+                        web_search_jobs += len(jobs)
+                        yield event(SearchEventType.WEB_RESULTS, {"jobs": jobs, "source_url": url, "rank": rank,
+                                                                  "cached": True})
+                else:
+                    logger.info("🔄 Insufficient database results, trying web search fallback...")
+                    batches, new_batches = [], []
+                    try:
+                        web_batches = speculative_batches
+                        if web_batches is None:
+                            with activate(web_span):
+                                web_batches = self._iter_web_search_batches(parsed_data, deadline)
+                        for rank, url, jobs in web_batches:
+                            # Cached as extracted: duplicates depend on the database results
+                            batches.append((rank, url, jobs))
+                            jobs = identity_index.merge(jobs, page_url=url)
+                            if not jobs:
+                                continue
+                            new_batches.append((rank, url, jobs))
+                            web_search_jobs += len(jobs)
+                            yield event(SearchEventType.WEB_RESULTS, {"jobs": jobs, "source_url": url, "rank": rank,
+                                                                      "cached": False})
+                        # Only complete runs are cached; empty ones only for the short TTL
+                        if not deadline.expired():
+                            self.response_cache.put(web_key, batches, ttl=self.web_cache_ttl if batches else None)
+                    except Exception as e:
+                        logger.error(f"❌ Web search + LLM fallback failed: {e}")
+                    finally:
+                        # Pages extracted before a timeout or early close are still worth keeping;
+                        # postings the database already has are not written again
+                        self._write_through_web_jobs(new_batches)
+                web_span.attributes.update(jobs=web_search_jobs, duplicates=identity_index.duplicates)
+                web_span.finish()
+                logger.info(f"✅ Web search fallback added {web_search_jobs} jobs")
+            elif speculative_deadline is not None:
+                speculative_deadline.cancel()
+                web_span.attributes['cancelled'] = True
+                web_span.finish()
+                logger.info(f"🛑 Database found {len(database_jobs)} jobs, cancelled the speculative web fallback")
+            
+            # 4. QUALITY ASSURANCE: Skip for better performance - jobs are already validated in database
+            # 5. GENERATE: Create summary (optimized)
+            total_jobs = len(database_jobs) + web_search_jobs
+            summary = f"Found {total_jobs} jobs matching your query: '{raw_query}'"
 
             execution_time = time.time() - start_time
             logger.info(f"🎉 Enhanced RAG search completed in {execution_time:.2f} seconds")
@@ -141,228 +442,380 @@ class RAGEngine:
                 logger.error(f"❌ Quality metrics failed: {e}")
                 quality_metrics = {}
             
-            return {
+            yield event(SearchEventType.SUMMARY, {
                 "summary": summary,
-                "jobs": processed_jobs,
                 "execution_time": execution_time,
                 "database_jobs": len(database_jobs),
-                "web_search_jobs": len(all_jobs) - len(database_jobs),
-                "total_jobs_found": len(all_jobs),
-                "quality_approved_jobs": len(processed_jobs),
+                "web_search_jobs": web_search_jobs,
+                "duplicate_jobs": identity_index.duplicates,
+                "total_jobs_found": total_jobs,
+                "quality_approved_jobs": total_jobs,
                 "quality_metrics": quality_metrics,
-                "parsed_data": search_result.get("parsed_data", {}),
-                "search_params": search_result.get("search_params", {})
-            }
+                "parsed_data": parsed_data,
+                "search_params": search_params or {},
+                "timed_out": deadline.expired(),
+                "cached_database": database_cache_state is not None,
+                "cached_web": web_cache_state is not None,
+                "predicted_database_hits": predicted_hits,
+                "speculative_web": speculative_deadline is not None,
+                **close_trace()
+            })
             
         except Exception as e:
             logger.error(f"❌ Enhanced RAG search failed: {str(e)}")
-            return {
+            yield event(SearchEventType.ERROR, {
                 "summary": "Sorry, something went wrong while searching for jobs.",
-                "jobs": [],
-                "error": str(e)
-            }
+                "error": str(e),
+                **close_trace()
+            })
+        finally:
+            # A speculative fallback must not outlive a failed or abandoned search
+            if speculative_deadline is not None:
+                speculative_deadline.cancel()
+            close_trace()
 
-    def _get_html_with_playwright(self, url: str) -> str:
-        """Get HTML content with JavaScript execution using Playwright"""
+    def _analyze_query(self, raw_query: str) -> Dict[str, Any]:
+        """Parse and relevance-check a query (cached by its normalized text unless parsing failed)"""
         try:
-            from playwright.sync_api import sync_playwright
-            
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                
-                # Set realistic headers
-                page.set_extra_http_headers({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                })
-                
-                # Navigate and wait for content
-                page.goto(url, wait_until='networkidle', timeout=15000)
-                page.wait_for_timeout(3000)  # Wait for JavaScript to load
-                
-                html_content = page.content()
-                browser.close()
-                
-                logger.info(f"✅ Playwright successfully fetched content from {url}")
-                return html_content
-                
+            analysis, _ = self.response_cache.get_or_load(("query", normalize_text(raw_query)),
+                                                          lambda: self.query_parser.analyze_query(raw_query))
+            return analysis
         except Exception as e:
-            logger.error(f"❌ Playwright failed for {url}: {e}")
-            return ""
+            logger.error(f"Error parsing query: {e}")
+            # Fallback to basic search (without search_params, so nothing downstream is cached either)
+            return {"is_relevant": True, "parsed_data": {"job_type": "job", "search_query": raw_query}}
 
+    def _estimate_database_hits(self, raw_query: str, search_params: Dict[str, Any]) -> float:
+        """Predicted database hits for a query from posting-list sizes (inf when the store can't tell)"""
+        try:
+            if search_params:
+                return self.query_parser.estimate_database_hits(self.job_database, search_params)
+            return self.job_database.estimate_hits(raw_query)
+        except Exception as e:
+            logger.warning(f"⚠️ Database hit estimate failed: {e}")
+            return float("inf")
 
+    def _database_cache_key(self, parsed_data: Dict[str, Any], search_params: Dict[str, Any], limit: int) -> tuple:
+        """
+        Cache key for database results: the search terms plus the parsed filters
 
-    def _search_with_4layer_system(self, parsed_query: dict, selected_sources: List[str]) -> List[Dict]:
+        Only case and whitespace are normalized; the role filter matches phrases,
+        so word order changes the results.
         """
-        Execute search using the 4-layer system:
-        Layer 1: Advanced Web Search → Layer 2: Enhanced LLM → Layer 3: Source Router → Layer 4: Quality Assurance
+        return (
+            "database",
+            normalize_text(search_params.get("query")),
+            normalize_text(parsed_data.get("job_type")),
+            normalize_text(search_params.get("location")),
+            tuple(sorted(normalize_text(skill) for skill in parsed_data.get("skills") or [])),
+            normalize_text(search_params.get("experience_level")),
+            bool(search_params.get("remote")),
+            bool(search_params.get("has_salary")),
+            limit
+        )
+
+    def _refresh_web_batches(self, parsed_data: Dict[str, Any]) -> list:
+        """Rerun the web fallback for a stale cache entry (incomplete runs keep the old entry)"""
+        deadline = Deadline(self.web_refresh_timeout)
+        batches = list(self._iter_web_search_batches(parsed_data, deadline))
+        self._write_through_web_jobs(batches)
+        if deadline.expired():
+            raise TimeoutError(f"web refresh did not finish within {self.web_refresh_timeout}s")
+        return batches
+
+    def _write_through_web_jobs(self, batches: list):
+        """Queue a web fallback run's jobs for QA and upsert into the job database"""
+        if self.web_write_through and any(jobs for _, _, jobs in batches):
+            self._write_through_executor.submit(self._persist_web_jobs, list(batches))
+
+    def _persist_web_jobs(self, batches: list) -> Dict[str, int]:
         """
-        logger.info("🔧 Executing 4-layer system search...")
+        Upsert the QA-approved jobs of a web fallback run into the job database
         
-        try:
-            # Layer 1: Advanced Web Search - Search for actual job listing pages
-            logger.info("🌐 Layer 1: Advanced Web Search for job listing pages...")
-            
-            # Use broader search queries instead of site-specific
-            job_type = parsed_query.get('job_type', 'job')
-            location = parsed_query.get('location', 'Bangladesh')
+        Jobs go through the quality assurance layer (validation, deduplication,
+        enrichment) and only the jobs it approves are written. Expired web jobs are purged first, and cached database results
+        are dropped afterwards since the store has changed.
+        
+        Args:
+            batches: (rank, source_url, jobs) tuples from the web fallback
             
-            # Handle None values
-            if job_type is None:
-                job_type = 'job'
-            if location is None:
-                location = 'Bangladesh'
+        Returns:
+            Upsert counts (inserted, updated, rejected), or None if nothing was written
+        """
+        try:
+            fetched_at = datetime.now()
+            records = []
+            for _, source_url, jobs in batches:
+                for job in jobs:
+                    record = asdict(job) if is_dataclass(job) else dict(job)
+                    record['url'] = record.get('url') or source_url
+                    records.append(record)
             
-            search_queries = [
-                f"{job_type} jobs {location} site:linkedin.com OR site:indeed.com OR site:bdjobs.com OR site:skill.jobs",
-                f"{job_type} positions {location} site:glassdoor.com OR site:monster.com OR site:careerbuilder.com",
-                f"{job_type} vacancies {location} site:bdjobs.com OR site:skill.jobs OR site:shomvob.com",
-                f"{job_type} careers {location} site:linkedin.com OR site:indeed.com"
-            ]
+            approved = self.write_through_qa.process_jobs(records)
             
-            extracted_jobs = []
+            self.job_database.expire_jobs(fetched_at)
+            if not approved:
+                return None
+            jobs = [self._web_job_to_job_data(record, fetched_at) for record in approved]
+            if isinstance(self.job_database, DatasetCatalog):
+                if not self.web_jobs_dataset:
+                    return None
+                result = self.job_database.upsert_jobs(jobs, self.web_jobs_dataset)
+            else:
+                result = self.job_database.upsert_jobs(jobs)
             
-            for search_query in search_queries:
+            # Database results cached before the upsert would keep triggering the fallback
+            self.response_cache.invalidate_matching(lambda key: key[0] == "database")
+            logger.info(f"💾 Wrote {len(approved)} of {len(records)} web jobs through to the job database: {result}")
+            return result
+        except Exception as e:
+            logger.error(f"❌ Web job write-through failed: {e}")
+            return None
+
+    def _web_job_to_job_data(self, record: Dict[str, Any], fetched_at: datetime) -> JobData:
+        """Convert a QA-approved extracted job to a job database record with its provenance and expiry"""
+        url = record.get('url') or ''
+        # Several jobs may be extracted from one listing page, so the URL alone doesn't identify them
+        identity = f"{url}|{record.get('title', '')}|{record.get('company', '')}".casefold()
+        posted_date = record.get('posted_date')
+        return JobData(
+            title=record.get('title', ''),
+            company=record.get('company', ''),
+            location=record.get('location', ''),
+            description=record.get('summary', ''),
+            url=url,
+            salary=record.get('salary'),
+            experience_level=record.get('experience_level'),
+            skills=record.get('skills') or None,
+            posted_date=posted_date if JobDatabaseManager._parse_posted_date(posted_date) else None,
+            source="web_search",
+            source_site=urlparse(url).netloc.lower().removeprefix("www.") or "web",
+            job_posting_id=f"web-{hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]}",
+            job_employment_type=record.get('job_type'),
+            fetched_at=fetched_at.isoformat(timespec='seconds'),
+            expires_at=(fetched_at + timedelta(days=self.web_job_ttl_days)).isoformat(timespec='seconds')
+        )
+
+    def _get_html_with_playwright(self, url: str, deadline: Deadline = None) -> str:
+        """Get HTML content with JavaScript execution using the shared Playwright browser pool"""
+        try:
+            with span("playwright"):
+                html_content = self.browser_pool.fetch(url, timeout=(deadline or Deadline()).remaining(cap=60))
+            logger.info(f"✅ Playwright successfully fetched content from {url}")
+            return html_content
+        except Exception as e:
+            logger.error(f"❌ Playwright failed for {url}: {e}")
+            return ""
+
+    def _build_web_search_queries(self, parsed_query: dict) -> List[str]:
+        """SERP queries for the web fallback (broad queries across job sites)"""
+        job_type = parsed_query.get('job_type') or 'job'
+        location = parsed_query.get('location') or 'Bangladesh'
+        return [
+            f"{job_type} jobs {location} site:linkedin.com OR site:indeed.com OR site:bdjobs.com OR site:skill.jobs",
+            f"{job_type} positions {location} site:glassdoor.com OR site:monster.com OR site:careerbuilder.com",
+            f"{job_type} vacancies {location} site:bdjobs.com OR site:skill.jobs OR site:shomvob.com",
+            f"{job_type} careers {location} site:linkedin.com OR site:indeed.com"
+        ]
+
+    def _fetch_page(self, url: str, deadline: Deadline = None) -> str:
+        """Fetch a result page (Playwright for JavaScript-heavy job sites, requests otherwise)"""
+        deadline = deadline or Deadline()
+        if any(site in url.lower() for site in self.JAVASCRIPT_SITES):
+            logger.info(f"🤖 Using Playwright for JavaScript site: {url}")
+            return self._get_html_with_playwright(url, deadline)
+
+        logger.info(f"⚡ Using requests for simple site: {url}")
+        import requests
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        with span("http_get"):
+            response = requests.get(url, headers=headers, timeout=deadline.remaining(cap=10))
+        return response.text
+
+    def _extract_page(self, url: str, html_content: str, deadline: Deadline = None) -> List[Any]:
+        """Run LLM extraction on one fetched page"""
+        extraction_result = self.llm_pipeline.extract_jobs_from_html(
+            html_content=html_content,
+            source_url=url,
+            deadline=deadline
+        )
+        if extraction_result.errors:
+            logger.warning(f"   Errors for {url}: {extraction_result.errors}")
+
+        if extraction_result.success and extraction_result.jobs:
+            first_job = extraction_result.jobs[0]
+            logger.info(f"✅ Extracted {len(extraction_result.jobs)} jobs from {url} "
+                        f"({extraction_result.provider}, sample: {first_job.title} at {first_job.company})")
+            return extraction_result.jobs
+
+        logger.warning(f"⚠️ No jobs extracted from {url} (success={extraction_result.success})")
+        return []
+
+    def _iter_web_search_batches(self, parsed_query: dict,
+                                 deadline: Deadline = None) -> Iterator[Tuple[Tuple[int, int], str, List[Any]]]:
+        """
+        Start the web fallback pipeline and iterate each page's jobs as soon as they are extracted
+
+        The pipeline starts running when this is called, not on the first
+        iteration, so it can be started speculatively. All SERP queries are issued at once, their result URLs feed a bounded
+        queue drained by a pool of fetch workers, and fetched pages feed a
+        second bounded queue drained by a pool of extraction workers, so pages
+        are fetched while earlier ones are being extracted. Every stage gets
+        what is left of the deadline; when it expires the generator ends with
+        the batches delivered so far. Closing the iterator early, expiry or
+        cancelling the deadline stops the pipeline from starting further work.
+
+        Returns:
+            Iterator of (rank, url, jobs) per page with jobs, in completion order;
+            rank is (query index, result position) for restoring search-result order
+        """
+        search_queries = self._build_web_search_queries(parsed_query)
+        # Worker threads time their work under the span active when the pipeline starts
+        parent_span = current_span()
+        url_queue = queue.Queue(maxsize=self.web_pipeline_queue_size)
+        page_queue = queue.Queue(maxsize=self.web_pipeline_queue_size)
+        batch_queue = queue.Queue()
+        cancelled = threading.Event()
+        deadline = deadline or Deadline()
+
+        def stopped() -> bool:
+            return cancelled.is_set() or deadline.expired()
+
+        def fetch_worker():
+            while True:
+                item = url_queue.get()
+                if item is _PIPELINE_DONE:
+                    return
+                if stopped():
+                    continue
+                rank, url = item
                 try:
-                    logger.info(f"🔍 Searching: {search_query}")
-                    
-                    search_results = self.web_search_engine.search(
-                        query=search_query,
-                        num_results=10  # More results for broader search
-                    )
-                    
+                    with span("fetch", parent=parent_span, url=url):
+                        html_content = self._fetch_page(url, deadline)
+                except Exception as e:
+                    logger.error(f"❌ Fetch failed for {url}: {e}")
+                    continue
+                if not html_content:
+                    logger.warning(f"⚠️ No HTML content received from {url}")
+                    continue
+                logger.info(f"✅ Got HTML content: {len(html_content)} characters from {url}")
+                page_queue.put((rank, url, html_content))
+
+        def extract_worker():
+            while True:
+                item = page_queue.get()
+                if item is _PIPELINE_DONE:
+                    return
+                if stopped():
+                    continue
+                rank, url, html_content = item
+                try:
+                    with span("extract", parent=parent_span, url=url):
+                        jobs = self._extract_page(url, html_content, deadline)
+                except Exception as e:
+                    logger.error(f"❌ LLM extraction failed for {url}: {e}")
+                    continue
+                if jobs:
+                    batch_queue.put((rank, url, jobs))
+
+        def run_search(search_query: str, search_deadline: Deadline):
+            with span("serp", parent=parent_span, query=search_query):
+                return self.web_search_engine.search(query=search_query, num_results=10, deadline=search_deadline)
+
+        def run_pipeline():
+            # Layer 2: Enhanced LLM Pipeline, started first so it is ready for the first page
+            extract_pool = ThreadPoolExecutor(max_workers=self.web_extract_workers, thread_name_prefix="web-extract")
+            fetch_pool = ThreadPoolExecutor(max_workers=self.web_fetch_workers, thread_name_prefix="web-fetch")
+            extractors = [extract_pool.submit(extract_worker) for _ in range(self.web_extract_workers)]
+            fetchers = [fetch_pool.submit(fetch_worker) for _ in range(self.web_fetch_workers)]
+
+            # Layer 1: Advanced Web Search, one concurrent SERP query per search query
+            logger.info(f"🌐 Layer 1: Advanced Web Search with {len(search_queries)} concurrent queries...")
+            seen_urls = set()
+            # Leave time for fetching and extraction: slow engines are dropped after their share
+            search_deadline = deadline.stage(self.web_search_budget_share)
+            serp_pool = ThreadPoolExecutor(max_workers=len(search_queries), thread_name_prefix="web-serp")
+            try:
+                future_to_query = {
+                    serp_pool.submit(run_search, search_query, search_deadline): (index, search_query)
+                    for index, search_query in enumerate(search_queries)
+                }
+                # The engines return what they have at search_deadline; only the overall budget bounds this wait
+                for future in as_completed(future_to_query, timeout=deadline.remaining()):
+                    index, search_query = future_to_query[future]
+                    try:
+                        search_results = future.result()
+                    except Exception as e:
+                        logger.error(f"❌ Web search failed for '{search_query}': {e}")
+                        continue
                     if not search_results:
                         logger.warning(f"⚠️ No search results for: {search_query}")
                         continue
-                    
+
                     logger.info(f"📋 Found {len(search_results)} search results for: {search_query}")
-                    for i, result in enumerate(search_results[:3], 1):  # Show first 3 results
-                        logger.info(f"   {i}. {result.url}")
-                    
-                    # Layer 2: Enhanced LLM Pipeline for job extraction
-                    logger.info(f"🤖 Layer 2: Extracting jobs from search results...")
-                    
-                    for result in search_results:
-                        try:
-                            # Process URLs that look like job listings or are from known job sites
-                            job_keywords = ['job', 'career', 'position', 'vacancy', 'apply', 'opportunity']
-                            job_sites = ['linkedin.com', 'indeed.com', 'glassdoor.com', 'monster.com', 'careerbuilder.com', 'bdjobs.com', 'skill.jobs', 'shomvob.com']
-                            
-                            # Handle Bing redirect URLs by extracting the actual URL
-                            actual_url = result.url
-                            if 'bing.com/ck/a' in result.url:
-                                # Extract the actual URL from Bing redirect
-                                import urllib.parse
-                                try:
-                                    parsed = urllib.parse.urlparse(result.url)
-                                    query_params = urllib.parse.parse_qs(parsed.query)
-                                    if 'u' in query_params:
-                                        # The URL is base64 encoded, but let's try to decode it properly
-                                        encoded_url = query_params['u'][0]
-                                        try:
-                                            import base64
-                                            # Fix Bing's corrupted base64 URLs by removing 'a1' prefix
-                                            clean_encoded_url = encoded_url
-                                            if encoded_url.startswith('a1'):
-                                                clean_encoded_url = encoded_url[2:]  # Remove 'a1' prefix
-                                                logger.info(f"🔧 Removed 'a1' prefix from Bing URL: {encoded_url} -> {clean_encoded_url}")
-                                            
-                                            # Try different padding options for base64 decoding
-                                            decoded_url = None
-                                            for padding in ['', '=', '==', '===']:
-                                                try:
-                                                    decoded_url = base64.b64decode(clean_encoded_url + padding).decode('utf-8')
-                                                    actual_url = decoded_url
-                                                    logger.info(f"✅ Successfully decoded Bing redirect URL: {actual_url}")
-                                                    break
-                                                except Exception as decode_error:
-                                                    logger.debug(f"Base64 decode attempt with '{padding}' failed: {decode_error}")
-                                                    continue
-                                            
-                                            if not decoded_url:
-                                                # If base64 decoding fails completely, add https:// prefix to encoded URL
-                                                actual_url = f"https://{clean_encoded_url}" if not clean_encoded_url.startswith('http') else clean_encoded_url
-                                                logger.warning(f"⚠️ Base64 decode failed, using prefixed URL: {actual_url}")
-                                        except Exception as e:
-                                            logger.warning(f"⚠️ Failed to decode Bing redirect URL: {e}")
-                                            clean_encoded_url = encoded_url[2:] if encoded_url.startswith('a1') else encoded_url
-                                            actual_url = f"https://{clean_encoded_url}" if not clean_encoded_url.startswith('http') else clean_encoded_url
-                                except Exception as e:
-                                    logger.warning(f"⚠️ Failed to extract URL from Bing redirect: {e}")
-                            
-                            is_job_url = any(keyword in actual_url.lower() for keyword in job_keywords)
-                            is_job_site = any(site in actual_url.lower() for site in job_sites)
-                            
-                            # For web search results, be more lenient - process all URLs since they came from job-related searches
-                            should_process = is_job_url or is_job_site or True  # Process all web search results
-                            
-                            if should_process:
-                                logger.info(f"📄 Processing job URL: {result.url}")
-                                logger.info(f"   Job keywords match: {is_job_url}")
-                                logger.info(f"   Job site match: {is_job_site}")
-                                
-                                # Use Playwright for JavaScript-heavy sites, requests for simple sites
-                                javascript_sites = ['linkedin.com', 'indeed.com', 'glassdoor.com', 'monster.com', 'careerbuilder.com']
-                                is_javascript_site = any(site in result.url.lower() for site in javascript_sites)
-                                
-                                if is_javascript_site:
-                                    logger.info(f"🤖 Using Playwright for JavaScript site: {actual_url}")
-                                    html_content = self._get_html_with_playwright(actual_url)
-                                else:
-                                    logger.info(f"⚡ Using requests for simple site: {actual_url}")
-                                    import requests
-                                    headers = {
-                                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                                    }
-                                    response = requests.get(actual_url, headers=headers, timeout=10)
-                                    html_content = response.text
-                                
-                                # Debug: Check if we got HTML content
-                                if html_content:
-                                    logger.info(f"✅ Got HTML content: {len(html_content)} characters from {actual_url}")
-                                else:
-                                    logger.warning(f"⚠️ No HTML content received from {actual_url}")
-                                    continue
-                                
-                                extraction_result = self.llm_pipeline.extract_jobs_from_html(
-                                    html_content=html_content,
-                                    source_url=actual_url
-                                )
-                                
-                                # Debug: Check extraction results
-                                logger.info(f"🔍 LLM Extraction Results for {actual_url}:")
-                                logger.info(f"   Success: {extraction_result.success}")
-                                logger.info(f"   Jobs found: {len(extraction_result.jobs) if extraction_result.jobs else 0}")
-                                logger.info(f"   Provider: {extraction_result.provider}")
-                                logger.info(f"   Confidence: {extraction_result.confidence_score}")
-                                if extraction_result.errors:
-                                    logger.warning(f"   Errors: {extraction_result.errors}")
-                                
-                                if extraction_result.success and extraction_result.jobs:
-                                    extracted_jobs.extend(extraction_result.jobs)
-                                    logger.info(f"✅ Extracted {len(extraction_result.jobs)} jobs from {actual_url}")
-                                    # Debug: Show first job details
-                                    if extraction_result.jobs:
-                                        first_job = extraction_result.jobs[0]
-                                        logger.info(f"   Sample job: {first_job.title} at {first_job.company}")
-                                else:
-                                    logger.warning(f"⚠️ No jobs extracted from {actual_url}")
-                                    logger.warning(f"   Reason: Success={extraction_result.success}, Jobs={len(extraction_result.jobs) if extraction_result.jobs else 0}")
-                            else:
-                                logger.debug(f"⏭️ Skipping non-job URL: {result.url}")
-                                logger.debug(f"   Job keywords match: {is_job_url}")
-                                logger.debug(f"   Job site match: {is_job_site}")
-                        except Exception as e:
-                            logger.error(f"❌ LLM extraction failed for {actual_url}: {e}")
+                    for position, result in enumerate(search_results):
+                        url = resolve_bing_redirect(result.url)
+                        # Engines return the same page under different tracking parameters
+                        url_key = canonicalize_url(url) or url
+                        if url_key in seen_urls or stopped():
                             continue
-                            
-                except Exception as e:
-                    logger.error(f"❌ Web search failed for {site_filter}: {e}")
-                    continue
-            
+                        seen_urls.add(url_key)
+                        # Blocks while the fetchers are behind (bounded queue)
+                        url_queue.put(((index, position), url))
+            except TimeoutError:
+                logger.warning("⏰ Time budget used up while waiting for search results")
+            except Exception as e:
+                logger.error(f"❌ Web search stage failed: {e}")
+            finally:
+                serp_pool.shutdown(wait=False, cancel_futures=True)
+                for _ in fetchers:
+                    url_queue.put(_PIPELINE_DONE)
+                for future in fetchers:
+                    future.result()
+                for _ in extractors:
+                    page_queue.put(_PIPELINE_DONE)
+                for future in extractors:
+                    future.result()
+                fetch_pool.shutdown()
+                extract_pool.shutdown()
+                logger.info(f"✅ Web pipeline finished {len(seen_urls)} URLs")
+                batch_queue.put(_PIPELINE_DONE)
+
+        def drain():
+            try:
+                while True:
+                    try:
+                        batch = batch_queue.get(timeout=deadline.remaining())
+                    except queue.Empty:
+                        logger.warning("⏰ Time budget used up, returning the web results collected so far")
+                        return
+                    if batch is _PIPELINE_DONE:
+                        return
+                    yield batch
+            finally:
+                cancelled.set()
+
+        threading.Thread(target=run_pipeline, name="web-pipeline", daemon=True).start()
+        return drain()
+
+    def _search_with_4layer_system(self, parsed_query: dict, selected_sources: List[str],
+                                   deadline: Deadline = None) -> List[Dict]:
+        """
+        Execute search using the 4-layer system:
+        Layer 1: Advanced Web Search → Layer 2: Enhanced LLM → Layer 3: Source Router → Layer 4: Quality Assurance
+
+        Waits for the whole web pipeline and returns jobs in search-result order.
+        """
+        logger.info("🔧 Executing 4-layer system search...")
+
+        try:
+            batches = sorted(self._iter_web_search_batches(parsed_query, deadline), key=lambda batch: batch[0])
+            extracted_jobs = [job for _, _, jobs in batches for job in jobs]
             logger.info(f"✅ Layer 2 extracted {len(extracted_jobs)} jobs total")
             return extracted_jobs
-            
+
         except Exception as e:
             logger.error(f"❌ 4-layer system search failed: {e}")
             return []
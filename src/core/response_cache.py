@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+Bounded TTL cache for search responses with stale-while-revalidate refreshes
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+@dataclass
+class CacheEntry:
+    """A cached value and when it was stored"""
+    value: Any
+    stored_at: float
+    ttl: float
+
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+
+def normalize_text(text: str) -> str:
+    """Case- and whitespace-insensitive form of a raw query"""
+    return " ".join((text or "").casefold().split())
+
+
+class ResponseCache:
+    """
+    LRU cache whose entries are fresh for their TTL, then stale for `stale_ttl` more seconds
+
+    A stale entry is still returned, and `get_or_load` refreshes it in the
+    background (one refresh per key at a time), so repeated queries never
+    wait for a recomputation once they have been answered. Entries older than
+    ttl + stale_ttl are treated as missing. At most `max_entries` entries are
+    kept; the least recently used are evicted first.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 120.0, stale_ttl: float = 600.0,
+                 refresh_workers: int = 2):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_failures': 0, 'evictions': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """True if a fresh or stale entry exists (no LRU or statistics update)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.age() <= entry.ttl + self.stale_ttl
+
+    def get(self, key: Hashable) -> Tuple[Any, Optional[str]]:
+        """
+        Look up a key
+
+        Returns:
+            (value, FRESH or STALE), or (None, None) on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = entry.age()
+                if age <= entry.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry.value, FRESH
+                if age <= entry.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stats['stale_hits'] += 1
+                    return entry.value, STALE
+                del self._entries[key]
+            self.stats['misses'] += 1
+            return None, None
+
+    def put(self, key: Hashable, value: Any, ttl: float = None):
+        """Store a value, fresh for `ttl` seconds (the cache default when None)"""
+        with self._lock:
+            self._entries[key] = CacheEntry(value, time.monotonic(), self.ttl if ttl is None else ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def refresh(self, key: Hashable, loader: Callable[[], Any], ttl: float = None):
+        """Recompute a value in the background unless a refresh for the key is already running"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.put(key, loader(), ttl)
+                with self._lock:
+                    self.stats['refreshes'] += 1
+            except Exception as e:
+                with self._lock:
+                    self.stats['refresh_failures'] += 1
+                logger.warning(f"⚠️ Background refresh failed for {key!r}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_executor.submit(run)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: float = None) -> Tuple[Any, Optional[str]]:
+        """
+        Cached value for a key, loading it on a miss and refreshing it in the background when stale
+
+        Returns:
+            (value, FRESH, STALE or None when it was just loaded)
+        """
+        value, state = self.get(key)
+        if state == STALE:
+            self.refresh(key, loader, ttl)
+        if state is not None:
+            return value, state
+        value = loader()
+        self.put(key, value, ttl)
+        return value, None
+
+    def invalidate(self, key: Hashable = None):
+        """Drop one key, or everything"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every key the predicate accepts, returning how many were dropped"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['stale_hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_rate': (self.stats['hits'] + self.stats['stale_hits']) / lookups if lookups else 0.0
+            }
+
+
+# Test functionality
+if __name__ == "__main__":
+    print("🧪 Testing response cache...")
+    print("=" * 50)
+
+    calls = []
+
+    def slow_loader():
+        calls.append(time.time())
+        time.sleep(0.2)
+        return f"result #{len(calls)}"
+
+    cache = ResponseCache(max_entries=2, ttl=0.3, stale_ttl=1.0)
+    for step in range(6):
+        start_time = time.time()
+        value, state = cache.get_or_load(("jobs", normalize_text(["Python  developer", "python developer"][step % 2])), slow_loader)
+        print(f"t={step * 0.25:.2f}s: {value!r} ({state or 'loaded'}) in {(time.time() - start_time) * 1000:.0f}ms")
+        time.sleep(0.25)
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    print(f"Size bound: {len(cache)} entries (max {cache.max_entries})")
+    print(cache.get_stats())
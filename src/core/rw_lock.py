@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Read-Write Lock
+Many-readers / single-writer lock used to make the job database safe under threaded servers
+"""
+
+import functools
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class ReadWriteLock:
+    """
+    Writer-preferring reader-writer lock
+
+    Any number of threads may hold the read side; the write side is
+    exclusive. Waiting writers block new readers so ingest cannot starve.
+    Both sides are reentrant, and the writing thread may also take the read
+    side (nested calls into read-locked methods). Upgrading a held read lock
+    to a write lock is not supported and raises RuntimeError.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self):
+        """Hold the shared side for the duration of the block"""
+        depth = getattr(self._local, 'read_depth', 0)
+        if depth or self._writer == threading.get_ident():
+            self._local.read_depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.read_depth = depth
+            return
+
+        with self._cond:
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        self._local.read_depth = 1
+        try:
+            yield
+        finally:
+            self._local.read_depth = 0
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        """Hold the exclusive side for the duration of the block"""
+        me = threading.get_ident()
+        if self._writer == me:
+            yield
+            return
+        if getattr(self._local, 'read_depth', 0):
+            raise RuntimeError("Cannot upgrade a read lock to a write lock")
+
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = None
+                self._cond.notify_all()
+
+
+def read_locked(method):
+    """Run a method under the instance's `_rw_lock` read side"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._rw_lock.read():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def write_locked(method):
+    """Run a method under the instance's `_rw_lock` write side"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._rw_lock.write():
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Saved Search Percolator
+Matches newly ingested jobs against registered saved searches to produce job alerts
+"""
+
+import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Callable, Set
+
+try:
+    from .job_database_manager import JobDatabaseManager, JobData
+    from .tokenizer import Tokenizer, UnicodeTokenizer
+    from .location_gazetteer import LocationGazetteer, default_gazetteer
+except ImportError:
+    from job_database_manager import JobDatabaseManager, JobData
+    from tokenizer import Tokenizer, UnicodeTokenizer
+    from location_gazetteer import LocationGazetteer, default_gazetteer
+
+logger = logging.getLogger(__name__)
+
+# Bucket for saved searches without required terms (filter-only searches)
+MATCH_ALL_KEY = "*"
+
+
+@dataclass
+class SavedSearch:
+    """A user's saved search, with the same arguments as JobDatabaseManager.search_jobs"""
+    user_id: str
+    query: str = ""
+    location: Optional[str] = None
+    experience_level: Optional[str] = None
+    remote: bool = False
+    has_salary: bool = False
+    search_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+
+class SavedSearchPercolator:
+    """
+    Reverse index over saved searches
+
+    Instead of re-running every saved search against the corpus after an
+    ingest, each saved search is indexed under the terms a job must contain
+    to match it (title words and related terms, skills, company). A new job
+    looks up its own terms, and only the candidate searches found there are
+    checked against the remaining filters. Matching follows search_jobs
+    semantics, so an alert fires for exactly the jobs the search would return.
+    """
+
+    def __init__(self, notify: Callable[[SavedSearch, List[JobData]], None] = None,
+                 tokenizer: Tokenizer = None, gazetteer: LocationGazetteer = None,
+                 max_alerted_per_search: int = 1000):
+        self.searches: Dict[str, SavedSearch] = {}
+        self.index: Dict[str, Set[str]] = defaultdict(set)
+        self.pending_alerts: Dict[str, List[JobData]] = defaultdict(list)
+        self.notify = notify
+        # Must match the job database's tokenizer so alerts agree with search results
+        self.tokenizer = tokenizer or UnicodeTokenizer()
+        self.gazetteer = gazetteer or default_gazetteer()
+        # Keys of the most recently alerted jobs per search (oldest first), so a job
+        # ingested again doesn't re-notify; bounded so long-lived searches don't grow forever
+        self.max_alerted_per_search = max_alerted_per_search
+        self._alerted: Dict[str, "OrderedDict[str, None]"] = defaultdict(OrderedDict)
+        # Registrations from API threads may race with percolation from ingest
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.searches)
+
+    def _search_keys(self, search: SavedSearch) -> Set[str]:
+        """Index keys of a saved search: any one of them appearing in a job can satisfy its text predicate"""
+        if not search.query:
+            # Like search_jobs, a search without any criteria matches nothing
+            has_filters = search.location or search.experience_level or search.remote or search.has_salary
+            return {MATCH_ALL_KEY} if has_filters else set()
+
+        keys = set()
+        for word in self.tokenizer.tokenize(search.query):
+            keys.add(f"title:{word}")
+            keys.update(f"title:{term}" for term in JobDatabaseManager._get_related_terms(word))
+            keys.add(f"skill:{word}")
+            keys.add(f"company:{word}")
+        return keys
+
+    def _job_keys(self, job: JobData) -> Set[str]:
+        """Index keys a job carries (mirrors the title/skills/companies search index)"""
+        keys = {MATCH_ALL_KEY}
+        if job.title and isinstance(job.title, str):
+            keys.update(f"title:{word}" for word in self.tokenizer.tokenize(job.title))
+        if job.skills and isinstance(job.skills, list):
+            keys.update(f"skill:{skill.lower()}" for skill in job.skills if isinstance(skill, str))
+        if job.company and isinstance(job.company, str):
+            keys.add(f"company:{job.company.lower()}")
+        return keys
+
+    def _matches_filters(self, search: SavedSearch, job: JobData) -> bool:
+        """Check the non-text predicates and the role filter of a saved search"""
+        if search.location:
+            if not self.gazetteer.matches(search.location, job.location):
+                return False
+        if search.experience_level:
+            if not isinstance(job.experience_level, str) or \
+                    search.experience_level.lower() not in job.experience_level.lower():
+                return False
+        if search.remote and not JobDatabaseManager._is_remote_job(job):
+            return False
+        if search.has_salary and not job.salary:
+            return False
+        if search.query:
+            role_terms = JobDatabaseManager._get_role_filter_terms(search.query.lower())
+            title = job.title.lower() if isinstance(job.title, str) else ''
+            if role_terms and not any(term in title for term in role_terms):
+                return False
+        return True
+
+    def register(self, search: SavedSearch) -> SavedSearch:
+        """Add (or replace) a saved search"""
+        with self.lock:
+            if search.search_id in self.searches:
+                self.unregister(search.search_id)
+            self.searches[search.search_id] = search
+            for key in self._search_keys(search):
+                self.index[key].add(search.search_id)
+            logger.info(f"Registered saved search {search.search_id} for user {search.user_id}: '{search.query}'")
+            return search
+
+    def unregister(self, search_id: str) -> bool:
+        """Remove a saved search and its pending alerts"""
+        with self.lock:
+            search = self.searches.pop(search_id, None)
+            if search is None:
+                return False
+            for key in self._search_keys(search):
+                ids = self.index.get(key)
+                if ids is not None:
+                    ids.discard(search_id)
+                    if not ids:
+                        del self.index[key]
+            self.pending_alerts.pop(search_id, None)
+            self._alerted.pop(search_id, None)
+            return True
+
+    def get_user_searches(self, user_id: str) -> List[SavedSearch]:
+        """Saved searches registered by a user"""
+        with self.lock:
+            return [search for search in self.searches.values() if search.user_id == user_id]
+
+    def percolate(self, jobs: List[JobData]) -> Dict[str, List[JobData]]:
+        """
+        Match a batch of new or updated jobs against the saved searches
+
+        Args:
+            jobs: Newly ingested jobs
+
+        Returns:
+            Mapping of search_id to the jobs that newly match it
+        """
+        matches: Dict[str, List[JobData]] = defaultdict(list)
+        with self.lock:
+            for job in jobs:
+                candidates = set()
+                for key in self._job_keys(job):
+                    candidates.update(self.index.get(key, ()))
+
+                job_key = JobDatabaseManager._job_key(job)
+                for search_id in candidates:
+                    if job_key and job_key in self._alerted[search_id]:
+                        continue
+                    if self._matches_filters(self.searches[search_id], job):
+                        if job_key:
+                            alerted = self._alerted[search_id]
+                            alerted[job_key] = None
+                            if len(alerted) > self.max_alerted_per_search:
+                                alerted.popitem(last=False)
+                        matches[search_id].append(job)
+
+            for search_id, matched in matches.items():
+                self.pending_alerts[search_id].extend(matched)
+            notifications = [(self.searches[search_id], matched) for search_id, matched in matches.items()]
+
+        if self.notify:
+            for search, matched in notifications:
+                try:
+                    self.notify(search, matched)
+                except Exception as e:
+                    logger.error(f"❌ Alert notification failed for {search.search_id}: {e}")
+
+        if matches:
+            logger.info(f"🔔 {sum(len(m) for m in matches.values())} alerts for {len(matches)} saved searches")
+        return dict(matches)
+
+    def pop_alerts(self, user_id: str) -> Dict[str, List[JobData]]:
+        """Return and clear the pending alerts for a user's saved searches"""
+        with self.lock:
+            alerts = {}
+            for search in self.get_user_searches(user_id):
+                jobs = self.pending_alerts.pop(search.search_id, None)
+                if jobs:
+                    alerts[search.search_id] = jobs
+            return alerts
+
+    def save(self, path: str):
+        """Persist the saved searches (alerts are transient)"""
+        with self.lock:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump([asdict(search) for search in self.searches.values()], f, indent=2, ensure_ascii=False)
+
+    def load(self, path: str):
+        """Register saved searches from a file written by save()"""
+        path = Path(path)
+        if not path.exists():
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for data in json.load(f):
+                self.register(SavedSearch(**data))
+        logger.info(f"Loaded {len(self.searches)} saved searches from {path}")
+
+
+# Test functionality
+if __name__ == "__main__":
+    import time
+
+    print("🧪 Benchmarking saved-search percolation...")
+    print("=" * 50)
+
+    roles = ["python developer", "data analyst", "software engineer", "ui designer", "marketing manager",
+             "accountant", "devops engineer", "machine learning", "sales executive", "hr officer"]
+    cities = [None, "Dhaka", "Chittagong", "Sylhet"]
+    percolator = SavedSearchPercolator()
+    for i in range(10000):
+        percolator.register(SavedSearch(user_id=f"user{i % 500}", query=roles[i % len(roles)],
+                                        location=cities[i % len(cities)], remote=(i % 7 == 0)))
+
+    batch = [JobData(title=f"Senior {roles[i % len(roles)].title()}", company=f"Company {i}",
+                     location=f"{cities[1 + i % 3]}, Bangladesh", description="",
+                     url=f"https://example.com/jobs/{i}", job_posting_id=str(i))
+             for i in range(1000)]
+
+    start_time = time.time()
+    results = percolator.percolate(batch)
+    elapsed = time.time() - start_time
+    print(f"{len(percolator)} saved searches x {len(batch)} jobs: "
+          f"{sum(len(m) for m in results.values())} alerts in {elapsed * 1000:.1f}ms")
+
+    start_time = time.time()
+    repeat = percolator.percolate(batch[:100])
+    alerted = max(len(keys) for keys in percolator._alerted.values())
+    print(f"100 of the jobs again: {sum(len(m) for m in repeat.values())} alerts in "
+          f"{(time.time() - start_time) * 1000:.1f}ms; largest alerted set {alerted} "
+          f"(cap {percolator.max_alerted_per_search})")
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Semantic Index
+Offline LSA (TF-IDF + truncated SVD) embeddings for job titles and descriptions
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .tokenizer import Tokenizer, UnicodeTokenizer
+except ImportError:
+    from tokenizer import Tokenizer, UnicodeTokenizer
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticIndex:
+    """CPU-only embedding index with memory-mappable float32 job vectors"""
+
+    VECTORS_FILE = "semantic_vectors.npy"
+    MODEL_FILE = "semantic_model.npz"
+    META_FILE = "semantic_meta.json"
+
+    def __init__(self, dimensions: int = 128, max_features: int = 50000,
+                 min_df: int = 2, power_iterations: int = 2, seed: int = 42, tokenizer: Tokenizer = None):
+        self.dimensions = dimensions
+        self.max_features = max_features
+        self.min_df = min_df
+        self.power_iterations = power_iterations
+        self.seed = seed
+        # Same tokenization as the keyword index, so non-Latin scripts get usable terms
+        self.tokenizer = tokenizer or UnicodeTokenizer()
+        self.vocabulary: Dict[str, int] = {}
+        self.idf: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None  # (vocab, dims)
+        self.vectors: Optional[np.ndarray] = None     # (jobs, dims), L2-normalized
+        self.fingerprint: Optional[str] = None
+
+    def _tokenize(self, text: str, cache: bool = False) -> List[str]:
+        """Split text into vocabulary terms (job texts bypass the tokenizer cache; queries may use it)"""
+        return self.tokenizer.tokenize(text, cache=cache)
+
+    def build(self, texts: List[str], fingerprint: str = None) -> 'SemanticIndex':
+        """
+        Fit TF-IDF + truncated SVD on the given texts and embed them
+
+        Args:
+            texts: One text per job, in jobs_cache order
+            fingerprint: Identifier of the dataset the vectors belong to
+
+        Returns:
+            self
+        """
+        tokenized = [self._tokenize(text) for text in texts]
+        self._fit_vocabulary(tokenized)
+        indptr, indices, data = self._tfidf_matrix(tokenized)
+
+        n_docs, n_terms = len(tokenized), len(self.vocabulary)
+        dims = max(1, min(self.dimensions, n_docs - 1, n_terms - 1))
+        self.components = self._randomized_svd(indptr, indices, data, n_terms, dims)
+
+        vectors = self._sparse_dot(indptr, indices, data, self.components)
+        self.vectors = self._normalize_rows(vectors)
+        self.fingerprint = fingerprint
+
+        logger.info(f"✅ Built semantic index: {n_docs} jobs, {n_terms} terms, {dims} dimensions")
+        return self
+
+    def _fit_vocabulary(self, tokenized: List[List[str]]):
+        """Select terms by document frequency and compute smooth IDF weights"""
+        doc_freq: Dict[str, int] = {}
+        for tokens in tokenized:
+            for token in set(tokens):
+                doc_freq[token] = doc_freq.get(token, 0) + 1
+
+        terms = [term for term, df in doc_freq.items() if df >= self.min_df] or list(doc_freq)
+        terms.sort(key=lambda term: (-doc_freq[term], term))
+        terms = terms[:self.max_features]
+
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        df = np.array([doc_freq[term] for term in terms], dtype=np.float32)
+        n_docs = len(tokenized)
+        self.idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+
+    def _tfidf_row(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Sublinear TF-IDF weights for one document as (term ids, weights)"""
+        counts: Dict[int, int] = {}
+        for token in tokens:
+            term_id = self.vocabulary.get(token)
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+        if not counts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        term_ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        weights = (1 + np.log(tf)) * self.idf[term_ids]
+        weights /= np.linalg.norm(weights)
+        return term_ids, weights
+
+    def _tfidf_matrix(self, tokenized: List[List[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Build the TF-IDF document-term matrix in CSR form"""
+        indptr = [0]
+        all_indices, all_data = [], []
+        for tokens in tokenized:
+            term_ids, weights = self._tfidf_row(tokens)
+            all_indices.append(term_ids)
+            all_data.append(weights)
+            indptr.append(indptr[-1] + len(term_ids))
+
+        indices = np.concatenate(all_indices) if all_indices else np.empty(0, dtype=np.int64)
+        data = np.concatenate(all_data) if all_data else np.empty(0, dtype=np.float32)
+        return np.array(indptr, dtype=np.int64), indices, data
+
+    def _sparse_dot(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                    dense: np.ndarray, block_rows: int = 20000) -> np.ndarray:
+        """Multiply a CSR matrix by a dense matrix, in row blocks to bound memory"""
+        n_rows = len(indptr) - 1
+        out = np.zeros((n_rows, dense.shape[1]), dtype=np.float32)
+        for start in range(0, n_rows, block_rows):
+            stop = min(start + block_rows, n_rows)
+            lo, hi = indptr[start], indptr[stop]
+            if lo == hi:
+                continue
+            products = data[lo:hi, None] * dense[indices[lo:hi]]
+            row_lengths = np.diff(indptr[start:stop + 1])
+            non_empty = row_lengths > 0
+            offsets = (indptr[start:stop] - lo)[non_empty]
+            out[start:stop][non_empty] = np.add.reduceat(products, offsets, axis=0)
+        return out
+
+    def _transpose(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                   n_cols: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Transpose a CSR matrix (CSR -> CSR of the transpose)"""
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        order = np.argsort(indices, kind='stable')
+        t_indptr = np.zeros(n_cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=n_cols), out=t_indptr[1:])
+        return t_indptr, rows[order], data[order]
+
+    def _randomized_svd(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                        n_terms: int, dims: int) -> np.ndarray:
+        """Randomized truncated SVD returning the top right singular vectors (terms x dims)"""
+        rng = np.random.default_rng(self.seed)
+        t_indptr, t_indices, t_data = self._transpose(indptr, indices, data, n_terms)
+        n_components = min(dims + 10, n_terms)
+
+        omega = rng.standard_normal((n_terms, n_components)).astype(np.float32)
+        sample = self._sparse_dot(indptr, indices, data, omega)
+        for _ in range(self.power_iterations):
+            sample, _ = np.linalg.qr(sample)
+            sample = self._sparse_dot(t_indptr, t_indices, t_data, sample)
+            sample, _ = np.linalg.qr(sample)
+            sample = self._sparse_dot(indptr, indices, data, sample)
+        basis, _ = np.linalg.qr(sample)
+
+        projected = self._sparse_dot(t_indptr, t_indices, t_data, basis).T  # (k, terms)
+        _, _, vt = np.linalg.svd(projected, full_matrices=False)
+        return np.ascontiguousarray(vt[:dims].T, dtype=np.float32)
+
+    def _normalize_rows(self, matrix: np.ndarray) -> np.ndarray:
+        """L2-normalize rows, leaving all-zero rows untouched"""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32)
+
+    def encode(self, text: str, cache: bool = True) -> np.ndarray:
+        """Embed a query (or, with cache=False, a job text) into the LSA space as a normalized float32 vector"""
+        term_ids, weights = self._tfidf_row(self._tokenize(text, cache=cache))
+        vector = weights @ self.components[term_ids] if len(term_ids) else \
+            np.zeros(self.components.shape[1], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return (vector / norm).astype(np.float32) if norm > 0 else vector.astype(np.float32)
+
+    def add_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed new jobs with the existing model and append them to the vectors
+
+        The vocabulary and SVD basis stay fixed (LSA fold-in); terms unseen at
+        build time are ignored until the next offline rebuild.
+
+        Returns:
+            The appended vectors
+        """
+        new_vectors = np.array([self.encode(text, cache=False) for text in texts], dtype=np.float32) \
+            .reshape(len(texts), self.components.shape[1])
+        self.vectors = np.concatenate([np.asarray(self.vectors), new_vectors])
+        return new_vectors
+
+    def scores(self, query: str) -> np.ndarray:
+        """Cosine similarity of the query against every job vector"""
+        return self.vectors @ self.encode(query)
+
+    def search(self, query: str, k: int = 20) -> List[Tuple[int, float]]:
+        """
+        Find the k jobs most similar to the query
+
+        Args:
+            query: Free-text query
+            k: Number of results
+
+        Returns:
+            List of (job index, cosine similarity) tuples, best first
+        """
+        if self.vectors is None or len(self.vectors) == 0:
+            return []
+        return self.top_k(self.scores(query), k)
+
+    def top_k(self, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Select the k highest scores with argpartition, then sort only those"""
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def save(self, directory: str):
+        """Persist the model and vectors (vectors as .npy so they can be memory-mapped)"""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / self.VECTORS_FILE, self.vectors)
+        np.savez(path / self.MODEL_FILE, idf=self.idf, components=self.components)
+        with open(path / self.META_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'vocabulary': self.vocabulary,
+                'dimensions': int(self.components.shape[1]),
+                'fingerprint': self.fingerprint
+            }, f, ensure_ascii=False)
+        logger.info(f"Saved semantic index to {path}")
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True, tokenizer: Tokenizer = None) -> Optional['SemanticIndex']:
+        """
+        Load a saved index, memory-mapping the job vectors (None if not found)
+
+        The tokenizer must be the one the index was built with; callers check
+        this through the fingerprint they built it under.
+        """
+        path = Path(directory)
+        if not (path / cls.VECTORS_FILE).exists() or not (path / cls.META_FILE).exists():
+            return None
+
+        with open(path / cls.META_FILE, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        model = np.load(path / cls.MODEL_FILE)
+
+        index = cls(dimensions=meta['dimensions'], tokenizer=tokenizer)
+        index.vocabulary = meta['vocabulary']
+        index.fingerprint = meta.get('fingerprint')
+        index.idf = model['idf']
+        index.components = model['components']
+        index.vectors = np.load(path / cls.VECTORS_FILE, mmap_mode='r' if mmap else None)
+        return index
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Sharded Job Database
+Hash-partitions the job dataset across worker processes with scatter-gather search
+"""
+
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Tuple
+
+try:
+    from .job_database_manager import JobDatabaseManager, JobData
+except ImportError:
+    from job_database_manager import JobDatabaseManager, JobData
+
+logger = logging.getLogger(__name__)
+
+
+def _shard_worker(shard_id: int, num_shards: int, csv_path: str, snapshot_dir: str,
+                  memory_limit_mb: Optional[float], spam_keywords: Optional[List[str]],
+                  request_queue, response_queue):
+    """Worker process: owns one shard and serves method calls from the coordinator"""
+    try:
+        manager = JobDatabaseManager(csv_path, snapshot_dir=snapshot_dir, shard=(shard_id, num_shards),
+                                     memory_limit_mb=memory_limit_mb, spam_keywords=spam_keywords)
+        response_queue.put((('ready', shard_id), True, len(manager.jobs_cache)))
+    except Exception as e:
+        response_queue.put((('ready', shard_id), False, str(e)))
+        return
+
+    while True:
+        request = request_queue.get()
+        if request is None:
+            break
+        request_id, method, args, kwargs = request
+        try:
+            result = getattr(manager, method)(*args, **kwargs)
+            response_queue.put((request_id, True, result))
+        except Exception as e:
+            response_queue.put((request_id, False, f"{type(e).__name__}: {e}"))
+
+
+class ShardedJobDatabaseManager:
+    """
+    Coordinator exposing the JobDatabaseManager API over N shard processes
+
+    Each worker process loads the dataset and keeps only the rows that hash
+    to its shard, with its own search, semantic and ANN indexes. Queries fan
+    out to every shard and per-shard top-k results are merged by date or score.
+    Calls fail with TimeoutError after `request_timeout` seconds, and with
+    RuntimeError as soon as the shard's worker process is found dead.
+    """
+
+    # Seconds between liveness checks of the workers while no responses arrive
+    LIVENESS_INTERVAL = 1.0
+
+    def __init__(self, csv_path: str = "Linkedin job listings information.csv",
+                 num_shards: int = None, snapshot_dir: str = None, startup_timeout: float = 600.0,
+                 memory_limit_mb: float = None, spam_keywords: List[str] = None,
+                 request_timeout: float = 120.0):
+        self.csv_path = csv_path
+        self.num_shards = num_shards or os.cpu_count() or 1
+        self.startup_timeout = startup_timeout
+        self.request_timeout = request_timeout
+        # The memory limit is split evenly between the shard processes
+        shard_memory_limit = memory_limit_mb / self.num_shards if memory_limit_mb else None
+        self.logger = logging.getLogger(__name__)
+
+        csv_file = Path(csv_path)
+        base_snapshot = Path(snapshot_dir) if snapshot_dir else csv_file.parent / f"{csv_file.stem}_snapshot"
+
+        # Spawn avoids forking a parent that may already run server threads
+        context = multiprocessing.get_context('spawn')
+        self._response_queue = context.Queue()
+        self._request_queues = []
+        self._workers = []
+        # request_id -> (shard_id, future) of the calls awaiting a response
+        self._pending: Dict[Any, Tuple[int, Future]] = {}
+        self._pending_lock = threading.Lock()
+        self._dead_shards: Dict[int, str] = {}
+        self._request_ids = itertools.count()
+        self._closed = False
+        # Optional SavedSearchPercolator notified of the newly inserted jobs of every upsert
+        self.percolator = None
+
+        ready = {('ready', shard_id): Future() for shard_id in range(self.num_shards)}
+        self._pending.update({request_id: (request_id[1], future) for request_id, future in ready.items()})
+        self._dispatcher = threading.Thread(target=self._dispatch_responses, daemon=True)
+        self._dispatcher.start()
+
+        self.logger.info(f"🚀 Starting {self.num_shards} job database shards...")
+        for shard_id in range(self.num_shards):
+            request_queue = context.Queue()
+            shard_snapshot = base_snapshot / f"shard_{shard_id}_of_{self.num_shards}"
+            worker = context.Process(
+                target=_shard_worker,
+                args=(shard_id, self.num_shards, csv_path, str(shard_snapshot), shard_memory_limit,
+                      spam_keywords, request_queue, self._response_queue),
+                daemon=True
+            )
+            worker.start()
+            self._request_queues.append(request_queue)
+            self._workers.append(worker)
+
+        try:
+            self.shard_sizes = [future.result(timeout=startup_timeout) for future in ready.values()]
+        except Exception:
+            self.close()
+            raise
+        self.logger.info(f"✅ Sharded job database ready: {sum(self.shard_sizes)} jobs in {self.shard_sizes}")
+
+    def _dispatch_responses(self):
+        """Route worker responses to the futures waiting for them, failing those of dead workers"""
+        next_check = time.monotonic() + self.LIVENESS_INTERVAL
+        while True:
+            if time.monotonic() >= next_check:
+                # Also while other shards keep answering, so a dead one is noticed under load
+                self._check_workers()
+                next_check = time.monotonic() + self.LIVENESS_INTERVAL
+            try:
+                message = self._response_queue.get(timeout=self.LIVENESS_INTERVAL)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError) as e:
+                self._fail_pending(lambda shard_id: True, f"Shard response queue failed: {e}")
+                break
+            if message is None:
+                break
+            request_id, ok, payload = message
+            with self._pending_lock:
+                pending = self._pending.pop(request_id, None)
+            if pending is None:
+                continue
+            _, future = pending
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+
+    def _check_workers(self):
+        """Mark shards whose worker process exited and fail their pending calls"""
+        if self._closed:
+            return
+        for shard_id, worker in enumerate(self._workers):
+            if shard_id not in self._dead_shards and not worker.is_alive():
+                reason = f"Shard {shard_id} worker exited with code {worker.exitcode}"
+                self.logger.error(f"❌ {reason}")
+                self._dead_shards[shard_id] = reason
+                self._fail_pending(lambda pending_shard: pending_shard == shard_id, reason)
+
+    def _fail_pending(self, matches, reason: str):
+        """Fail the pending calls of the shards `matches` accepts"""
+        with self._pending_lock:
+            failed = [request_id for request_id, (shard_id, _) in self._pending.items() if matches(shard_id)]
+            futures = [self._pending.pop(request_id)[1] for request_id in failed]
+        for future in futures:
+            future.set_exception(RuntimeError(reason))
+
+    def _submit(self, shard_id: int, method: str, *args, **kwargs) -> Future:
+        """Send a method call to one shard"""
+        if self._closed:
+            raise RuntimeError("Sharded job database is closed")
+        if shard_id in self._dead_shards:
+            raise RuntimeError(self._dead_shards[shard_id])
+        request_id = next(self._request_ids)
+        future = Future()
+        with self._pending_lock:
+            self._pending[request_id] = (shard_id, future)
+        self._request_queues[shard_id].put((request_id, method, args, kwargs))
+        return future
+
+    def _result(self, future: Future, timeout: float = None) -> Any:
+        """
+        Wait for a shard call (request_timeout by default)
+
+        Raises:
+            TimeoutError: If the shard did not answer in time (the call is forgotten)
+            RuntimeError: If the call failed or the shard's worker died
+        """
+        try:
+            return future.result(timeout=timeout or self.request_timeout)
+        except TimeoutError:
+            with self._pending_lock:
+                for request_id, (_, pending) in list(self._pending.items()):
+                    if pending is future:
+                        del self._pending[request_id]
+            raise
+
+    def _scatter(self, method: str, *args, **kwargs) -> List[Any]:
+        """Call a method on every shard in parallel and gather the results in shard order"""
+        futures = [self._submit(shard_id, method, *args, **kwargs) for shard_id in range(self.num_shards)]
+        return [self._result(future) for future in futures]
+
+    def _merge_by_date(self, shard_results: List[List[JobData]], limit: int) -> List[JobData]:
+        """Merge per-shard lists that are already sorted newest first"""
+        def date_key(job):
+            return JobDatabaseManager._parse_posted_date(job.posted_date) or datetime.min
+        return list(itertools.islice(heapq.merge(*shard_results, key=date_key, reverse=True), limit))
+
+    def _merge_by_score(self, shard_hits: List[List[Tuple[JobData, float]]], k: int) -> List[JobData]:
+        """Merge per-shard (job, score) lists into the global top-k"""
+        best = heapq.nlargest(k, itertools.chain.from_iterable(shard_hits), key=lambda hit: hit[1])
+        return [job for job, _ in best]
+
+    def search_jobs(self, query: str, location: str = None,
+                    experience_level: str = None, limit: int = 20,
+                    sort_by_date: bool = True, remote: bool = False,
+                    has_salary: bool = False) -> List[JobData]:
+        """Search all shards and merge their top results (see JobDatabaseManager.search_jobs)"""
+        shard_results = self._scatter('search_jobs', query, location=location,
+                                      experience_level=experience_level, limit=limit,
+                                      sort_by_date=sort_by_date, remote=remote, has_salary=has_salary)
+        if sort_by_date:
+            return self._merge_by_date(shard_results, limit)
+        return list(itertools.chain.from_iterable(shard_results))[:limit]
+
+    def filter_jobs(self, filters: Dict[str, Any], limit: int = 20,
+                    sort_by_date: bool = True) -> List[JobData]:
+        """Filter all shards and merge their results (see JobDatabaseManager.filter_jobs)"""
+        shard_results = self._scatter('filter_jobs', filters, limit=limit, sort_by_date=sort_by_date)
+        if sort_by_date:
+            return self._merge_by_date(shard_results, limit)
+        return list(itertools.chain.from_iterable(shard_results))[:limit]
+
+    def estimate_hits(self, query: str, location: str = None,
+                      experience_level: str = None, remote: bool = False,
+                      has_salary: bool = False) -> float:
+        """Sum of the per-shard hit estimates (see JobDatabaseManager.estimate_hits)"""
+        return sum(self._scatter('estimate_hits', query, location=location, experience_level=experience_level,
+                                 remote=remote, has_salary=has_salary))
+
+    def semantic_search(self, query: str, k: int = 20) -> List[JobData]:
+        """Semantic search across shards, merged by cosine similarity"""
+        return self._merge_by_score(self._scatter('_semantic_hits', query, k), k)
+
+    def hybrid_search(self, query: str, k: int = 20, semantic_weight: float = 0.6) -> List[JobData]:
+        """Hybrid search across shards, merged by fused score"""
+        return self._merge_by_score(self._scatter('_hybrid_hits', query, k, semantic_weight), k)
+
+    def get_job_by_id(self, job_id: str) -> Optional[JobData]:
+        """Look up a job on the shard that owns its posting ID"""
+        normalized = JobDatabaseManager._normalize_job_id(job_id)
+        if not normalized:
+            return None
+        shard_id = JobDatabaseManager.shard_for_key(normalized, self.num_shards)
+        return self._result(self._submit(shard_id, 'get_job_by_id', normalized))
+
+    def similar_jobs(self, job_id: str, k: int = 10) -> List[JobData]:
+        """
+        Find jobs similar to a given job across all shards
+
+        Shards have independent embedding spaces, so the reference job's text
+        (not its vector) is used as the query on every shard.
+        """
+        job = self.get_job_by_id(job_id)
+        if job is None:
+            return []
+        normalized = JobDatabaseManager._normalize_job_id(job_id)
+        text = f"{job.title} {job.title} {job.description or ''}"
+        hits = self._scatter('_semantic_hits', text, k + 1)
+        merged = self._merge_by_score(hits, k + 1)
+        return [other for other in merged
+                if JobDatabaseManager._normalize_job_id(other.job_posting_id) != normalized][:k]
+
+    def upsert_jobs(self, jobs: List[JobData]) -> Dict[str, int]:
+        """Route each job to the shard that owns its key and upsert it there"""
+        batches: Dict[int, List[JobData]] = {}
+        for job in jobs:
+            shard_id = JobDatabaseManager.shard_for_key(JobDatabaseManager._job_key(job), self.num_shards)
+            batches.setdefault(shard_id, []).append(job)
+
+        futures = {shard_id: self._submit(shard_id, '_upsert_jobs', batch) for shard_id, batch in batches.items()}
+        result = {'inserted': 0, 'updated': 0, 'rejected': 0}
+        inserted = []
+        for shard_id, future in futures.items():
+            counts, positions = self._result(future)
+            for key, count in counts.items():
+                result[key] += count
+            inserted.extend(batches[shard_id][i] for i in positions)
+
+        # Only new postings alert; updates of stored jobs alerted when first inserted
+        if self.percolator is not None:
+            self.percolator.percolate(inserted)
+        return result
+
+    def expire_jobs(self, now: datetime = None) -> int:
+        """Remove expired jobs from every shard (see JobDatabaseManager.expire_jobs)"""
+        return sum(self._scatter('expire_jobs', now))
+
+    def get_jobs_by_company(self, company_name: str, limit: int = 20) -> List[JobData]:
+        """Get jobs from a specific company across shards"""
+        shard_results = self._scatter('get_jobs_by_company', company_name, limit=limit)
+        return list(itertools.chain.from_iterable(shard_results))[:limit]
+
+    def get_recent_jobs(self, limit: int = 20, days: int = 30) -> List[JobData]:
+        """Get the most recent jobs across shards"""
+        return self._merge_by_date(self._scatter('get_recent_jobs', limit=limit, days=days), limit)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Combine per-shard statistics"""
+        shard_stats = [stats for stats in self._scatter('get_statistics') if stats]
+        if not shard_stats:
+            return {}
+
+        companies = set().union(*self._scatter('_distinct_values', 'company'))
+        locations = set().union(*self._scatter('_distinct_values', 'location'))
+        memory_limits = [s['memory']['memory_limit_bytes'] for s in shard_stats]
+        stats = {
+            'total_jobs': sum(s['total_jobs'] for s in shard_stats),
+            'unique_companies': len(companies),
+            'unique_locations': len(locations),
+            'shards': self.num_shards,
+            'jobs_per_shard': self.shard_sizes,
+            'memory': {
+                'resident_bytes': sum(s['memory']['resident_bytes'] for s in shard_stats),
+                'memory_limit_bytes': sum(memory_limits) if all(memory_limits) else None,
+                'cold_columns_spilled': [s['memory']['cold_columns_spilled'] for s in shard_stats]
+            }
+        }
+        for key in ('experience_levels', 'employment_types', 'countries', 'industries', 'rejections'):
+            counts = {}
+            for s in shard_stats:
+                for value, count in s.get(key, {}).items():
+                    counts[value] = counts.get(value, 0) + count
+            stats[key] = counts
+        return stats
+
+    def export_to_json(self, jobs: List[JobData], filename: str = "exported_jobs.json"):
+        """Export jobs to JSON file"""
+        self._result(self._submit(0, 'export_to_json', jobs, filename))
+
+    def reload_dataset(self):
+        """Reload every shard from CSV (allowed as long as the initial load)"""
+        futures = [self._submit(shard_id, 'reload_dataset') for shard_id in range(self.num_shards)]
+        for future in futures:
+            self._result(future, timeout=self.startup_timeout)
+        self.logger.info("Sharded dataset reloaded successfully")
+
+    def close(self):
+        """Stop the worker processes"""
+        if self._closed:
+            return
+        self._closed = True
+        for request_queue in self._request_queues:
+            request_queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self._response_queue.put(None)
+        self._dispatcher.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
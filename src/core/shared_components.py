@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Shared Components
+Process-wide instances of heavy components, built on first use
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+_components: Dict[Hashable, Any] = {}
+_build_locks: Dict[Hashable, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def get_shared(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """
+    The process-wide instance for a key, built by `factory` on first use
+
+    Concurrent first callers wait for one build instead of each building
+    their own; builds of different keys run in parallel. A factory that
+    raises leaves nothing behind, so the next caller tries again.
+    """
+    component = _components.get(key, _MISSING)
+    if component is not _MISSING:
+        return component
+
+    with _registry_lock:
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+    with build_lock:
+        component = _components.get(key, _MISSING)
+        if component is _MISSING:
+            start_time = time.perf_counter()
+            component = factory()
+            _components[key] = component
+            logger.info(f"✅ Built shared {key!r} in {time.perf_counter() - start_time:.2f}s")
+    return component
+
+
+def is_built(key: Hashable) -> bool:
+    """True if the shared instance for a key exists"""
+    return key in _components
+
+
+def reset_shared(key: Hashable = None):
+    """Forget one shared instance, or all of them (the next get_shared builds a new one)"""
+    with _registry_lock:
+        if key is None:
+            _components.clear()
+        else:
+            _components.pop(key, None)
+
+
+class LazyComponent:
+    """
+    Attribute built by one of its owner's methods on first access
+
+    The factory method decides whether the instance is shared (by returning
+    get_shared(...)) or private to the owner. Assigning the attribute
+    replaces the component for that owner only, e.g. to inject a stub.
+    Concurrent first accesses on one owner wait for a single build. A factory
+    that raises or returns None (a component that failed to load) leaves
+    nothing cached, so the next access builds again.
+    """
+
+    # Owner attribute holding the per-owner, per-component build locks
+    LOCKS_ATTRIBUTE = '_lazy_component_locks'
+
+    def __init__(self, factory: str):
+        self.factory = factory
+        self.name = None
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        component = instance.__dict__.get(self.name, _MISSING)
+        if component is not _MISSING:
+            return component
+
+        # dict.setdefault is atomic, so every thread of an owner gets the same lock
+        locks = instance.__dict__.setdefault(self.LOCKS_ATTRIBUTE, {})
+        with locks.setdefault(self.name, threading.Lock()):
+            component = instance.__dict__.get(self.name, _MISSING)
+            if component is _MISSING:
+                component = getattr(instance, self.factory)()
+                if component is not None:
+                    instance.__dict__[self.name] = component
+        return component
+
+    def __set__(self, instance, component):
+        instance.__dict__[self.name] = component
+
+    def is_built(self, instance) -> bool:
+        """True if the owner has already built (or been given) the component"""
+        return self.name in instance.__dict__
+
+
+# Test functionality
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("🧪 Testing shared components...")
+    print("=" * 50)
+
+    builds = []
+
+    def slow_factory():
+        builds.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return object()
+
+    class Worker:
+        model = LazyComponent('_build_model')
+
+        def _build_model(self):
+            return get_shared("model", slow_factory)
+
+    workers = [Worker() for _ in range(8)]
+    print(f"Built before first use: {Worker.model.is_built(workers[0])}")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda worker: worker.model, workers))
+    print(f"Builds for 8 concurrent workers: {len(builds)}, one shared instance: {len(set(map(id, models))) == 1}")
+
+    workers[0].model = "stub"
+    print(f"Injected: {workers[0].model!r}, others unchanged: {workers[1].model is models[0]}")
+
+    class FlakyWorker:
+        model = LazyComponent('_build_model')
+
+        def __init__(self):
+            self.attempts = 0
+
+        def _build_model(self):
+            self.attempts += 1
+            time.sleep(0.1)
+            return None if self.attempts == 1 else object()
+
+    flaky = FlakyWorker()
+    print(f"Failed build: {flaky.model}, cached: {FlakyWorker.model.is_built(flaky)}")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda _: flaky.model, range(8)))
+    print(f"Retried once for 8 concurrent accesses: {flaky.attempts == 2 and len(set(map(id, models))) == 1}")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Snippet Generator
+Builds short highlighted description windows around the query terms a job matched
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple, Any
+
+try:
+    from .job_database_manager import JobDatabaseManager
+    from .tokenizer import Tokenizer, UnicodeTokenizer
+except ImportError:
+    from job_database_manager import JobDatabaseManager
+    from tokenizer import Tokenizer, UnicodeTokenizer
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1024)
+def _compile_matcher(terms: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """
+    One case-insensitive alternation per distinct term set (longest terms first)
+
+    Words match whole (plurals allowed); CJK n-grams match anywhere since
+    those scripts have no word boundaries.
+    """
+    if not terms:
+        return None
+    ordered = sorted(terms, key=len, reverse=True)
+    words = "|".join(re.escape(term) for term in ordered if not UnicodeTokenizer.is_unsegmented(term))
+    grams = "|".join(re.escape(term) for term in ordered if UnicodeTokenizer.is_unsegmented(term))
+    alternatives = ([rf"\b(?:{words})(?:s|es)?\b"] if words else []) + ([grams] if grams else [])
+    return re.compile("|".join(alternatives), re.IGNORECASE)
+
+
+class SnippetGenerator:
+    """
+    Finds query-term offsets in a description with a compiled matcher and
+    returns the window containing the most distinct terms, with highlight
+    offsets relative to the snippet text
+    """
+
+    def __init__(self, window: int = 200, context: int = 40, tokenizer: Tokenizer = None):
+        self.window = window
+        self.context = context
+        self.tokenizer = tokenizer or UnicodeTokenizer()
+
+    def query_terms(self, query: str) -> Tuple[str, ...]:
+        """Terms that make a job match a query (same tokenization and related terms as search_jobs)"""
+        terms = set()
+        for word in self.tokenizer.tokenize(query or ""):
+            terms.add(word)
+            terms.update(JobDatabaseManager._get_related_terms(word))
+        return tuple(sorted(terms))
+
+    def _base_term(self, word: str, terms: Tuple[str, ...]) -> str:
+        """Map a matched (possibly plural) word back to its query term"""
+        for candidate in (word, word[:-1], word[:-2]):
+            if candidate in terms:
+                return candidate
+        return word
+
+    def _best_window(self, matches: List[Tuple[int, int, str]]) -> Tuple[int, int]:
+        """Pick the run of matches fitting in one window with the most distinct terms (then most hits)"""
+        best = (0, 0, 0, 0)  # (distinct, hits, first, last)
+        last = 0
+        for first in range(len(matches)):
+            last = max(last, first)
+            while last + 1 < len(matches) and matches[last + 1][1] - matches[first][0] <= self.window:
+                last += 1
+            span = matches[first:last + 1]
+            score = (len({term for _, _, term in span}), len(span))
+            if score > best[:2]:
+                best = (*score, first, last)
+        return best[2], best[3]
+
+    def generate(self, text: str, query: str = None, terms: Tuple[str, ...] = None) -> Dict[str, Any]:
+        """
+        Build a highlighted snippet
+
+        Args:
+            text: Full description
+            query: Search query (ignored when terms are given)
+            terms: Precomputed query terms
+
+        Returns:
+            Dict with the snippet 'text', 'highlights' as [start, end] offsets
+            into it, and 'matched_terms'
+        """
+        if not isinstance(text, str) or not text:
+            return {'text': '', 'highlights': [], 'matched_terms': []}
+        text = " ".join(text.split())
+        terms = terms if terms is not None else self.query_terms(query)
+        matcher = _compile_matcher(terms)
+
+        matches = [(m.start(), m.end(), self._base_term(m.group().lower(), terms))
+                   for m in matcher.finditer(text)] if matcher else []
+        if matches:
+            first, last = self._best_window(matches)
+            span = matches[last][1] - matches[first][0]
+            start = max(0, matches[first][0] - min(self.context, self.window - span))
+            end = max(matches[last][1], min(len(text), start + self.window))
+        else:
+            first, last = 0, -1
+            start, end = 0, min(len(text), self.window)
+
+        # Snap to word boundaries
+        if start > 0:
+            space = text.find(" ", start, matches[first][0] if matches else start + self.context)
+            start = space + 1 if space != -1 else start
+        if end < len(text):
+            space = text.rfind(" ", matches[last][1] if matches else start, end)
+            end = space if space != -1 else end
+
+        prefix = "…" if start > 0 else ""
+        suffix = "…" if end < len(text) else ""
+        offset = len(prefix) - start
+        highlights = [[m_start + offset, m_end + offset] for m_start, m_end, _ in matches[first:last + 1]
+                      if m_start >= start and m_end <= end]
+        return {
+            'text': f"{prefix}{text[start:end]}{suffix}",
+            'highlights': highlights,
+            'matched_terms': sorted({term for _, _, term in matches})
+        }
+
+    def annotate(self, job_dicts: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+        """
+        Replace full descriptions with highlighted snippets in API job dicts
+
+        Args:
+            job_dicts: Jobs as returned by convert_job_to_dict
+            query: Search query the jobs matched
+
+        Returns:
+            The same dicts with 'snippet', 'highlights' and 'matched_terms' added
+            and the full description/summary removed
+        """
+        terms = self.query_terms(query)
+        for job in job_dicts:
+            snippet = self.generate(job.get('description') or job.get('summary') or '', terms=terms)
+            job['snippet'] = snippet['text']
+            job['highlights'] = snippet['highlights']
+            job['matched_terms'] = snippet['matched_terms']
+            job.pop('description', None)
+            job.pop('summary', None)
+        return job_dicts
+
+
+# Test functionality
+if __name__ == "__main__":
+    generator = SnippetGenerator(window=120)
+
+    description = ("We are a fast-growing fintech company in Dhaka. Our platform team builds payment "
+                   "infrastructure used by millions. As a Senior Software Engineer you will design APIs, "
+                   "mentor developers and work closely with data analysts. Experience with Python and "
+                   "distributed systems is required. Competitive salary and remote-friendly culture.")
+
+    print("🧪 Testing snippet generation...")
+    print("=" * 50)
+    for test_query in ["software engineer", "python developer", "marketing"]:
+        result = generator.generate(description, test_query)
+        marked = result['text']
+        for hl_start, hl_end in reversed(result['highlights']):
+            marked = f"{marked[:hl_start]}[{marked[hl_start:hl_end]}]{marked[hl_end:]}"
+        print(f"{test_query!r}: {marked}")
+        print(f"   {len(result['text'])} of {len(description)} chars, matched {result['matched_terms']}")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tokenizer
+Unicode-aware tokenization for the job search index (Latin, Bangla, CJK)
+"""
+
+import logging
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Scripts written without spaces between words: kana, CJK ideographs, Thai
+UNSEGMENTED_CHARS = "\u0e00-\u0e7f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+# Indic blocks (Devanagari ... Sinhala, including Bangla) and ZWNJ/ZWJ; vowel signs are not \w
+INDIC_CHARS = "\u0900-\u0dff\u200c\u200d"
+
+_TOKEN_PATTERN = re.compile(rf"([{UNSEGMENTED_CHARS}]+)|((?:[^\W{UNSEGMENTED_CHARS}]|[{INDIC_CHARS}])+)")
+_UNSEGMENTED_PATTERN = re.compile(rf"[{UNSEGMENTED_CHARS}]")
+
+
+class Tokenizer:
+    """Base tokenizer interface used by the search index"""
+
+    def normalize(self, text: str) -> str:
+        """Normalize text before matching"""
+        return text.lower()
+
+    def tokenize(self, text: str, cache: bool = True) -> List[str]:
+        """Split text into index terms (`cache` lets caching subclasses skip their cache)"""
+        return [word for word in re.findall(r'\b\w+\b', self.normalize(text)) if len(word) > 2]
+
+    def __repr__(self) -> str:
+        """Identifies the tokenization; part of the fingerprint of indexes built with it"""
+        return f"{type(self).__name__}()"
+
+
+class UnicodeTokenizer(Tokenizer):
+    """
+    NFKC + case-folded word tokenizer with character n-grams for unsegmented scripts
+
+    Space-separated scripts (Latin, Bangla, ...) yield whole words longer than
+    `min_word_length - 1`. Runs of CJK/Thai characters yield overlapping
+    character n-grams, so "线下活动设计师" is findable by "设计师". Results are
+    cached per text since titles repeat heavily across the dataset; texts
+    longer than `cache_max_length` characters (descriptions) are tokenized
+    uncached, so the cache stays small whatever callers pass in.
+    """
+
+    def __init__(self, ngram_size: int = 2, min_word_length: int = 3, cache_size: int = 65536,
+                 cache_max_length: int = 256):
+        self.ngram_size = ngram_size
+        self.min_word_length = min_word_length
+        self.cache_max_length = cache_max_length
+        self._tokenize_cached = lru_cache(maxsize=cache_size)(self._tokenize)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(ngram_size={self.ngram_size}, min_word_length={self.min_word_length})"
+
+    def normalize(self, text: str) -> str:
+        """NFKC-normalize (full-width forms, ligatures) and case-fold"""
+        return unicodedata.normalize('NFKC', text).casefold()
+
+    def _ngrams(self, run: str) -> List[str]:
+        """Overlapping character n-grams of an unsegmented run (the run itself if shorter)"""
+        if len(run) <= self.ngram_size:
+            return [run]
+        return [run[i:i + self.ngram_size] for i in range(len(run) - self.ngram_size + 1)]
+
+    def _tokenize(self, text: str) -> Tuple[str, ...]:
+        tokens = []
+        for unsegmented, word in _TOKEN_PATTERN.findall(self.normalize(text)):
+            if unsegmented:
+                tokens.extend(self._ngrams(unsegmented))
+            elif len(word) >= self.min_word_length:
+                tokens.append(word)
+        return tuple(tokens)
+
+    def tokenize(self, text: str, cache: bool = True) -> List[str]:
+        """
+        Split text into index terms
+
+        Args:
+            text: Title, query or other short text
+            cache: Use the per-text cache; pass False for one-off texts
+                (job descriptions, corpus passes) so they aren't kept
+
+        Returns:
+            Normalized terms, in text order (may repeat)
+        """
+        if not isinstance(text, str) or not text:
+            return []
+        if not cache or len(text) > self.cache_max_length:
+            return list(self._tokenize(text))
+        return list(self._tokenize_cached(text))
+
+    @staticmethod
+    def is_unsegmented(term: str) -> bool:
+        """True for terms from scripts without word boundaries (matched without \\b)"""
+        return bool(_UNSEGMENTED_PATTERN.search(term))
+
+
+# Test functionality
+if __name__ == "__main__":
+    tokenizer = UnicodeTokenizer()
+
+    print("🧪 Testing Unicode tokenizer...")
+    print("=" * 50)
+    for sample in ["Senior Python Developer", "线下活动设计师", "সফটওয়্যার ডেভেলপার (ঢাকা)",
+                   "ＡＩ Ｅｎｇｉｎｅｅｒ", "Straße Manager", "データ分析 Engineer"]:
+        print(f"{sample!r}: {tokenizer.tokenize(sample)}")
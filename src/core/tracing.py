@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tracing
+Lightweight timing spans for the stages of a search, and their aggregate statistics
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any, Iterator
+
+_local = threading.local()
+
+
+class Span:
+    """
+    One timed stage of a search, with the sub-calls it made as children
+
+    Children may be added from several threads at once (the web pipeline
+    workers), so the child list is guarded by a lock.
+    """
+
+    def __init__(self, name: str, parent: 'Span' = None, **attributes):
+        self.name = name
+        self.parent = parent
+        self.attributes = attributes
+        self.children: List['Span'] = []
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def child(self, name: str, **attributes) -> 'Span':
+        """Start a sub-span now"""
+        span = Span(name, parent=self, **attributes)
+        with self._lock:
+            self.children.append(span)
+        return span
+
+    def finish(self):
+        """Stop the clock (later calls keep the first end time)"""
+        if self.end is None:
+            self.end = time.perf_counter()
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds between start and finish, or None while running"""
+        return None if self.end is None else self.end - self.start
+
+    def to_dict(self, origin: float = None) -> Dict[str, Any]:
+        """
+        The span tree as plain data
+
+        Args:
+            origin: perf_counter value offsets are measured from (this span's start by default)
+        """
+        origin = self.start if origin is None else origin
+        with self._lock:
+            children = list(self.children)
+        return {
+            'name': self.name,
+            'start_ms': round((self.start - origin) * 1000, 3),
+            'duration_ms': None if self.end is None else round((self.end - self.start) * 1000, 3),
+            **({'attributes': self.attributes} if self.attributes else {}),
+            **({'children': [child.to_dict(origin) for child in children]} if children else {})
+        }
+
+    def walk(self, prefix: str = "") -> Iterator[tuple]:
+        """Yield (path, span) for this span and every descendant, paths joined with '/'"""
+        path = f"{prefix}/{self.name}" if prefix else self.name
+        yield path, self
+        with self._lock:
+            children = list(self.children)
+        for child in children:
+            yield from child.walk(path)
+
+
+def current_span() -> Optional[Span]:
+    """The span active on this thread, if any"""
+    return getattr(_local, 'span', None)
+
+
+@contextmanager
+def activate(span: Optional[Span]):
+    """Make a span the parent of spans opened on this thread without a parent"""
+    previous = current_span()
+    _local.span = span
+    try:
+        yield span
+    finally:
+        _local.span = previous
+
+
+@contextmanager
+def span(name: str, parent: Span = None, **attributes):
+    """
+    Time a block as a child of `parent` (the thread's active span by default)
+
+    Does nothing and yields None when there is no parent, so library code can
+    be instrumented unconditionally. The new span is active inside the block;
+    generators must not yield inside it, or the caller's code would run under it.
+    """
+    parent = parent or current_span()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, **attributes)
+    try:
+        with activate(child):
+            yield child
+    finally:
+        child.finish()
+
+
+class StageTimings:
+    """
+    Aggregate span durations per stage path across searches
+
+    Keeps a count, total and maximum per path ("search/web_fallback/fetch")
+    plus the most recent `window` durations for percentiles.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, root: Span):
+        """Add every finished span of a trace"""
+        durations = [(path, span.duration) for path, span in root.walk() if span.duration is not None]
+        with self._lock:
+            for path, duration in durations:
+                stage = self._stages.get(path)
+                if stage is None:
+                    stage = self._stages[path] = {'count': 0, 'total': 0.0, 'max': 0.0,
+                                                  'recent': deque(maxlen=self.window)}
+                stage['count'] += 1
+                stage['total'] += duration
+                stage['max'] = max(stage['max'], duration)
+                stage['recent'].append(duration)
+
+    @staticmethod
+    def _percentile(values: List[float], fraction: float) -> float:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage count, mean, p50, p95 and max in milliseconds"""
+        with self._lock:
+            stages = {path: (stage['count'], stage['total'], stage['max'], list(stage['recent']))
+                      for path, stage in self._stages.items()}
+        return {
+            path: {
+                'count': count,
+                'avg_ms': round(total / count * 1000, 3),
+                'p50_ms': round(self._percentile(recent, 0.5) * 1000, 3),
+                'p95_ms': round(self._percentile(recent, 0.95) * 1000, 3),
+                'max_ms': round(maximum * 1000, 3)
+            }
+            for path, (count, total, maximum, recent) in sorted(stages.items())
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+# Test functionality
+if __name__ == "__main__":
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("🧪 Testing tracing spans...")
+    print("=" * 50)
+
+    timings = StageTimings()
+    for _ in range(3):
+        root = Span("search", query="python developer")
+        with span("parse_query", parent=root):
+            time.sleep(0.01)
+            with span("relevance_check"):
+                time.sleep(0.02)
+        web = root.child("web_fallback")
+
+        def fetch(url):
+            with span("fetch", parent=web, url=url):
+                time.sleep(0.03)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(fetch, [f"https://example.com/{i}" for i in range(4)]))
+        web.finish()
+        root.finish()
+        timings.record(root)
+
+    print(json.dumps(root.to_dict(), indent=2))
+    print(json.dumps(timings.get_stats(), indent=2))
+
+    start_time = time.perf_counter()
+    for _ in range(100000):
+        with span("noop"):
+            pass
+    print(f"Span without an active trace: {(time.perf_counter() - start_time) * 10:.2f}µs")
@@ -336,16 +336,31 @@ def render_main_content():
     if 'search_results' in st.session_state:
         display_search_results()
 
+def _job_field(job, field):
+    """Read a field from a JobData object or a job dict"""
+    return job.get(field, '') if isinstance(job, dict) else getattr(job, field, '')
+
 def perform_search(query):
     """Perform the job search using hybrid RAG engine"""
     with st.spinner("🔍 Searching for jobs..."):
         try:
             # Initialize the hybrid RAG engine
-            from src.core.rag_engine import RAGEngine
+            from src.core.rag_engine import RAGEngine, SearchEventType
             engine = RAGEngine()
             
-            # Perform search
-            results = engine.search(query)
+            # Stream the search so database hits show while the web fallback is still running
+            progress = st.empty()
+            found_jobs = []
+            results = {}
+            for event in engine.search_stream(query):
+                if event.type in (SearchEventType.DATABASE_RESULTS, SearchEventType.WEB_RESULTS):
+                    found_jobs.extend(event.data['jobs'])
+                    titles = "\n".join(f"- {_job_field(job, 'title')} at {_job_field(job, 'company')}"
+                                        for job in found_jobs[:10])
+                    progress.markdown(f"**{len(found_jobs)} jobs so far** ({event.elapsed:.1f}s)\n\n{titles}")
+                elif event.type in (SearchEventType.SUMMARY, SearchEventType.ERROR):
+                    results = dict(event.data, jobs=found_jobs)
+            progress.empty()
             
             if results and not results.get("error"):
                 st.session_state.search_results = {